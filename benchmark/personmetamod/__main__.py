@@ -0,0 +1,245 @@
+"""
+演职人员刮削插件离线基准测试
+
+在本地启动 Emby/Jellyfin/TMDB/豆瓣 替身服务，使用合成媒体库端到端运行
+scrap_library 与 scrap_rt，输出吞吐、单条目请求数与内存峰值。
+
+用法（在仓库根目录执行，需要 MoviePilot 源码）：
+    python -m benchmark.personmetamod --moviepilot /path/to/MoviePilot --preset small
+    python -m benchmark.personmetamod --moviepilot /path/to/MoviePilot --preset large \\
+        --servers emby,jellyfin --latency emby=5,tmdb=40 --error-rate tmdb=0.01 \\
+        --output result.json --baseline last.json
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import requests
+
+from .synthetic import PRESETS, SyntheticLibrary
+from .upstream import UpstreamConfig, serve
+
+# 越大越好的指标，其余指标越小越好
+HIGHER_IS_BETTER = {"items_per_sec"}
+
+
+def parse_mapping(value: str) -> Dict[str, float]:
+    """
+    解析 emby=5,tmdb=40 形式的参数
+    """
+    result = {}
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        key, _, number = part.partition("=")
+        result[key.strip()] = float(number)
+    return result
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return usage / 1024 / 1024 if sys.platform == "darwin" else usage / 1024
+
+
+def upstream_stats(base_url: str) -> dict:
+    return requests.get(f"{base_url}/_stats", timeout=30).json()
+
+
+def summarize(stats: dict, items: int) -> dict:
+    """
+    汇总各上游的请求数与流量
+    """
+    summary = {}
+    total = 0
+    for group, stat in sorted(stats.items()):
+        requests_count = stat.get("GET", 0) + stat.get("POST", 0)
+        total += requests_count
+        summary[group] = {
+            "requests": requests_count,
+            "get": stat.get("GET", 0),
+            "post": stat.get("POST", 0),
+            "per_item": round(requests_count / items, 2) if items else 0,
+            "bytes_in": stat.get("bytes_in", 0),
+            "bytes_out": stat.get("bytes_out", 0),
+        }
+    return {"total_requests": total, "upstreams": summary}
+
+
+def wait_jobs(plugin):
+    """
+    等待插件调度器中的任务全部执行完毕
+    """
+    while any(plugin._jobs.pending().values()) or plugin._jobs.running_lane is not None:
+        time.sleep(0.005)
+
+
+def run_library(plugin, base_url: str, items: Optional[int], **kwargs) -> dict:
+    """
+    运行一次 scrap_library，items 为空时使用插件统计的实际扫描条目数
+    """
+    requests.post(f"{base_url}/_reset", timeout=30)
+    start = time.perf_counter()
+    plugin.scrap_library(**kwargs)
+    elapsed = time.perf_counter() - start
+    if items is None:
+        items = plugin._runstate.snapshot().get("items_total") or 0
+    result = summarize(upstream_stats(base_url), items)
+    result.update({
+        "elapsed": round(elapsed, 2),
+        "items": items,
+        "items_per_sec": round(items / elapsed, 2) if elapsed else 0,
+        "requests_per_item": round(result["total_requests"] / items, 2) if items else 0,
+    })
+    return result
+
+
+def run_realtime(plugin, base_url: str, library, events: int) -> dict:
+    requests.post(f"{base_url}/_reset", timeout=30)
+    tmdbids = [library.MOVIE_TMDB_BASE + i for i in range(min(events, library.config.movies))]
+    tmdbids += [library.TV_TMDB_BASE + i for i in range(min(events - len(tmdbids), library.config.series))]
+    durations = []
+    for tmdbid in tmdbids:
+        mediainfo = plugin.chain.recognize_media(tmdbid=tmdbid)
+        event = SimpleNamespace(event_data={"mediainfo": mediainfo, "meta": SimpleNamespace(begin_season=1)})
+        start = time.perf_counter()
+        plugin.scrap_rt(event)
+        # 实时刮削在调度器线程中执行，等待其完成
+        wait_jobs(plugin)
+        durations.append(time.perf_counter() - start)
+    result = summarize(upstream_stats(base_url), len(tmdbids))
+    result.update({
+        "events": len(tmdbids),
+        "mean_latency": round(statistics.mean(durations), 3) if durations else 0,
+        "p95_latency": round(sorted(durations)[int(len(durations) * 0.95) - 1], 3) if durations else 0,
+        "requests_per_item": round(result["total_requests"] / len(tmdbids), 2) if tmdbids else 0,
+    })
+    return result
+
+
+def run_changes(plugin, base_url: str, fraction: float) -> dict:
+    """
+    在替身TMDB上制造一批人物变更，然后运行变更刷新
+    """
+    changed = requests.post(f"{base_url}/_churn", params={"fraction": fraction}, timeout=30).json()["changed"]
+    requests.post(f"{base_url}/_reset", timeout=30)
+    start = time.perf_counter()
+    plugin.refresh_changes()
+    elapsed = time.perf_counter() - start
+    result = summarize(upstream_stats(base_url), changed)
+    result.update({
+        "changed_persons": changed,
+        "elapsed": round(elapsed, 2),
+    })
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    与基线比较，返回退化的指标
+    """
+    regressions = []
+    for name in ["items_per_sec", "requests_per_item", "peak_rss_mb"]:
+        current, previous = result.get(name), baseline.get(name)
+        if not current or not previous:
+            continue
+        if name in HIGHER_IS_BETTER:
+            worse = current < previous * (1 - tolerance)
+        else:
+            worse = current > previous * (1 + tolerance)
+        if worse:
+            regressions.append(f"{name}: {previous} -> {current}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="演职人员刮削插件离线基准测试")
+    parser.add_argument("--moviepilot", required=True, help="MoviePilot 源码目录")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--movies", type=int)
+    parser.add_argument("--series", type=int)
+    parser.add_argument("--seasons", type=int)
+    parser.add_argument("--episodes", type=int)
+    parser.add_argument("--persons", type=int)
+    parser.add_argument("--servers", default="emby", help="逗号分隔的服务器类型，如 emby,jellyfin")
+    parser.add_argument("--type", default="all", help="插件刮削条件 all/name/role")
+    parser.add_argument("--latency", default="", help="各上游延迟（毫秒），如 emby=5,tmdb=40")
+    parser.add_argument("--error-rate", default="", help="各上游错误率，如 tmdb=0.01")
+    parser.add_argument("--passes", type=int, default=1, help="scrap_library 运行次数，第二次起为稳态")
+    parser.add_argument("--rt-events", type=int, default=20, help="scrap_rt 事件数")
+    parser.add_argument("--changes-fraction", type=float, default=0.0,
+                        help="在TMDB替身上变更的人物比例，大于0时运行变更刷新")
+    parser.add_argument("--recent-days", type=float, default=0,
+                        help="大于0时额外运行一次仅扫描最近若干天入库条目的刮削")
+    parser.add_argument("--async-engine", action="store_true", help="启用异步引擎（需要 aiohttp）")
+    parser.add_argument("--output", help="结果JSON输出路径")
+    parser.add_argument("--baseline", help="基线结果JSON，指标退化超过容差时返回非零")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.moviepilot)
+    from .harness import load_plugin
+
+    library_config = replace(PRESETS[args.preset], **{
+        key: getattr(args, key) for key in ["movies", "series", "seasons", "episodes", "persons"]
+        if getattr(args, key) is not None
+    })
+    servers = [x.strip() for x in args.servers.split(",") if x.strip()]
+    upstream_config = UpstreamConfig(library=library_config, servers=servers,
+                                     latency=parse_mapping(args.latency),
+                                     error_rate=parse_mapping(args.error_rate))
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(upstream_config, port_queue), daemon=True)
+    process.start()
+    base_url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+
+    try:
+        library = SyntheticLibrary(library_config)
+        plugin, _ = load_plugin(base_url, library, servers, config={"type": args.type,
+                                                                   "async_engine": args.async_engine})
+        items = (library_config.movies + library_config.series) * len(servers)
+        rss_before = peak_rss_mb()
+        passes = [run_library(plugin, base_url, items) for _ in range(args.passes)]
+        realtime = run_realtime(plugin, base_url, library, args.rt_events) if args.rt_events else {}
+        recent = run_library(plugin, base_url, None, order="created", days=args.recent_days) \
+            if args.recent_days else {}
+        changes = run_changes(plugin, base_url, args.changes_fraction) if args.changes_fraction else {}
+        result = {
+            "preset": args.preset,
+            "library": vars(library_config),
+            "servers": servers,
+            "async_engine": args.async_engine,
+            "episodes": library_config.series * library_config.seasons * library_config.episodes,
+            "items_per_sec": passes[0]["items_per_sec"],
+            "requests_per_item": passes[0]["requests_per_item"],
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+            "library_passes": passes,
+            "realtime": realtime,
+            "recent_scan": recent,
+            "changes_refresh": changes,
+        }
+    finally:
+        process.terminate()
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("性能退化：\n" + "\n".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
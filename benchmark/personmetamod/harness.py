@@ -0,0 +1,238 @@
+import importlib.util
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import requests
+
+PLUGIN_MODULE = "app.plugins.personmetamod"
+PLUGIN_DIR = Path(__file__).resolve().parents[2] / "plugins.v2" / "personmetamod"
+
+
+class FakeMediaServer:
+    """
+    媒体服务器实例替身，接口与 MoviePilot 的 Emby/Jellyfin 模块一致
+    """
+
+    def __init__(self, host: str, user: str = "benchmark", apikey: str = "benchmark"):
+        self._host = host
+        self._apikey = apikey
+        self.user = user
+
+    def is_inactive(self) -> bool:
+        return False
+
+    def _url(self, url: str) -> str:
+        return url.replace("[HOST]", self._host) \
+            .replace("[APIKEY]", self._apikey) \
+            .replace("[USER]", self.user)
+
+    def get_data(self, url: str) -> Optional[requests.Response]:
+        try:
+            return requests.get(self._url(url), timeout=30)
+        except requests.RequestException:
+            return None
+
+    def post_data(self, url: str, data: str = None, headers: dict = None) -> Optional[requests.Response]:
+        try:
+            return requests.post(self._url(url), data=data, headers=headers, timeout=30)
+        except requests.RequestException:
+            return None
+
+
+class FakeMediaServerHelper:
+    """
+    MediaServerHelper 替身
+    """
+    services: Dict[str, SimpleNamespace] = {}
+
+    def get_services(self, type_filter: str = None, name_filters: List[str] = None) -> Dict[str, SimpleNamespace]:
+        return {name: service for name, service in self.services.items()
+                if (not type_filter or service.type == type_filter)
+                and (not name_filters or name in name_filters)}
+
+    def get_configs(self) -> Dict[str, SimpleNamespace]:
+        return {name: SimpleNamespace(name=name) for name in self.services}
+
+
+class FakeMediaServerChain:
+    """
+    MediaServerChain 替身，通过替身服务器的 Views/Items 接口列出媒体库
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def _service(server: str) -> SimpleNamespace:
+        return FakeMediaServerHelper.services[server]
+
+    @staticmethod
+    def _to_item(server: str, data: dict) -> SimpleNamespace:
+        return SimpleNamespace(server=server, item_id=data.get("Id"), item_type=data.get("Type"),
+                               title=data.get("Name"), tmdbid=(data.get("ProviderIds") or {}).get("Tmdb"))
+
+    def librarys(self, server: str, **kwargs):
+        res = self._service(server).instance.get_data("[HOST]emby/Users/[USER]/Views?api_key=[APIKEY]"
+                                                      if self._service(server).type == "emby"
+                                                      else "[HOST]Users/[USER]/Views?api_key=[APIKEY]")
+        if not res:
+            return []
+        return [SimpleNamespace(id=x.get("Id"), name=x.get("Name")) for x in res.json().get("Items", [])]
+
+    def items(self, server: str, library_id: str, **kwargs):
+        service = self._service(server)
+        prefix = "emby/" if service.type == "emby" else ""
+        res = service.instance.get_data(f"[HOST]{prefix}Users/[USER]/Items?ParentId={library_id}&api_key=[APIKEY]")
+        if not res:
+            return
+        for data in res.json().get("Items", []):
+            yield self._to_item(server, data)
+
+    def iteminfo(self, server: str, item_id: str):
+        service = self._service(server)
+        prefix = "emby/" if service.type == "emby" else ""
+        res = service.instance.get_data(f"[HOST]{prefix}Users/[USER]/Items/{item_id}?api_key=[APIKEY]")
+        if not res:
+            return None
+        return self._to_item(server, res.json())
+
+
+class FakeChain:
+    """
+    插件 chain 替身：媒体识别在本地完成，豆瓣查询走替身服务
+    """
+
+    def __init__(self, base_url: str, library):
+        self._base_url = base_url
+        self._library = library
+
+    def recognize_media(self, mtype=None, tmdbid=None, **kwargs):
+        if not tmdbid:
+            return None
+        tmdbid = int(tmdbid)
+        return SimpleNamespace(title=f"Title {tmdbid}", year="2000", type=mtype, tmdb_id=tmdbid,
+                               imdb_id=f"tt{tmdbid}", title_year=f"Title {tmdbid} (2000)")
+
+    def match_doubaninfo(self, name: str, imdbid: str = None, mtype=None, year: str = None,
+                         season: int = None, **kwargs) -> Optional[dict]:
+        try:
+            res = requests.get(f"{self._base_url}/douban/match",
+                               params={"name": name, "imdbid": imdbid, "season": season or ""}, timeout=30)
+        except requests.RequestException:
+            return None
+        return res.json() if res.ok else None
+
+    def douban_info(self, doubanid: str, **kwargs) -> Optional[dict]:
+        try:
+            res = requests.get(f"{self._base_url}/douban/subject/{doubanid}", timeout=30)
+        except requests.RequestException:
+            return None
+        return res.json() if res.ok else None
+
+    def media_exists(self, mediainfo, **kwargs):
+        server, service = next(iter(FakeMediaServerHelper.services.items()))
+        tmdbid = mediainfo.tmdb_id
+        if tmdbid >= self._library.TV_TMDB_BASE:
+            itemid = f"s{tmdbid - self._library.TV_TMDB_BASE}"
+        else:
+            itemid = f"m{tmdbid - self._library.MOVIE_TMDB_BASE}"
+        return SimpleNamespace(server=server, server_type=service.type, itemid=itemid)
+
+
+def url_rewriter(base_url: str, image_domain: str):
+    """
+    生成把TMDB/图片域名改写到替身服务的地址改写函数
+    """
+    rules = [
+        (re.compile(r"^https://api\.themoviedb\.org"), f"{base_url}/tmdb"),
+        (re.compile(rf"^https://{re.escape(image_domain)}"), f"{base_url}/img"),
+        (re.compile(r"^https://img\d*\.doubanio\.com"), f"{base_url}/img"),
+    ]
+
+    def rewrite(url: str) -> str:
+        for pattern, target in rules:
+            url, count = pattern.subn(target, url)
+            if count:
+                break
+        return url
+
+    return rewrite
+
+
+def rewriting_request_utils(base, base_url: str, image_domain: str):
+    """
+    生成一个把TMDB/图片域名改写到替身服务的 RequestUtils 子类
+    """
+    rewrite = url_rewriter(base_url, image_domain)
+
+    class RewritingRequestUtils(base):
+
+        def __init__(self, *args, **kwargs):
+            # 本地替身服务不走代理
+            kwargs["proxies"] = None
+            super().__init__(*args, **kwargs)
+
+        def get_res(self, url: str, *args, **kwargs):
+            return super().get_res(rewrite(url), *args, **kwargs)
+
+        def post_res(self, url: str, *args, **kwargs):
+            return super().post_res(rewrite(url), *args, **kwargs)
+
+    return RewritingRequestUtils
+
+
+def load_plugin(base_url: str, library, servers: List[str], config: dict = None, workdir: Path = None):
+    """
+    加载插件模块并替换外部依赖，返回 (插件实例, 插件模块)
+    需要 MoviePilot 源码目录在 sys.path 中
+    """
+    from app.core.config import settings
+    import app.plugins  # noqa: F401
+
+    if not settings.TMDB_API_KEY:
+        settings.TMDB_API_KEY = "benchmark"
+
+    spec = importlib.util.spec_from_file_location(PLUGIN_MODULE, PLUGIN_DIR / "__init__.py",
+                                                  submodule_search_locations=[str(PLUGIN_DIR)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PLUGIN_MODULE] = module
+    spec.loader.exec_module(module)
+
+    FakeMediaServerHelper.services = {
+        f"{server_type}{index}": SimpleNamespace(name=f"{server_type}{index}", type=server_type,
+                                                 instance=FakeMediaServer(f"{base_url}/srv{index}/"),
+                                                 config=SimpleNamespace(config={"host": f"{base_url}/srv{index}/",
+                                                                                "apikey": "benchmark"}))
+        for index, server_type in enumerate(servers)
+    }
+    module.MediaServerHelper = FakeMediaServerHelper
+    module.MediaServerChain = FakeMediaServerChain
+    module.RequestUtils = rewriting_request_utils(module.RequestUtils, base_url, settings.TMDB_IMAGE_DOMAIN)
+    module.personmetamod._aio.url_rewriter = url_rewriter(base_url, settings.TMDB_IMAGE_DOMAIN)
+    # 跳过豆瓣防反爬休眠，其余时间函数保持不变
+    module.time = SimpleNamespace(**{name: getattr(time, name) for name in dir(time) if not name.startswith("_")})
+    module.time.sleep = lambda seconds: None
+
+    cls = module.personmetamod
+    plugin = cls.__new__(cls)
+    data = {}
+    workdir = workdir or Path(tempfile.mkdtemp(prefix="personmetamod-bench-"))
+    plugin.chain = FakeChain(base_url, library)
+    plugin.get_data = lambda key=None, plugin_id=None: data.get(key) if key else data
+    plugin.save_data = lambda key, value, plugin_id=None: data.__setitem__(key, value)
+    plugin.del_data = lambda key, plugin_id=None: data.pop(key, None)
+    plugin.update_config = lambda config, plugin_id=None: None
+    plugin.get_data_path = lambda plugin_id=None: workdir
+    plugin.init_plugin({
+        "enabled": True,
+        "type": "all",
+        "delay": 0,
+        "mediaservers": list(FakeMediaServerHelper.services.keys()),
+        **(config or {})
+    })
+    return plugin, module
@@ -0,0 +1,114 @@
+"""
+人物处理热路径微基准
+
+在进程内用合成数据替换媒体服务器与TMDB调用，只测量 __update_people 本身
+每1000个人物的CPU耗时与内存分配峰值，并给出旧实现中逐人物 deepcopy 与
+两次 json.dumps 的开销作为对照。
+
+用法（在仓库根目录执行，需要 MoviePilot 源码）：
+    python -m benchmark.personmetamod.people --moviepilot /path/to/MoviePilot --persons 1000
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+import tracemalloc
+
+from .synthetic import LibraryConfig, SyntheticLibrary
+
+
+def measure(func, rounds: int) -> dict:
+    """
+    返回每轮的CPU耗时（毫秒）与内存分配峰值（KB）
+    """
+    tracemalloc.start()
+    start = time.process_time()
+    for _ in range(rounds):
+        func()
+    elapsed = time.process_time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_ms": round(elapsed * 1000 / rounds, 2), "peak_kb": round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="人物处理热路径微基准")
+    parser.add_argument("--moviepilot", required=True, help="MoviePilot 源码目录")
+    parser.add_argument("--persons", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.moviepilot)
+    from .harness import load_plugin
+
+    library = SyntheticLibrary(LibraryConfig(persons=args.persons))
+    plugin, _ = load_plugin("http://127.0.0.1:9", library, ["emby"])
+    server, server_type = "emby0", "emby"
+
+    # 进程内替换所有I/O，签名与被替换的方法一致
+    written = set()
+
+    def set_iteminfo(server, server_type, itemid, iteminfo, fields=None):
+        written.add(itemid)
+        return True
+
+    def get_tmdb_person_full(person_id, etag=None, last_modified=None):
+        data = library.tmdb_person(person_id)
+        return (200 if data else 404), data, {}
+
+    plugin.get_iteminfo = lambda server, server_type, itemid: library.item(itemid)
+    plugin.set_iteminfo = set_iteminfo
+    plugin.set_item_image = lambda server, server_type, itemid, imageurl, image_tag=None: True
+    plugin._personmetamod__get_tmdb_person_full = get_tmdb_person_full
+    update_people = plugin._personmetamod__update_people
+
+    peoples = [{"Name": f"Actor {pid}", "Id": f"p{pid}", "Role": f"Role {pid}", "Type": "Actor"}
+               for pid in range(1, args.persons + 1)]
+    # 有TMDB ID且TMDB中存在的人物都应被写入，否则计时的是异常分支
+    expected = set()
+    for people in peoples:
+        pid = int(people["Id"][1:])
+        if library.person(pid)["ProviderIds"] and library.tmdb_person(pid):
+            expected.add(people["Id"])
+
+    def io_only():
+        for people in peoples:
+            library.item(people["Id"])
+            library.tmdb_person(int(people["Id"][1:]))
+
+    def plugin_path():
+        for people in peoples:
+            update_people(server=server, server_type=server_type, people=people)
+
+    def legacy_overhead():
+        for people in peoples:
+            copy.deepcopy(people)
+            json.dumps(library.item(people["Id"]), ensure_ascii=False)
+            json.dumps(library.tmdb_person(int(people["Id"][1:])), ensure_ascii=False)
+
+    for people in peoples:
+        update_people(server=server, server_type=server_type, people=people)
+    if written != expected:
+        raise SystemExit(f"人物处理未按预期写入：应写入 {len(expected)} 人，实际 {len(written)} 人，"
+                         f"请检查替身方法的签名是否与插件一致")
+
+    io = measure(io_only, args.rounds)
+    path = measure(plugin_path, args.rounds)
+    legacy = measure(legacy_overhead, args.rounds)
+    scale = 1000 / args.persons
+    result = {
+        "persons": args.persons,
+        "per_1k_persons": {
+            "plugin_cpu_ms": round((path["cpu_ms"] - io["cpu_ms"]) * scale, 2),
+            "plugin_peak_kb": path["peak_kb"],
+            "removed_deepcopy_dumps_cpu_ms": round((legacy["cpu_ms"] - io["cpu_ms"]) * scale, 2),
+            "removed_deepcopy_dumps_peak_kb": legacy["peak_kb"],
+        },
+        "raw": {"io_stub": io, "plugin_path": path, "legacy_overhead": legacy}
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class LibraryConfig:
+    """
+    合成媒体库规模
+    """
+    movies: int = 200
+    series: int = 10
+    seasons: int = 2
+    episodes: int = 5
+    persons: int = 2000
+    movie_cast: int = 15
+    series_cast: int = 12
+    guest_cast: int = 3
+    seed: int = 42
+
+
+PRESETS: Dict[str, LibraryConfig] = {
+    "small": LibraryConfig(),
+    "large": LibraryConfig(movies=10000, series=500, seasons=10, episodes=20, persons=30000),
+}
+
+
+class SyntheticLibrary:
+    """
+    按需生成的合成媒体库，所有数据由ID确定性计算，不占用与规模成正比的内存
+    ID约定：m{i} 电影，s{i} 剧集，s{i}-{k} 季，s{i}-{k}-{e} 集，p{n} 人物
+    """
+
+    MOVIE_LIBRARY = "lib-movie"
+    TV_LIBRARY = "lib-tv"
+    # 电影/剧集的TMDBID偏移，避免与人物ID混淆
+    MOVIE_TMDB_BASE = 100000
+    TV_TMDB_BASE = 500000
+
+    def __init__(self, config: LibraryConfig):
+        self.config = config
+
+    def _rnd(self, key: str) -> random.Random:
+        return random.Random(f"{self.config.seed}:{key}")
+
+    def _pick_cast(self, key: str, count: int) -> List[int]:
+        """
+        从人物池中挑选演员，偏向低编号人物，使不同作品的演员大量重叠
+        """
+        rnd = self._rnd(key)
+        cast = []
+        while len(cast) < min(count, self.config.persons):
+            pid = int(self.config.persons * rnd.random() ** 2) + 1
+            if pid not in cast:
+                cast.append(pid)
+        return cast
+
+    @staticmethod
+    def _people(cast: List[int]) -> List[dict]:
+        return [{
+            "Name": f"Actor {pid}",
+            "Id": f"p{pid}",
+            "Role": f"Role {pid}",
+            "Type": "Actor",
+            "PrimaryImageTag": f"tag{pid}"
+        } for pid in cast]
+
+    def views(self) -> List[dict]:
+        views = []
+        if self.config.movies:
+            views.append({"Id": self.MOVIE_LIBRARY, "Name": "电影", "CollectionType": "movies"})
+        if self.config.series:
+            views.append({"Id": self.TV_LIBRARY, "Name": "电视剧", "CollectionType": "tvshows"})
+        return views
+
+    def children(self, parent_id: str) -> List[dict]:
+        """
+        子媒体项（不含People）
+        """
+        if parent_id == self.MOVIE_LIBRARY:
+            return [self._brief(f"m{i}") for i in range(self.config.movies)]
+        if parent_id == self.TV_LIBRARY:
+            return [self._brief(f"s{i}") for i in range(self.config.series)]
+        parts = parent_id[1:].split("-") if parent_id.startswith("s") else []
+        if len(parts) == 1:
+            return [self._brief(f"{parent_id}-{k}") for k in range(1, self.config.seasons + 1)]
+        if len(parts) == 2:
+            return [self._brief(f"{parent_id}-{e}") for e in range(1, self.config.episodes + 1)]
+        return []
+
+    @staticmethod
+    def _date(index: int, count: int) -> str:
+        """
+        入库时间：编号越大越新，每个条目间隔1小时，最新的条目为当前时间
+        """
+        return time.strftime("%Y-%m-%dT%H:%M:%S.0000000Z", time.gmtime(time.time() - (count - 1 - index) * 3600))
+
+    def _brief(self, item_id: str) -> dict:
+        if item_id.startswith("m"):
+            index = int(item_id[1:])
+            return {"Id": item_id, "Name": f"Movie {index}", "Type": "Movie",
+                    "ProviderIds": {"Tmdb": str(self.MOVIE_TMDB_BASE + index)},
+                    "DateCreated": self._date(index, self.config.movies),
+                    "DateModified": self._date(index, self.config.movies)}
+        parts = item_id[1:].split("-")
+        if len(parts) == 1:
+            return {"Id": item_id, "Name": f"Series {parts[0]}", "Type": "Series",
+                    "ProviderIds": {"Tmdb": str(self.TV_TMDB_BASE + int(parts[0]))},
+                    "DateCreated": self._date(int(parts[0]), self.config.series),
+                    "DateModified": self._date(int(parts[0]), self.config.series)}
+        if len(parts) == 2:
+            return {"Id": item_id, "Name": f"Season {parts[1]}", "Type": "Season",
+                    "IndexNumber": int(parts[1])}
+        return {"Id": item_id, "Name": f"Episode {parts[2]}", "Type": "Episode",
+                "IndexNumber": int(parts[2]), "ParentIndexNumber": int(parts[1])}
+
+    def item(self, item_id: str) -> Optional[dict]:
+        """
+        媒体项详情
+        """
+        if not item_id:
+            return None
+        if item_id.startswith("p"):
+            return self.person(int(item_id[1:]))
+        try:
+            info = self._brief(item_id)
+        except (ValueError, IndexError):
+            return None
+        if info["Type"] == "Movie":
+            info["People"] = self._people(self._pick_cast(item_id, self.config.movie_cast))
+        elif info["Type"] in ["Series", "Season"]:
+            series_id = item_id.split("-")[0]
+            info["People"] = self._people(self._pick_cast(series_id, self.config.series_cast))
+        else:
+            series_id = item_id.split("-")[0]
+            cast = self._pick_cast(series_id, self.config.series_cast)
+            for pid in self._pick_cast(item_id, self.config.guest_cast):
+                if pid not in cast:
+                    cast.append(pid)
+            info["People"] = self._people(cast)
+        return info
+
+    def person(self, pid: int) -> Optional[dict]:
+        if pid < 1 or pid > self.config.persons:
+            return None
+        # 每50人中有1人缺少TMDB ID
+        provider_ids = {} if pid % 50 == 0 else {"Tmdb": str(pid)}
+        return {
+            "Id": f"p{pid}",
+            "Name": f"Actor {pid}",
+            "Type": "Person",
+            "ProviderIds": provider_ids,
+            "Overview": "",
+            "LockedFields": []
+        }
+
+    def tmdb_person(self, pid: int, revision: int = 0) -> Optional[dict]:
+        """
+        TMDB人物详情，每97人中有1人返回404
+        revision 大于0时表示人物在TMDB上发生过变更，简介随之变化
+        """
+        if pid < 1 or pid > self.config.persons or pid % 97 == 0:
+            return None
+        rnd = self._rnd(f"tmdb{pid}")
+        chinese = pid % 3 != 0
+        bio_len = rnd.randint(0, 3) * 400
+        biography = ("這是一段很長的人物簡介。" * (bio_len // 10))[:bio_len]
+        if revision:
+            biography += f"（修訂{revision}）"
+        return {
+            "id": pid,
+            "name": f"演員{pid}" if chinese else f"Actor {pid}",
+            "also_known_as": [f"Actor {pid}", f"演员{pid}"],
+            "biography": biography,
+            "birthday": f"{1940 + pid % 60}-{1 + pid % 12:02d}-{1 + pid % 28:02d}",
+            "deathday": f"2020-01-{1 + pid % 28:02d}" if pid % 40 == 0 else None,
+            "place_of_birth": f"City {pid % 300}",
+            "profile_path": f"/p{pid}.jpg" if pid % 10 else None,
+            "popularity": rnd.random() * 100,
+            "external_ids": {
+                "imdb_id": f"nm{pid:07d}",
+                "tvdb_id": pid if pid % 2 else None,
+            }
+        }
+
+    def douban_match(self, tmdbid: int, season: int = None) -> Optional[dict]:
+        """
+        豆瓣条目匹配，约五分之一的作品匹配不到
+        """
+        if tmdbid % 5 == 0:
+            return None
+        return {"id": f"{tmdbid}-{season or 0}"}
+
+    def douban_subject(self, subject_id: str) -> Optional[dict]:
+        try:
+            tmdbid = int(subject_id.split("-")[0])
+        except ValueError:
+            return None
+        if tmdbid >= self.TV_TMDB_BASE:
+            key = f"s{tmdbid - self.TV_TMDB_BASE}"
+            cast = self._pick_cast(key, self.config.series_cast)
+        else:
+            key = f"m{tmdbid - self.MOVIE_TMDB_BASE}"
+            cast = self._pick_cast(key, self.config.movie_cast)
+        actors = [{
+            "id": str(pid),
+            "name": f"演员{pid}",
+            "latin_name": f"Actor {pid}",
+            "title": f"演员{pid}（Actor {pid}），演员",
+            "avatar": {
+                "large": f"https://img1.doubanio.com/view/celebrity/raw/public/p{pid}.jpg"
+            }
+        } for pid in cast]
+        return {"id": subject_id, "actors": actors[:-2], "directors": actors[-2:]}
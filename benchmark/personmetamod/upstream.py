@@ -0,0 +1,257 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlsplit, parse_qs
+
+from .synthetic import SyntheticLibrary, LibraryConfig
+
+# 假图片内容，约16KB
+IMAGE_BYTES = bytes(range(256)) * 64
+IMAGE_ETAG = '"image-v1"'
+
+
+@dataclass
+class UpstreamConfig:
+    """
+    本地替身服务配置
+    """
+    library: LibraryConfig = field(default_factory=LibraryConfig)
+    # 媒体服务器类型列表，每项对应一个独立的服务器实例
+    servers: List[str] = field(default_factory=lambda: ["emby"])
+    # 各上游的延迟（毫秒）及错误率，键为 emby/jellyfin/tmdb/image/douban
+    latency: Dict[str, float] = field(default_factory=dict)
+    error_rate: Dict[str, float] = field(default_factory=dict)
+
+
+class UpstreamState:
+    """
+    替身服务的可变状态：请求计数以及被插件写回的数据
+    """
+
+    def __init__(self, config: UpstreamConfig):
+        self.config = config
+        self.library = SyntheticLibrary(config.library)
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: defaultdict(int))
+        # 每个服务器被写回的媒体项 {server_index: {item_id: iteminfo}}
+        self.written = defaultdict(dict)
+        # TMDB上发生变更的人物 {pid: revision}
+        self.revisions: Dict[int, int] = {}
+
+    def count(self, group: str, method: str, bytes_in: int, bytes_out: int):
+        with self.lock:
+            stat = self.stats[group]
+            stat[method] += 1
+            stat["bytes_in"] += bytes_in
+            stat["bytes_out"] += bytes_out
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {group: dict(stat) for group, stat in self.stats.items()}
+
+    def reset(self):
+        """
+        清空请求计数
+        """
+        with self.lock:
+            self.stats.clear()
+
+    def churn(self, fraction: float) -> int:
+        """
+        随机让一部分人物在TMDB上发生变更，返回变更人数
+        """
+        persons = self.library.config.persons
+        count = int(persons * fraction)
+        with self.lock:
+            for pid in random.sample(range(1, persons + 1), count):
+                self.revisions[pid] = self.revisions.get(pid, 0) + 1
+        return count
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """
+    路由：
+    /srv{n}/emby/...      Emby形态的媒体服务器
+    /srv{n}/...           Jellyfin形态的媒体服务器
+    /tmdb/3/person/{id}   TMDB人物
+    /tmdb/3/person/changes TMDB人物变更列表
+    /img/...              TMDB/豆瓣图片
+    /douban/match         豆瓣条目匹配
+    /douban/subject/{id}  豆瓣条目详情
+    """
+    protocol_version = "HTTP/1.1"
+    state: UpstreamState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, group: str, status: int, body: bytes = b"", content_type: str = "application/json",
+               bytes_in: int = 0, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        if group:
+            self.state.count(group, self.command, bytes_in, len(body))
+
+    def _json(self, group: str, data, bytes_in: int = 0, etag: str = None):
+        if data is None:
+            self._reply(group, 404, b'{"status_message": "not found"}', bytes_in=bytes_in)
+        elif etag and self.headers.get("If-None-Match") == etag:
+            self._reply(group, 304, etag=etag, bytes_in=bytes_in)
+        else:
+            self._reply(group, 200, json.dumps(data, ensure_ascii=False).encode(), bytes_in=bytes_in, etag=etag)
+
+    def _inject(self, group: str, bytes_in: int = 0) -> bool:
+        """
+        注入延迟与错误，返回True表示已按错误应答
+        """
+        latency = self.state.config.latency.get(group)
+        if latency:
+            time.sleep(latency * random.uniform(0.8, 1.2) / 1000)
+        rate = self.state.config.error_rate.get(group)
+        if rate and random.random() < rate:
+            self._reply(group, 500, b'{"error": "injected"}', bytes_in=bytes_in)
+            return True
+        return False
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        self._dispatch(b"")
+
+    def do_POST(self):
+        self._dispatch(self._read_body())
+
+    def _dispatch(self, body: bytes):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        segments = [x for x in url.path.split("/") if x]
+        if not segments:
+            return self._reply("", 404)
+        head = segments[0]
+        if head == "_stats":
+            return self._reply("", 200, json.dumps(self.state.snapshot()).encode())
+        if head == "_reset":
+            self.state.reset()
+            return self._reply("", 204)
+        if head == "_churn":
+            count = self.state.churn(float(query.get("fraction") or 0.01))
+            return self._reply("", 200, json.dumps({"changed": count}).encode())
+        if head.startswith("srv"):
+            index = int(head[3:])
+            server_type = self.state.config.servers[index]
+            rest = segments[1:]
+            if server_type == "emby" and rest and rest[0] == "emby":
+                rest = rest[1:]
+            if self._inject(server_type, len(body)):
+                return
+            return self._media_server(server_type, index, rest, query, body)
+        if head == "tmdb":
+            if self._inject("tmdb"):
+                return
+            return self._tmdb(segments[1:], query)
+        if head == "img":
+            if self._inject("image"):
+                return
+            if self.headers.get("If-None-Match") == IMAGE_ETAG:
+                return self._reply("image", 304, etag=IMAGE_ETAG)
+            return self._reply("image", 200, IMAGE_BYTES, content_type="image/jpeg", etag=IMAGE_ETAG)
+        if head == "douban":
+            if self._inject("douban"):
+                return
+            return self._douban(segments[1:], query)
+        return self._reply("", 404)
+
+    def _media_server(self, group: str, index: int, rest: List[str], query: dict, body: bytes):
+        library = self.state.library
+        written = self.state.written[index]
+        if self.command == "GET":
+            # Users/{user}/Views
+            if len(rest) == 3 and rest[0] == "Users" and rest[2] == "Views":
+                return self._json(group, {"Items": library.views()})
+            # Users/{user}/Items/{id}
+            if len(rest) == 4 and rest[0] == "Users" and rest[2] == "Items":
+                item_id = rest[3]
+                return self._json(group, written.get(item_id) or library.item(item_id))
+            # Users/{user}/Items?ParentId=
+            if len(rest) == 3 and rest[0] == "Users" and rest[2] == "Items":
+                items = library.children(query.get("ParentId"))
+                sort_by = (query.get("SortBy") or "").split(",")[0]
+                if sort_by in ["DateCreated", "DateModified"]:
+                    items.sort(key=lambda x: x.get(sort_by) or "", reverse=query.get("SortOrder") == "Descending")
+                if query.get("MinDateLastSaved"):
+                    items = [x for x in items if (x.get("DateModified") or "")[:19] >= query["MinDateLastSaved"][:19]]
+                start = int(query.get("StartIndex") or 0)
+                limit = int(query.get("Limit") or 0) or len(items)
+                return self._json(group, {"Items": items[start:start + limit],
+                                          "TotalRecordCount": len(items)})
+        elif self.command == "POST":
+            # Items/{id}
+            if len(rest) == 2 and rest[0] == "Items":
+                try:
+                    info = json.loads(body or b"{}")
+                except ValueError:
+                    return self._reply(group, 400, bytes_in=len(body))
+                with self.state.lock:
+                    written[rest[1]] = info
+                return self._reply(group, 204, bytes_in=len(body))
+            # Items/{id}/Images/Primary 或 Items/{id}/RemoteImages/Download
+            if len(rest) >= 3 and rest[0] == "Items":
+                return self._reply(group, 204, bytes_in=len(body))
+        return self._reply(group, 404, bytes_in=len(body))
+
+    def _tmdb(self, rest: List[str], query: dict):
+        library = self.state.library
+        # 3/person/changes
+        if rest == ["3", "person", "changes"]:
+            with self.state.lock:
+                changed = sorted(self.state.revisions)
+            page = max(int(query.get("page") or 1), 1)
+            per_page = 100
+            return self._json("tmdb", {
+                "results": [{"id": pid, "adult": False} for pid in changed[(page - 1) * per_page:page * per_page]],
+                "page": page,
+                "total_pages": max((len(changed) + per_page - 1) // per_page, 1),
+                "total_results": len(changed)
+            })
+        # 3/person/{id}
+        if len(rest) == 3 and rest[0] == "3" and rest[1] == "person" and rest[2].isdigit():
+            pid = int(rest[2])
+            revision = self.state.revisions.get(pid, 0)
+            return self._json("tmdb", library.tmdb_person(pid, revision), etag=f'"{pid}-{revision}"')
+        return self._reply("tmdb", 404)
+
+    def _douban(self, rest: List[str], query: dict):
+        library = self.state.library
+        if rest == ["match"]:
+            imdbid = query.get("imdbid") or ""
+            if not imdbid.startswith("tt"):
+                return self._json("douban", None)
+            season = int(query["season"]) if query.get("season") else None
+            return self._json("douban", library.douban_match(int(imdbid[2:]), season))
+        if len(rest) == 2 and rest[0] == "subject":
+            return self._json("douban", library.douban_subject(rest[1]))
+        return self._reply("douban", 404)
+
+
+def serve(config: UpstreamConfig, port_queue):
+    """
+    启动替身服务（在独立进程中运行，避免影响插件侧的内存统计）
+    """
+    handler = type("Handler", (UpstreamHandler,), {"state": UpstreamState(config)})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    port_queue.put(httpd.server_address[1])
+    httpd.serve_forever()
@@ -1,16 +1,16 @@
 import base64
-import copy
 import datetime
+import hashlib
 import json
 import re
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, List, Dict, Tuple, Optional
+from typing import Any, Iterator, List, Dict, Tuple, Optional, Set
 from urllib.parse import quote
 
 import pytz
-import zhconv
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from requests import RequestException
@@ -24,12 +24,42 @@ from app.core.meta import MetaBase
 from app.helper.mediaserver import MediaServerHelper
 from app.log import logger
 from app.plugins import _PluginBase
-from app.schemas import MediaInfo, MediaServerItem, ServiceInfo
+from app.schemas import MediaInfo, MediaServerItem, MediaServerLibrary, ServiceInfo
 from app.schemas.types import EventType, MediaType
 from app.utils.common import retry
 from app.utils.http import RequestUtils
 from app.utils.string import StringUtils
 
+from .aioengine import AsyncEngine, AsyncRequest, AsyncResult
+from .blobs import BlobCache
+from .breaker import BreakerBoard, CircuitOpenError
+from .budget import RequestBudget, accounted, server_breaker, server_upstream
+from .castindex import DoubanCastIndex
+from .dump import iter_persons
+from .itemstream import CountingReader, read_json_items, resume_items, streaming_available
+from .plan import PlanRecorder, PlanWriter, applied_ops, diff_plans, iter_plan, latest_ops, op_phase, planned, \
+    progress_path, summarize_plan
+from .profiler import RunProfiler
+from .records import PersonCache, PersonRecord
+from .runstate import RunState
+from .scheduler import JobGroup, JobScheduler, Lane, RateLimiter
+from .snapshot import export_snapshot, import_snapshot
+from .store import CacheStore
+from .zhcache import text_cache
+
+
+class LazyJson:
+    """
+    延迟序列化，仅在日志真正输出时才执行 json.dumps
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False)
+
 
 class personmetamod(_PluginBase):
     # 插件名称
@@ -53,6 +83,27 @@ class personmetamod(_PluginBase):
 
     # 退出事件
     _event = threading.Event()
+    # 运行状态
+    _runstate = RunState()
+    # 请求预算统计
+    _budget = RequestBudget()
+    # TMDB人物缓存
+    _person_cache = PersonCache()
+    # 持久化缓存
+    _store: Optional[CacheStore] = None
+    # 本地图片缓存
+    _blobs: Optional[BlobCache] = None
+    # 可选的异步HTTP引擎
+    _aio = AsyncEngine()
+    # 各媒体服务器与上游的熔断器
+    _breakers = BreakerBoard()
+    # 按需剖析下一次运行
+    _profiler = RunProfiler()
+    # 计划模式下正在写入的变更集
+    _plans = PlanRecorder()
+    _apply_lock = threading.Lock()
+    # 任务调度（实时优先于回填）及上游限速
+    _jobs = JobScheduler()
 
     # 私有属性
     _scheduler = None
@@ -63,6 +114,39 @@ class personmetamod(_PluginBase):
     _type = "all"
     _remove_nozh = False
     _mediaservers = []
+    _request_budget = 0
+    _cache_days = 7
+    _changes_cron = None
+    _rate_limits = "tmdb=40"
+    _scan_order = "default"
+    _recent_cron = None
+    _recent_days = 7
+    _run_minutes = 0
+    _run_requests = 0
+    _miss_days = 3
+    _fanout = False
+    _image_cache_mb = 512
+    _async_engine = False
+    _async_concurrency = "tmdb=32,emby=16,jellyfin=16"
+    _breaker_failures = 5
+    _breaker_slow = 20
+    _breaker_cooldown = 60
+    # 条目因依赖熔断最多延后的次数
+    _defer_attempts = 5
+    # 媒体库扫描每次提交到调度器的条目数上限
+    _scan_batch = 200
+    _profile_next = ""
+    _apply_concurrency = 4
+    # 本进程已写入台账的人物，避免重复写入
+    _ledger_seen = set()
+    # 导入锁
+    _import_lock = threading.Lock()
+    # 媒体库扫描锁，每个调度通道一把，避免同一通道的定时任务重叠运行，近期扫描不会因全库扫描而跳过
+    _scan_locks: Dict[Lane, threading.Lock] = {Lane.RECENT: threading.Lock(), Lane.BACKFILL: threading.Lock()}
+    # 跨服务器同步写入：已处理的服务器人物 {(server, person_id): (处理时间, 写入后的姓名)}
+    _fanout_done: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+    _fanout_lock = threading.Lock()
+    _fanout_ttl = 6 * 3600
 
     def init_plugin(self, config: dict = None):
 
@@ -74,6 +158,53 @@ class personmetamod(_PluginBase):
             self._delay = config.get("delay") or 0
             self._remove_nozh = config.get("remove_nozh") or False
             self._mediaservers = config.get("mediaservers") or []
+            self._request_budget = int(config.get("request_budget") or 0)
+            self._cache_days = float(config.get("cache_days") or 7)
+            self._changes_cron = config.get("changes_cron")
+            # 留空表示不限速，仅在旧配置中没有该项时使用默认值
+            self._rate_limits = config.get("rate_limits") if config.get("rate_limits") is not None else "tmdb=40"
+            self._scan_order = config.get("scan_order") or "default"
+            self._recent_cron = config.get("recent_cron")
+            self._recent_days = float(config.get("recent_days") or 7)
+            self._run_minutes = float(config.get("run_minutes") or 0)
+            self._run_requests = int(config.get("run_requests") or 0)
+            self._miss_days = float(config.get("miss_days") or 3)
+            self._fanout = config.get("fanout") or False
+            self._image_cache_mb = int(config.get("image_cache_mb") if config.get("image_cache_mb") not in (None, "")
+                                       else 512)
+            self._async_engine = config.get("async_engine") or False
+            self._async_concurrency = config.get("async_concurrency") \
+                if config.get("async_concurrency") is not None else "tmdb=32,emby=16,jellyfin=16"
+            self._breaker_failures = int(config.get("breaker_failures")
+                                         if config.get("breaker_failures") not in (None, "") else 5)
+            self._breaker_slow = float(config.get("breaker_slow")
+                                       if config.get("breaker_slow") not in (None, "") else 20)
+            self._breaker_cooldown = float(config.get("breaker_cooldown") or 60)
+            self._profile_next = config.get("profile_next") or ""
+            self._apply_concurrency = int(config.get("apply_concurrency") or 4)
+        self._budget.limit = self._request_budget
+        self._jobs.limiter.configure(RateLimiter.parse(self._rate_limits))
+        self._aio.configure({k: int(v) for k, v in RateLimiter.parse(self._async_concurrency).items()})
+        if self._async_engine and not AsyncEngine.available():
+            logger.warn("未安装 aiohttp，异步引擎不可用，将使用同步请求")
+        self._breakers.configure(failures=self._breaker_failures, slow_seconds=self._breaker_slow,
+                                 cooldown=self._breaker_cooldown)
+        self._jobs.profiler = self._profiler
+        if self._profile_next in RunProfiler.MODES:
+            self._profiler.arm(self._profile_next)
+            logger.info(f"已预约剖析下一次刮削运行（{self._profile_next}）")
+            # 预约只生效一次
+            self._profile_next = ""
+            self.__update_config()
+
+        # 持久化缓存
+        if not self._store:
+            self._store = CacheStore(self.get_data_path() / "cache.db")
+        self._person_cache.store = self._store
+        if not self._blobs:
+            self._blobs = BlobCache(self.get_data_path() / "images", max_bytes=self._image_cache_mb * 1024 * 1024)
+        self._blobs.max_bytes = self._image_cache_mb * 1024 * 1024
+        self._person_cache.ttl = self._cache_days * 24 * 3600
 
         # 停止现有任务
         self.stop_service()
@@ -106,7 +237,26 @@ class personmetamod(_PluginBase):
             "type": self._type,
             "delay": self._delay,
             "remove_nozh": self._remove_nozh,
-            "mediaservers": self._mediaservers
+            "mediaservers": self._mediaservers,
+            "request_budget": self._request_budget,
+            "cache_days": self._cache_days,
+            "changes_cron": self._changes_cron,
+            "rate_limits": self._rate_limits,
+            "scan_order": self._scan_order,
+            "recent_cron": self._recent_cron,
+            "recent_days": self._recent_days,
+            "run_minutes": self._run_minutes,
+            "run_requests": self._run_requests,
+            "miss_days": self._miss_days,
+            "fanout": self._fanout,
+            "image_cache_mb": self._image_cache_mb,
+            "async_engine": self._async_engine,
+            "async_concurrency": self._async_concurrency,
+            "breaker_failures": self._breaker_failures,
+            "breaker_slow": self._breaker_slow,
+            "breaker_cooldown": self._breaker_cooldown,
+            "profile_next": self._profile_next,
+            "apply_concurrency": self._apply_concurrency
         })
 
     def get_state(self) -> bool:
@@ -114,23 +264,398 @@ class personmetamod(_PluginBase):
 
     @staticmethod
     def get_command() -> List[Dict[str, Any]]:
-        pass
+        """
+        定义远程控制命令
+        """
+        return [{
+            "cmd": "/personmeta_import",
+            "event": EventType.PluginAction,
+            "desc": "导入人物缓存",
+            "category": "",
+            "data": {
+                "action": "personmetamod_import"
+            }
+        }, {
+            "cmd": "/personmeta_export",
+            "event": EventType.PluginAction,
+            "desc": "导出缓存快照",
+            "category": "",
+            "data": {
+                "action": "personmetamod_export"
+            }
+        }, {
+            "cmd": "/personmeta_restore",
+            "event": EventType.PluginAction,
+            "desc": "合并缓存快照",
+            "category": "",
+            "data": {
+                "action": "personmetamod_restore"
+            }
+        }, {
+            "cmd": "/personmeta_misses",
+            "event": EventType.PluginAction,
+            "desc": "查看缺失结果缓存",
+            "category": "",
+            "data": {
+                "action": "personmetamod_misses"
+            }
+        }, {
+            "cmd": "/personmeta_clear_misses",
+            "event": EventType.PluginAction,
+            "desc": "清除缺失结果缓存",
+            "category": "",
+            "data": {
+                "action": "personmetamod_clear_misses"
+            }
+        }, {
+            "cmd": "/personmeta_plan",
+            "event": EventType.PluginAction,
+            "desc": "生成刮削变更集",
+            "category": "",
+            "data": {
+                "action": "personmetamod_plan"
+            }
+        }, {
+            "cmd": "/personmeta_apply",
+            "event": EventType.PluginAction,
+            "desc": "应用刮削变更集",
+            "category": "",
+            "data": {
+                "action": "personmetamod_apply"
+            }
+        }]
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        """
+        return [{
+            "path": "/import_persons",
+            "endpoint": self.api_import_persons,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "导入人物缓存",
+            "description": "从JSONL人物导出文件（支持gz/bz2/xz压缩）导入人物缓存，只能指定插件数据目录下import中的文件，未指定路径时导入其中的全部文件"
+        }, {
+            "path": "/export_snapshot",
+            "endpoint": self.api_export_snapshot,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "导出缓存快照",
+            "description": "将人物缓存、豆瓣演职人员缓存、图片哈希及缺失结果导出为压缩快照，保存在插件数据目录下export中"
+        }, {
+            "path": "/import_snapshot",
+            "endpoint": self.api_import_snapshot,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "合并缓存快照",
+            "description": "将其它实例导出的缓存快照合并到本实例，仅覆盖比本地更旧的记录，快照需放在插件数据目录下export中，未指定路径时合并其中最新的快照"
+        }, {
+            "path": "/misses",
+            "endpoint": self.api_misses,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "查看缺失结果缓存",
+            "description": "按时间倒序列出缺失结果缓存，reason 可选 no_tmdbid/tmdb_404/douban_unmatched"
+        }, {
+            "path": "/clear_misses",
+            "endpoint": self.api_clear_misses,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "清除缺失结果缓存",
+            "description": "清除缺失结果缓存，可按 reason 或 key 筛选，均未指定时全部清除"
+        }, {
+            "path": "/breakers",
+            "endpoint": self.api_breakers,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "查看熔断状态",
+            "description": "列出各媒体服务器与上游的熔断器状态、失败与拒绝次数、平均耗时"
+        }, {
+            "path": "/profile",
+            "endpoint": self.api_profile,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "剖析下一次运行",
+            "description": "预约剖析下一次全库扫描或入库刮削，mode 可选 cprofile/sampling，off 为取消预约"
+        }, {
+            "path": "/profile_result",
+            "endpoint": self.api_profile_result,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "查看剖析结果",
+            "description": "返回最近一次剖析的结果文件路径与耗时最多的函数"
+        }, {
+            "path": "/plan",
+            "endpoint": self.api_plan,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "生成刮削变更集",
+            "description": "后台以计划模式扫描媒体库，只计算变更并写入变更集，不修改媒体服务器"
+        }, {
+            "path": "/plans",
+            "endpoint": self.api_plans,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "查看变更集",
+            "description": "列出插件数据目录plans中的变更集及各服务器的变更数与应用进度"
+        }, {
+            "path": "/apply_plan",
+            "endpoint": self.api_apply_plan,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "应用刮削变更集",
+            "description": "后台应用插件数据目录 plans 中的变更集，已成功的变更会跳过，未指定路径时应用最新的变更集"
+        }, {
+            "path": "/plan_diff",
+            "endpoint": self.api_plan_diff,
+            "methods": ["GET"],
+            "auth": "bear",
+            "summary": "比较变更集",
+            "description": "比较两个变更集的新增、移除与内容变化，未指定时比较最近两个"
+        }]
+
+    def api_import_persons(self, path: str = None) -> schemas.Response:
+        """
+        API：后台导入人物缓存
+        """
+        if self._import_lock.locked():
+            return schemas.Response(success=False, message="正在导入中，请稍后")
+        dump_path = self.__data_file("import", path) if path else None
+        if path and not dump_path:
+            return schemas.Response(success=False, message="只能指定插件数据目录 import 中的文件")
+        threading.Thread(target=self.import_person_dump, args=(dump_path,), daemon=True).start()
+        return schemas.Response(success=True, message="已开始导入，进度请查看日志")
+
+    def api_export_snapshot(self) -> schemas.Response:
+        """
+        API：导出缓存快照
+        """
+        path = self.export_cache_snapshot()
+        if not path:
+            return schemas.Response(success=False, message="导出失败，请查看日志")
+        return schemas.Response(success=True, message=f"已导出到 {path}", data={"path": str(path)})
+
+    def api_import_snapshot(self, path: str = None) -> schemas.Response:
+        """
+        API：后台合并缓存快照
+        """
+        if self._import_lock.locked():
+            return schemas.Response(success=False, message="正在导入中，请稍后")
+        snapshot_path = self.__data_file("export", path) if path else None
+        if path and not snapshot_path:
+            return schemas.Response(success=False, message="只能指定插件数据目录 export 中的快照")
+        threading.Thread(target=self.import_cache_snapshot, args=(snapshot_path,), daemon=True).start()
+        return schemas.Response(success=True, message="已开始合并，进度请查看日志")
+
+    def api_misses(self, reason: str = None, limit: int = 100) -> schemas.Response:
+        """
+        API：查看缺失结果缓存
+        """
+        if not self._store:
+            return schemas.Response(success=False, message="缓存未初始化")
+        return schemas.Response(success=True, data={
+            "counts": self._store.miss_counts(),
+            "items": self._store.list_misses(reason=reason, limit=int(limit))
+        })
+
+    def api_clear_misses(self, reason: str = None, key: str = None) -> schemas.Response:
+        """
+        API：清除缺失结果缓存
+        """
+        if not self._store:
+            return schemas.Response(success=False, message="缓存未初始化")
+        cleared = self._store.clear_misses(reason=reason, key=key)
+        return schemas.Response(success=True, message=f"已清除 {cleared} 条")
+
+    def api_breakers(self) -> schemas.Response:
+        """
+        API：查看熔断状态
+        """
+        return schemas.Response(success=True, data={
+            "breakers": self._breakers.snapshot(),
+            "delayed_jobs": self._jobs.delayed()
+        })
+
+    def api_profile(self, mode: str = "cprofile") -> schemas.Response:
+        """
+        API：预约剖析下一次运行
+        """
+        if mode == "off":
+            self._profiler.disarm()
+            return schemas.Response(success=True, message="已取消剖析预约")
+        if mode not in RunProfiler.MODES:
+            return schemas.Response(success=False, message=f"不支持的剖析模式：{mode}")
+        if self._profiler.active:
+            return schemas.Response(success=False, message="正在剖析中，请等待本次运行结束")
+        self._profiler.arm(mode)
+        return schemas.Response(success=True, message=f"已预约剖析下一次刮削运行（{mode}）")
+
+    def api_profile_result(self) -> schemas.Response:
+        """
+        API：查看最近一次剖析结果
+        """
+        summary = self.get_data("last_profile")
+        if not summary:
+            return schemas.Response(success=False, message="暂无剖析结果")
+        return schemas.Response(success=True, data=summary)
+
+    def api_plan(self, order: str = None) -> schemas.Response:
+        """
+        API：后台生成变更集
+        """
+        if self._scan_locks[Lane.BACKFILL].locked():
+            return schemas.Response(success=False, message="媒体库扫描进行中，请稍后")
+        threading.Thread(target=self.plan_library, kwargs={"order": order}, daemon=True).start()
+        return schemas.Response(success=True, message="已开始生成变更集，进度请查看日志")
+
+    def api_plans(self) -> schemas.Response:
+        """
+        API：查看变更集
+        """
+        plans = []
+        for path in reversed(self.__plan_files()):
+            try:
+                plans.append(summarize_plan(path))
+            except Exception as err:
+                plans.append({"path": str(path), "error": str(err)})
+        return schemas.Response(success=True, data={"plans": plans})
+
+    def api_apply_plan(self, path: str = None) -> schemas.Response:
+        """
+        API：后台应用变更集
+        """
+        if self._apply_lock.locked():
+            return schemas.Response(success=False, message="正在应用变更集，请稍后")
+        plan_path = self.__data_file("plans", path) if path else None
+        if path and not plan_path:
+            return schemas.Response(success=False, message="只能指定插件数据目录 plans 中的变更集")
+        threading.Thread(target=self.apply_plan, args=(plan_path,), daemon=True).start()
+        return schemas.Response(success=True, message="已开始应用变更集，进度请查看日志")
+
+    def api_plan_diff(self, old: str = None, new: str = None) -> schemas.Response:
+        """
+        API：比较两个变更集
+        """
+        files = self.__plan_files()
+        new_path = self.__data_file("plans", new) if new else (files[-1] if files else None)
+        old_path = self.__data_file("plans", old) if old else (files[-2] if len(files) > 1 else None)
+        if (new and not new_path) or (old and not old_path):
+            return schemas.Response(success=False, message="只能指定插件数据目录 plans 中的变更集")
+        if not old_path or not new_path:
+            return schemas.Response(success=False, message="变更集不足两个")
+        try:
+            return schemas.Response(success=True, data={"old": str(old_path), "new": str(new_path),
+                                                        **diff_plans(old_path, new_path)})
+        except Exception as err:
+            return schemas.Response(success=False, message=str(err))
+
+    @eventmanager.register(EventType.PluginAction)
+    def handle_action(self, event: Event):
+        """
+        处理远程命令
+        """
+        event_data = event.event_data if event else None
+        if not event_data:
+            return
+        action = event_data.get("action")
+        channel, userid = event_data.get("channel"), event_data.get("user")
+        arg = (event_data.get("arg_str") or "").strip()
+        if action == "personmetamod_import":
+            def __import():
+                imported, skipped = self.import_person_dump(arg or None)
+                self.post_message(channel=channel, title="人物缓存导入完成",
+                                  text=f"导入 {imported} 条，跳过 {skipped} 条", userid=userid)
+
+            self.__run_background(__import, name="导入人物缓存")
+        elif action == "personmetamod_export":
+            def __export():
+                path = self.export_cache_snapshot()
+                self.post_message(channel=channel, title="缓存快照导出" + ("完成" if path else "失败"),
+                                  text=str(path) if path else "请查看日志", userid=userid)
+
+            self.__run_background(__export, name="导出缓存快照")
+        elif action == "personmetamod_restore":
+            def __restore():
+                counts = self.import_cache_snapshot(arg or None)
+                self.post_message(channel=channel, title="缓存快照合并完成",
+                                  text="，".join(f"{k} {v} 条" for k, v in counts.items()) or "未合并任何数据",
+                                  userid=userid)
+
+            self.__run_background(__restore, name="合并缓存快照")
+        elif action == "personmetamod_misses" and self._store:
+            counts = self._store.miss_counts()
+            text = "\n".join(f"{CacheStore.MISS_REASONS.get(k, k)}（{k}）：{v} 条" for k, v in counts.items())
+            self.post_message(channel=channel, title="缺失结果缓存",
+                              text=text or "暂无缺失结果", userid=userid)
+        elif action == "personmetamod_clear_misses" and self._store:
+            cleared = self._store.clear_misses(reason=arg or None)
+            self.post_message(channel=channel, title="缺失结果缓存已清除",
+                              text=f"共清除 {cleared} 条", userid=userid)
+        elif action == "personmetamod_plan":
+            def __plan():
+                path = self.plan_library()
+                summary = summarize_plan(path) if path else None
+                self.post_message(channel=channel, title="变更集生成" + ("完成" if path else "失败"),
+                                  text=f"{path}\n共 {summary.get('ops')} 项变更" if summary else "请查看日志",
+                                  userid=userid)
+
+            self.__run_background(__plan, name="生成变更集")
+        elif action == "personmetamod_apply":
+            def __apply():
+                stats = self.apply_plan(arg or None)
+                self.post_message(channel=channel, title="变更集应用完成",
+                                  text=f"成功 {stats.get('applied', 0)}，失败 {stats.get('failed', 0)}，"
+                                       f"已跳过 {stats.get('skipped', 0)}", userid=userid)
+
+            self.__run_background(__apply, name="应用变更集")
+
+    def __run_background(self, func, name: str):
+        """
+        在插件的后台调度器中立即运行一次，不阻塞事件处理；停止插件时与其它后台任务一同停止
+        """
+        if not self._scheduler:
+            self._scheduler = BackgroundScheduler(timezone=settings.TZ)
+        self._scheduler.add_job(func=func, trigger='date', name=name,
+                                run_date=datetime.datetime.now(tz=pytz.timezone(settings.TZ)))
+        if not self._scheduler.running:
+            self._scheduler.start()
+        logger.info(f"{name}已在后台开始，完成后发送通知")
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
         注册插件公共服务
         """
+        services = []
         if self._enabled and self._cron:
-            return [{
+            services.append({
                 "id": "personmetamod",
                 "name": "演职人员刮削服务(Mod)",
                 "trigger": CronTrigger.from_crontab(self._cron),
                 "func": self.scrap_library,
                 "kwargs": {}
-            }]
+            })
+        if self._enabled and self._recent_cron:
+            services.append({
+                "id": "personmetamod_recent",
+                "name": "演职人员近期入库刮削服务(Mod)",
+                "trigger": CronTrigger.from_crontab(self._recent_cron),
+                "func": self.scrap_library,
+                "kwargs": {
+                    "order": self._scan_order if self._scan_order != "default" else "created",
+                    "days": self._recent_days,
+                    "lane": Lane.RECENT
+                }
+            })
+        if self._enabled and self._changes_cron:
+            services.append({
+                "id": "personmetamod_changes",
+                "name": "演职人员变更刷新服务(Mod)",
+                "trigger": CronTrigger.from_crontab(self._changes_cron),
+                "func": self.refresh_changes,
+                "kwargs": {}
+            })
+        return services
 
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         """
@@ -280,22 +805,647 @@ class personmetamod(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'request_budget',
+                                            'label': '单条目请求预算',
+                                            'placeholder': '0为不检查',
+                                            'hint': '单个媒体条目的上游请求数超过该值时记为异常',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VCronField',
+                                        'props': {
+                                            'model': 'changes_cron',
+                                            'label': 'TMDB变更刷新周期',
+                                            'placeholder': '5位cron表达式',
+                                            'hint': '仅刷新TMDB上有变更且已刮削过的人物',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'cache_days',
+                                            'label': '人物缓存有效期（天）',
+                                            'placeholder': '7'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'miss_days',
+                                            'label': '缺失结果缓存有效期（天）',
+                                            'placeholder': '3',
+                                            'hint': '缺少TMDB ID、TMDB不存在、未匹配豆瓣的结果在有效期内不再重试',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'image_cache_mb',
+                                            'label': '本地图片缓存上限（MB）',
+                                            'placeholder': '512',
+                                            'hint': 'Emby上传图片时优先读取本地缓存，0为不缓存',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'async_engine',
+                                            'label': '异步引擎',
+                                            'hint': '需要安装aiohttp，并发预取人物详情与TMDB数据',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 8
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'async_concurrency',
+                                            'label': '异步引擎各上游并发数',
+                                            'placeholder': 'tmdb=32,emby=16,jellyfin=16'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'breaker_failures',
+                                            'label': '熔断连续失败次数',
+                                            'placeholder': '5',
+                                            'hint': '连续失败达到次数后暂停请求该依赖，0为不熔断',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'breaker_slow',
+                                            'label': '慢调用阈值（秒）',
+                                            'placeholder': '20',
+                                            'hint': '超过该耗时的请求计为失败，0为不检查',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'breaker_cooldown',
+                                            'label': '熔断冷却时间（秒）',
+                                            'placeholder': '60',
+                                            'hint': '冷却后发送探测请求，探测失败冷却时间加倍',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'profile_next',
+                                            'label': '剖析下一次运行',
+                                            'items': [
+                                                {'title': '不剖析', 'value': ''},
+                                                {'title': '确定性剖析（cProfile）', 'value': 'cprofile'},
+                                                {'title': '采样剖析（火焰图）', 'value': 'sampling'}
+                                            ],
+                                            'hint': '剖析下一次全库扫描或入库刮削，结果保存在插件数据目录profiles中',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'apply_concurrency',
+                                            'label': '应用变更集并发数',
+                                            'placeholder': '4',
+                                            'hint': '应用变更集时每个服务器同时进行的写入数',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 8
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'rate_limits',
+                                            'label': '上游限速（次/秒）',
+                                            'placeholder': 'tmdb=40,douban=0.5,emby=20',
+                                            'hint': '实时刮削与全库扫描共用，全库扫描会为实时刮削保留部分余量，留空为不限速',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'fanout',
+                                            'label': '跨服务器同步写入',
+                                            'hint': '人物处理一次后同步写入其它服务器中TMDB ID相同的人物',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'scan_order',
+                                            'label': '扫描顺序',
+                                            'items': [
+                                                {'title': '媒体库默认', 'value': 'default'},
+                                                {'title': '最近添加优先', 'value': 'created'},
+                                                {'title': '最近修改优先', 'value': 'modified'}
+                                            ]
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VCronField',
+                                        'props': {
+                                            'model': 'recent_cron',
+                                            'label': '近期入库扫描周期',
+                                            'placeholder': '5位cron表达式',
+                                            'hint': '仅扫描近期添加或修改的条目，可与全库扫描搭配使用',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'recent_days',
+                                            'label': '近期范围（天）',
+                                            'placeholder': '7'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'run_minutes',
+                                            'label': '全库扫描单次最长运行（分钟）',
+                                            'placeholder': '0为不限制',
+                                            'hint': '达到限制后停止，下次定时运行从中断处继续',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'run_requests',
+                                            'label': '全库扫描单次最多上游请求数',
+                                            'placeholder': '0为不限制',
+                                            'hint': '达到限制后停止，下次定时运行从中断处继续',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        ], {
+            "enabled": False,
+            "onlyonce": False,
+            "cron": "",
+            "type": "all",
+            "delay": 30,
+            "remove_nozh": False,
+            "request_budget": 0,
+            "cache_days": 7,
+            "changes_cron": "",
+            "rate_limits": "tmdb=40",
+            "scan_order": "default",
+            "recent_cron": "",
+            "recent_days": 7,
+            "run_minutes": 0,
+            "run_requests": 0,
+            "miss_days": 3,
+            "fanout": False,
+            "image_cache_mb": 512,
+            "async_engine": False,
+            "async_concurrency": "tmdb=32,emby=16,jellyfin=16",
+            "breaker_failures": 5,
+            "breaker_slow": 20,
+            "breaker_cooldown": 60,
+            "profile_next": "",
+            "apply_concurrency": 4
+        }
+
+    def get_page(self) -> List[dict]:
+        """
+        拼装插件详情页面，展示刮削运行状态
+        """
+
+        def __format_seconds(seconds: Optional[float]) -> str:
+            if seconds is None:
+                return "-"
+            seconds = int(seconds)
+            return f"{seconds // 3600}时{seconds % 3600 // 60}分{seconds % 60}秒"
+
+        def __format_time(timestamp: Optional[float]) -> str:
+            if not timestamp:
+                return "-"
+            return datetime.datetime.fromtimestamp(
+                timestamp, tz=pytz.timezone(settings.TZ)).strftime("%Y-%m-%d %H:%M:%S")
+
+        def __card(title: str, value: Any, md: int = 3) -> dict:
+            return {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12,
+                    'md': md
+                },
+                'content': [
+                    {
+                        'component': 'VCard',
+                        'props': {
+                            'variant': 'tonal'
+                        },
+                        'content': [
+                            {
+                                'component': 'VCardText',
+                                'content': [
+                                    {
+                                        'component': 'div',
+                                        'props': {
+                                            'class': 'text-caption'
+                                        },
+                                        'text': title
+                                    },
+                                    {
+                                        'component': 'div',
+                                        'props': {
+                                            'class': 'text-h6 text-truncate'
+                                        },
+                                        'text': str(value) if value not in [None, ""] else "-"
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+
+        state = self._runstate.snapshot()
+        if state.get("running"):
+            status = "运行中"
+        elif state.get("finished_at"):
+            status = f"已完成（{__format_time(state.get('finished_at'))}）"
+        else:
+            status = "未运行"
+
+        cards = [
+            __card("状态", status),
+            __card("开始时间", __format_time(state.get("started_at"))),
+            __card("已运行", __format_seconds(state.get("elapsed"))),
+            __card("预计剩余", __format_seconds(state.get("eta"))),
+            __card("当前服务器", state.get("server")),
+            __card("当前媒体库", state.get("library")),
+            __card("当前条目", state.get("item"), md=6),
+            __card("条目进度", f"{state.get('items_done')} / {state.get('items_total')}"),
+            __card("人物进度", f"{state.get('persons_done')} / {state.get('persons_total')}"),
+            __card("处理速度", f"{state.get('persons_rate'):.1f} 人/分钟"),
+            __card("待处理", f"条目 {state.get('items_pending')}，当前条目人物 {state.get('persons_pending')}"),
+        ]
+        queue = self._jobs.pending()
+        running_lane = self._jobs.running_lane
+        cards.append(__card("任务队列", f"实时 {queue.get('realtime')}，最近入库 {queue.get('recent')}，"
+                                    f"回填 {queue.get('backfill')}，熔断延后 {self._jobs.delayed()}"
+                                    + (f"（执行中：{running_lane.name.lower()}）" if running_lane is not None else "")))
+        person_stat = self._person_cache.stats()
+        cards.append(__card("人物缓存",
+                            f"{person_stat.get('entries')} 人，命中率 {person_stat.get('hit_rate'):.1%}"))
+        if self._store:
+            store_stat = self._store.stats()
+            cards.append(__card("持久化缓存", f"人物 {store_stat.get('persons')}，台账 {store_stat.get('ledger')}，"
+                                         f"豆瓣 {store_stat.get('douban')}，图片 {store_stat.get('images')}"))
+            if self._blobs:
+                blob_stat = self._blobs.stats()
+                cards.append(__card("图片缓存", f"{blob_stat.get('entries')} 张，"
+                                            f"{StringUtils.str_filesize(blob_stat.get('bytes'))}"
+                                            f"/{StringUtils.str_filesize(blob_stat.get('max_bytes'))}，"
+                                            f"命中率 {blob_stat.get('hit_rate'):.1%}"))
+            miss_counts = self._store.miss_counts()
+            cards.append(__card("缺失结果缓存", "，".join(f"{CacheStore.MISS_REASONS.get(k, k)} {v}"
+                                                        for k, v in miss_counts.items()) or "无"))
+        last_profile = self.get_data("last_profile") or {}
+        if self._profiler.active:
+            profile_text = "剖析中"
+        elif self._profiler.armed:
+            profile_text = f"已预约（{self._profiler.armed}）"
+        elif last_profile:
+            profile_text = f"{__format_time(last_profile.get('started_at'))} {last_profile.get('label')}，" \
+                           + "，".join(x.get("name") for x in (last_profile.get("top") or [])[:3])
+        else:
+            profile_text = "无"
+        cards.append(__card("性能剖析", profile_text, md=6))
+        last_plan = self.get_data("last_plan")
+        if last_plan:
+            cards.append(__card("最新变更集", f"{__format_time(last_plan.get('created_at'))}，"
+                                         f"{last_plan.get('ops')} 项，已应用 {last_plan.get('applied', 0)} 项", md=6))
+        for name, stat in text_cache.stats().items():
+            cards.append(__card(f"文本缓存 {name}",
+                                f"命中率 {stat.get('hit_rate'):.1%}（{stat.get('hits')}/{stat.get('hits') + stat.get('misses')}）"))
+
+        def __table(headers: List[str], rows: List[List[Any]], empty_text: str) -> dict:
+            return {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VTable',
+                        'props': {
+                            'hover': True
+                        },
+                        'content': [
+                            {
+                                'component': 'thead',
+                                'content': [
+                                    {
+                                        'component': 'tr',
+                                        'content': [
+                                            {
+                                                'component': 'th',
+                                                'props': {
+                                                    'class': 'text-start ps-4'
+                                                },
+                                                'text': header
+                                            } for header in headers
+                                        ]
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'tbody',
+                                'content': [
+                                    {
+                                        'component': 'tr',
+                                        'content': [
+                                            {
+                                                'component': 'td',
+                                                'text': str(cell)
+                                            } for cell in row
+                                        ]
+                                    } for row in rows
+                                ] or [
+                                    {
+                                        'component': 'tr',
+                                        'content': [
+                                            {
+                                                'component': 'td',
+                                                'props': {
+                                                    'colspan': len(headers),
+                                                    'class': 'text-center'
+                                                },
+                                                'text': empty_text
+                                            }
+                                        ]
+                                    }
+                                ]
                             }
                         ]
                     }
                 ]
             }
-        ], {
-            "enabled": False,
-            "onlyonce": False,
-            "cron": "",
-            "type": "all",
-            "delay": 30,
-            "remove_nozh": False
-        }
 
-    def get_page(self) -> List[dict]:
-        pass
+        budget = self._budget.snapshot()
+        upstream_rows = [[name, stat.get("requests"), StringUtils.str_filesize(stat.get("bytes")),
+                          stat.get("per_item")] for name, stat in budget.get("upstreams", {}).items()]
+        upstream_rows += [[f"{name}:304（免下载）", stat.get("count"), StringUtils.str_filesize(stat.get("saved_bytes")),
+                           "-"] for name, stat in budget.get("revalidated", {}).items()]
+        upstream_rows += [[f"{name}（未变化，免上传）", count, "-", "-"] for name, count in budget.get("skipped", {}).items()]
+        outlier_rows = [[__format_time(outlier.get("time")), outlier.get("title"), outlier.get("requests"),
+                         StringUtils.str_filesize(outlier.get("bytes")),
+                         "，".join(f"{k} {v}" for k, v in outlier.get("detail", {}).items())]
+                        for outlier in budget.get("outliers") or []]
+        error_rows = [[__format_time(error_time), message] for error_time, message in state.get("errors") or []]
+        breaker_states = {"closed": "正常", "open": "熔断", "half_open": "探测中"}
+        breaker_rows = [[breaker.get("key"),
+                         breaker_states.get(breaker.get("state"), breaker.get("state"))
+                         + (f"（{int(breaker.get('retry_after'))}秒后重试）" if breaker.get("retry_after") else ""),
+                         breaker.get("calls"), breaker.get("failed"), breaker.get("slow"), breaker.get("rejected"),
+                         breaker.get("opened"), f"{breaker.get('latency'):.2f}秒", breaker.get("last_error") or "-"]
+                        for breaker in self._breakers.snapshot()]
+
+        return [
+            {
+                'component': 'VRow',
+                'content': cards
+            },
+            {
+                'component': 'VRow',
+                'content': [
+                    __table(["上游", "请求数", "流量", "平均每条目"], upstream_rows, "暂无请求统计"),
+                    __table(["依赖", "状态", "调用", "失败", "慢调用", "拒绝", "熔断次数", "平均耗时", "最近错误"],
+                            breaker_rows, "暂无熔断统计"),
+                    __table(["时间", "超预算条目", "请求数", "流量", "明细"], outlier_rows, "暂无超预算条目"),
+                    __table(["时间", "最近错误"], error_rows, "暂无错误")
+                ]
+            }
+        ]
 
     def service_infos(self, type_filter: Optional[str] = None) -> Optional[Dict[str, ServiceInfo]]:
         """
@@ -341,55 +1491,614 @@ class personmetamod(_PluginBase):
         # 延迟
         if self._delay:
             time.sleep(int(self._delay))
-        # 查询媒体服务器中的条目
-        existsinfo = self.chain.media_exists(mediainfo=mediainfo)
-        if not existsinfo or not existsinfo.itemid:
-            logger.warn(f"{mediainfo.title_year} 在媒体库中不存在")
-            return
-        # 查询条目详情
-        iteminfo = MediaServerChain().iteminfo(server=existsinfo.server, item_id=existsinfo.itemid)
-        if not iteminfo:
-            logger.warn(f"{mediainfo.title_year} 条目详情获取失败")
+        # 交由调度器在实时通道中执行，优先于正在进行的全库扫描
+        self._jobs.submit(Lane.REALTIME, self.__scrap_media, mediainfo, meta.begin_season,
+                          name=mediainfo.title_year)
+
+    def __scrap_media(self, mediainfo: MediaInfo, season: int = None, attempt: int = 0):
+        """
+        刮削入库媒体的演员信息，依赖熔断时延后重新排队
+        """
+        profiling = not attempt and self._profiler.start(f"实时刮削 {mediainfo.title_year}")
+        if profiling:
+            self._profiler.enter()
+        try:
+            # 查询媒体服务器中的条目
+            existsinfo = self.chain.media_exists(mediainfo=mediainfo)
+            if not existsinfo or not existsinfo.itemid:
+                logger.warn(f"{mediainfo.title_year} 在媒体库中不存在")
+                return
+            try:
+                self._breakers.ensure([existsinfo.server, "tmdb"])
+                # 查询条目详情
+                iteminfo = MediaServerChain().iteminfo(server=existsinfo.server, item_id=existsinfo.itemid)
+                if not iteminfo:
+                    logger.warn(f"{mediainfo.title_year} 条目详情获取失败")
+                    return
+                # 刮削演职人员信息
+                with self._budget.item(mediainfo.title_year):
+                    self.__update_item(server=existsinfo.server, server_type=existsinfo.server_type,
+                                       item=iteminfo, mediainfo=mediainfo, season=season)
+            except CircuitOpenError as err:
+                if self._event.is_set():
+                    return
+                if attempt >= self._defer_attempts:
+                    logger.warn(f"{err.key} 持续熔断，{mediainfo.title_year} 放弃刮削")
+                    self._runstate.error(f"{mediainfo.title_year} 因 {err.key} 熔断放弃刮削")
+                    return
+                logger.info(f"{err}，{mediainfo.title_year} 延后处理")
+                self._jobs.submit_later(err.retry_after, Lane.REALTIME, self.__scrap_media, mediainfo, season,
+                                        attempt + 1, name=mediainfo.title_year)
+        finally:
+            if profiling:
+                self._profiler.exit()
+                self.__finish_profile("realtime")
+
+    def scrap_library(self, order: str = None, days: float = 0, lane: Lane = Lane.BACKFILL):
+        """
+        扫描媒体库，刮削演员信息
+        :param order: 扫描顺序，default 媒体库默认，created 最近添加优先，modified 最近修改优先
+        :param days: 仅扫描最近若干天内添加（created）或修改（其它顺序）的条目，0为全部
+        :param lane: 调度通道
+        """
+        scan_lock = self._scan_locks[lane]
+        if not scan_lock.acquire(blocking=False):
+            logger.warn("上一次媒体库扫描尚未结束，本次跳过")
             return
-        # 刮削演职人员信息
-        self.__update_item(server=existsinfo.server, server_type=existsinfo.server_type,
-                           item=iteminfo, mediainfo=mediainfo, season=meta.begin_season)
+        profiling = self._profiler.start(f"媒体库扫描（{order or self._scan_order}）")
+        if profiling:
+            self._profiler.enter()
+        try:
+            self.__scrap_library(order=order, days=days, lane=lane)
+        finally:
+            scan_lock.release()
+            if profiling:
+                self._profiler.exit()
+                self.__finish_profile("library")
+
+    def plan_library(self, order: str = None) -> Optional[Path]:
+        """
+        计划模式扫描媒体库：照常读取媒体服务器与上游数据并计算变更，写操作只记入变更集，返回变更集路径
+        """
+        if not self._scan_locks[Lane.BACKFILL].acquire(blocking=False):
+            logger.warn("媒体库扫描进行中，本次不生成变更集")
+            return None
+        path = self.get_data_path() / "plans" / f"plan-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.jsonl.gz"
+        writer = PlanWriter(path, meta={"order": order or self._scan_order,
+                                        "servers": list((self.service_infos() or {}).keys())})
+        try:
+            self.__scrap_library(order=order, plan=writer)
+        except Exception as err:
+            writer.abort()
+            logger.error(f"生成变更集失败：{str(err)}")
+            return None
+        finally:
+            self._scan_locks[Lane.BACKFILL].release()
+        counts = writer.close()
+        self.save_data("last_plan", {"path": str(path), "created_at": time.time(), "ops": len(latest_ops(path))})
+        logger.info(f"变更集已生成：{path}，" + "，".join(f"{k} {v} 项" for k, v in counts.items()))
+        return path
+
+    def __data_file(self, folder: str, path) -> Optional[Path]:
+        """
+        解析用户指定的文件：相对路径按插件数据目录下的 folder 解析，不在该目录中或不存在时返回None
+        """
+        base = (self.get_data_path() / folder).resolve()
+        file = (base / path).resolve()
+        if not file.is_relative_to(base) or not file.is_file():
+            logger.warn(f"只能指定插件数据目录 {folder} 中的文件：{path}")
+            return None
+        return file
 
-    def scrap_library(self):
+    def __plan_files(self) -> List[Path]:
+        """
+        按时间排序的变更集文件
+        """
+        return sorted((self.get_data_path() / "plans").glob("plan-*.jsonl.gz"))
+
+    def apply_plan(self, path: Path = None) -> Dict[str, int]:
+        """
+        应用变更集：先写入人物资料与图片，再改写条目的人物列表，每个服务器分别使用独立的线程池并发写入
+        已成功的变更记入进度文件，失败后重新应用时跳过，无需重新获取数据
+        :param path: 变更集文件，只能位于插件数据目录 plans 中，未指定时应用最新的变更集
+        """
+        if path:
+            path = self.__data_file("plans", path)
+            if not path:
+                return {}
+        else:
+            files = self.__plan_files()
+            if not files:
+                logger.warn("没有可应用的变更集")
+                return {}
+            path = files[-1]
+        stats = {"applied": 0, "failed": 0, "skipped": 0}
+
+        def __apply_op(_op: dict) -> bool:
+            if _op.get("op") == "image":
+                return bool(self.set_item_image(server=_op.get("server"), server_type=_op.get("server_type"),
+                                                itemid=_op.get("item_id"), imageurl=_op.get("data")))
+            iteminfo = _op.get("data")
+            if _op.get("partial"):
+                # 只记录了变化的字段，合并到媒体项的当前详情上
+                current = self.get_iteminfo(server=_op.get("server"), server_type=_op.get("server_type"),
+                                            itemid=_op.get("item_id"))
+                if not current:
+                    return False
+                iteminfo = {**current, **iteminfo}
+            return bool(self.set_iteminfo(server=_op.get("server"), server_type=_op.get("server_type"),
+                                          itemid=_op.get("item_id"), iteminfo=iteminfo))
+
+        def __collect(_futures: Dict[Future, dict], _progress, _block: bool):
+            done, _ = wait(list(_futures), return_when=FIRST_COMPLETED) if _block else \
+                ([x for x in _futures if x.done()], None)
+            for future in done:
+                _op = _futures.pop(future)
+                try:
+                    ok = future.result()
+                except CircuitOpenError as err:
+                    ok = False
+                    logger.debug(f"{err}，变更 {_op.get('i')} 留待重新应用")
+                except Exception as err:
+                    ok = False
+                    logger.error(f"应用变更 {_op.get('i')} 失败：{str(err)}")
+                if ok:
+                    stats["applied"] += 1
+                    _progress.write(f"{_op.get('i')}\n")
+                    _progress.flush()
+                else:
+                    stats["failed"] += 1
+                self._runstate.item_done()
+
+        if not self._apply_lock.acquire(blocking=False):
+            logger.warn("正在应用变更集，本次跳过")
+            return stats
+        service_infos = self.service_infos() or {}
+        pools: Dict[str, ThreadPoolExecutor] = {}
+        try:
+            latest = latest_ops(path)
+            done_ops = applied_ops(path) & latest
+            stats["skipped"] = len(done_ops)
+            logger.info(f"开始应用变更集 {path}，共 {len(latest)} 项，已应用 {len(done_ops)} 项")
+            if self._runstate.start(mode="apply", items_total=len(latest) - len(done_ops)):
+                self._budget.reset()
+            max_pending = max(self._apply_concurrency, 1) * max(len(service_infos), 1) * 4
+            with open(progress_path(path), "a", encoding="utf-8") as progress:
+                # 人物写完后再改写条目人物列表
+                for phase in (0, 1):
+                    futures: Dict[Future, dict] = {}
+                    for op in iter_plan(path):
+                        if self._event.is_set():
+                            break
+                        if op.get("i") not in latest or op.get("i") in done_ops or op_phase(op) != phase:
+                            continue
+                        if op.get("server") not in service_infos:
+                            stats["failed"] += 1
+                            continue
+                        pool = pools.get(op.get("server"))
+                        if not pool:
+                            pool = pools[op.get("server")] = ThreadPoolExecutor(
+                                max_workers=max(self._apply_concurrency, 1),
+                                thread_name_prefix=f"personmetamod-apply-{op.get('server')}")
+                        futures[pool.submit(__apply_op, op)] = op
+                        # 限制在途变更数，内存占用与变更集大小无关
+                        __collect(futures, progress, _block=len(futures) >= max_pending)
+                    while futures:
+                        __collect(futures, progress, _block=True)
+        except Exception as err:
+            logger.error(f"应用变更集失败：{str(err)}")
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+            self._runstate.finish()
+            self._apply_lock.release()
+        last_plan = self.get_data("last_plan") or {}
+        if last_plan.get("path") == str(path):
+            last_plan["applied"] = stats["applied"] + stats["skipped"]
+            self.save_data("last_plan", last_plan)
+        logger.info(f"变更集应用完成：成功 {stats['applied']}，失败 {stats['failed']}，已跳过 {stats['skipped']}")
+        return stats
+
+    def __finish_profile(self, kind: str):
         """
-        扫描整个媒体库，刮削演员信息
+        结束剖析，结果写入插件数据目录的 profiles 中
         """
+        path = self.get_data_path() / "profiles" / \
+            f"profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{kind}"
+        try:
+            summary = self._profiler.stop(path)
+        except Exception as err:
+            logger.error(f"写出剖析结果失败：{str(err)}")
+            return
+        if summary:
+            self.save_data("last_profile", summary)
+
+    def __scrap_library(self, order: str = None, days: float = 0, lane: Lane = Lane.BACKFILL,
+                        plan: PlanWriter = None):
         # 所有媒体服务器
         service_infos = self.service_infos()
         if not service_infos:
             return
+        order = order or self._scan_order
+        since = datetime.datetime.now(tz=pytz.utc) - datetime.timedelta(days=days) if days else None
+        if since and order == "default":
+            order = "modified"
+        # 全库扫描可限制单次运行的时长与请求数，未完成部分由下次运行从游标处继续
+        budgeted = lane == Lane.BACKFILL and not since and not plan and bool(self._run_minutes or self._run_requests)
+        cursor = (self.get_data("scan_cursor") or {}) if budgeted else {}
+        if cursor.get("order") != order:
+            cursor = {"order": order, "positions": {}}
+        positions: Dict[str, dict] = cursor["positions"]
         mediaserverchain = MediaServerChain()
-        for server, service in service_infos.items():
-            # 扫描所有媒体库
-            logger.info(f"开始刮削服务器 {server} 的演员信息 ...")
-            for library in mediaserverchain.librarys(server):
-                logger.info(f"开始刮削媒体库 {library.name} 的演员信息 ...")
-                for item in mediaserverchain.items(server, library.id):
-                    if not item:
-                        continue
-                    if not item.item_id:
-                        continue
-                    if "Series" not in item.item_type \
-                            and "Movie" not in item.item_type:
-                        continue
-                    if self._event.is_set():
-                        logger.info(f"演职人员刮削服务停止")
+        libraries = [(server, service, library) for server, service in service_infos.items()
+                     for library in mediaserverchain.librarys(server)]
+        # 条目边枚举边提交，总数随提交累加；近期扫描可能在全库扫描期间运行，此时沿用正在进行的运行统计
+        if self._runstate.start(mode="plan" if plan else "recent" if since else "library"):
+            self._budget.reset()
+            with self._fanout_lock:
+                self._fanout_done.clear()
+        deadline = time.time() + self._run_minutes * 60 if budgeted and self._run_minutes else None
+        exhausted = threading.Event()
+        # 各媒体库已提交但尚未完成的条目 {序号: 条目ID}，延后处理的条目晚于后面的条目完成，游标停在最小的未完成序号
+        unfinished: Dict[str, Dict[int, str]] = {}
+        # 各媒体库下一个尚未提交的条目 (序号, 条目ID)，全部提交后为None
+        frontier: Dict[str, Optional[Tuple[int, Optional[str]]]] = {}
+        cursor_lock = threading.Lock()
+        completed = [0]
+
+        def __save_cursor():
+            with cursor_lock:
+                for _key, _pending in unfinished.items():
+                    _candidates = dict(_pending)
+                    if frontier.get(_key):
+                        _candidates.setdefault(*frontier[_key])
+                    if _candidates:
+                        low = min(_candidates)
+                        positions[_key] = {"next_id": _candidates[low], "count": low, "finished": False}
+                    else:
+                        positions[_key] = {"finished": True}
+                cursor["updated_at"] = time.time()
+            self.save_data("scan_cursor", cursor)
+
+        def __item_finished(_key: str, _index: int):
+            with cursor_lock:
+                unfinished[_key].pop(_index, None)
+                completed[0] += 1
+                save = budgeted and completed[0] % 20 == 0
+            if save:
+                __save_cursor()
+
+        def __stopped() -> bool:
+            return self._event.is_set() or exhausted.is_set() or group.cancelled
+
+        def __library_items(_server: str, _service: ServiceInfo, _library: MediaServerLibrary):
+            if order != "default" and _service.type in ["emby", "jellyfin"]:
+                return self.__iter_library_items(server=_server, server_type=_service.type,
+                                                 library_id=_library.id, order=order, since=since)
+            if order != "default":
+                logger.warn(f"服务器 {_server} 不支持按时间排序及筛选，将扫描全部条目")
+            return (item for item in mediaserverchain.items(_server, _library.id)
+                    if item and item.item_id and ("Series" in item.item_type or "Movie" in item.item_type))
+
+        def __scrap_item(_server: str, _server_type: str, _library: MediaServerLibrary, _item: MediaServerItem,
+                         _index: int, _attempt: int = 0):
+            if __stopped():
+                return
+            if budgeted and ((deadline and time.time() >= deadline)
+                             or (self._run_requests and self._budget.total_requests() >= self._run_requests)):
+                logger.info(f"本次媒体库扫描已达到运行预算，剩余条目将在下次运行时继续")
+                exhausted.set()
+                return
+            try:
+                # 依赖熔断中不发起任何请求，整个条目延后到冷却结束后重新排队
+                self._breakers.ensure([_server, "tmdb"])
+                logger.info(f"开始刮削 {_item.title} 的演员信息 ...")
+                self._runstate.set_position(server=_server, library=_library.name, item=_item.title)
+                # 计划模式下写操作只记入变更集
+                with self._budget.item(_item.title), self._plans.recording(plan):
+                    self.__update_item(server=_server, item=_item, server_type=_server_type)
+            except CircuitOpenError as err:
+                if _attempt >= self._defer_attempts:
+                    logger.warn(f"{err.key} 持续熔断，{_item.title} 本次跳过")
+                    self._runstate.error(f"{_item.title} 因 {err.key} 熔断跳过")
+                    __item_finished(f"{_server}|{_library.id}", _index)
+                    return
+                logger.info(f"{err}，{_item.title} 延后处理")
+                self._jobs.submit_later(err.retry_after, lane, __scrap_item, _server, _server_type, _library, _item,
+                                        _index, _attempt + 1, group=group, name=_item.title)
+                return
+            except Exception as err:
+                # 已执行过的条目不阻塞游标，否则每次运行都会从该条目重新开始
+                logger.error(f"{_item.title} 的演员信息刮削失败：{str(err)}")
+                self._runstate.error(f"{_item.title} 刮削失败：{str(err)}")
+                __item_finished(f"{_server}|{_library.id}", _index)
+                return
+            self._runstate.item_done()
+            logger.info(f"{_item.title} 的演员信息刮削完成")
+            __item_finished(f"{_server}|{_library.id}", _index)
+
+        # 逐条目提交到调度通道，实时任务可以插队；分批提交，排队的条目数不超过 _scan_batch
+        group = JobGroup("library")
+        try:
+            for server, service, library in libraries:
+                if __stopped():
+                    break
+                key = f"{server}|{library.id}"
+                position = positions.get(key)
+                with cursor_lock:
+                    unfinished[key] = {}
+                    frontier[key] = (position.get("count", 0), position.get("next_id")) if position else (0, None)
+                if position and position.get("finished"):
+                    with cursor_lock:
+                        frontier[key] = None
+                    continue
+                if position:
+                    logger.info(f"服务器 {server} 媒体库 {library.name} 从上次中断处继续")
+                submitted = 0
+                try:
+                    for index, item in resume_items(__library_items(server, service, library), position):
+                        with cursor_lock:
+                            frontier[key] = (index, item.item_id)
+                        while not group.wait_below(self._scan_batch, timeout=1) and not __stopped():
+                            pass
+                        if __stopped():
+                            break
+                        with cursor_lock:
+                            unfinished[key][index] = item.item_id
+                            frontier[key] = (index + 1, None)
+                        self._runstate.add_items(1)
+                        self._jobs.submit(lane, __scrap_item, server, service.type, library, item, index,
+                                          group=group, name=item.title)
+                        submitted += 1
+                    else:
+                        with cursor_lock:
+                            frontier[key] = None
+                except CircuitOpenError as err:
+                    logger.warn(f"{err}，媒体库 {library.name} 的剩余条目留待下次扫描")
+                logger.info(f"服务器 {server} 媒体库 {library.name} 共 {submitted} 个条目加入刮削队列")
+            while not group.wait(timeout=1):
+                if self._event.is_set():
+                    self._jobs.cancel([lane])
+                    break
+            group.wait()
+            if self._event.is_set() or group.cancelled:
+                logger.info(f"演职人员刮削服务停止")
+            elif exhausted.is_set():
+                logger.info(f"演职人员刮削已达到单次运行预算，共处理 {self._runstate.snapshot().get('items_done')} 个条目")
+            else:
+                logger.info(f"演职人员刮削完成")
+        finally:
+            self._runstate.finish()
+            if budgeted:
+                # 停止、取消（如保存配置时）、达到预算、熔断或异常中断时都有条目未执行，保存游标下次继续
+                if len(unfinished) < len(libraries) or any(unfinished.values()) or any(frontier.values()):
+                    __save_cursor()
+                else:
+                    # 所有条目都已执行，下次从头开始
+                    self.del_data("scan_cursor")
+
+    def __iter_library_items(self, server: str, server_type: str, library_id: str,
+                             order: str, since: datetime.datetime = None) -> Iterator[MediaServerItem]:
+        """
+        按添加/修改时间倒序分页获取媒体库中的电影和剧集，逐页返回，内存中只保留一页
+        最近添加优先时遇到早于时间窗口的条目即停止；最近修改优先时由服务器按保存时间筛选
+        """
+        date_field = "DateCreated" if order == "created" else "DateModified"
+        cutoff = since.strftime("%Y-%m-%dT%H:%M:%S") if since else None
+        start, limit = 0, 200
+        while True:
+            page = self.get_library_page(server=server, server_type=server_type, parentid=library_id,
+                                         sort_by=date_field, start=start, limit=limit,
+                                         min_saved=cutoff if order != "created" else None)
+            page_items = page.get("Items") or []
+            for data in page_items:
+                # 服务器时间均为UTC，比较到秒即可
+                date = (data.get(date_field) or "")[:19]
+                if cutoff and date and date < cutoff:
+                    if order == "created":
                         return
-                    # 处理条目
-                    logger.info(f"开始刮削 {item.title} 的演员信息 ...")
-                    self.__update_item(server=server, item=item, server_type=service.type)
-                    logger.info(f"{item.title} 的演员信息刮削完成")
-                logger.info(f"媒体库 {library.name} 的演员信息刮削完成")
-            logger.info(f"服务器 {server} 的演员信息刮削完成")
+                    continue
+                provider_ids = data.get("ProviderIds") or {}
+                yield MediaServerItem(server=server,
+                                      library=library_id,
+                                      item_id=data.get("Id"),
+                                      item_type=data.get("Type"),
+                                      title=data.get("Name"),
+                                      year=str(data.get("ProductionYear") or "") or None,
+                                      tmdbid=provider_ids.get("Tmdb"),
+                                      imdbid=provider_ids.get("Imdb"),
+                                      tvdbid=provider_ids.get("Tvdb"))
+            start += len(page_items)
+            if not page_items or start >= (page.get("TotalRecordCount") or 0):
+                break
+
+    def refresh_changes(self):
+        """
+        根据TMDB人物变更列表，仅刷新有变更且已刮削过的人物
+        每位人物作为最近入库通道的任务交由调度器执行，与媒体库扫描依次写入；
+        有人物未刷新成功时不推进同步时间，下次从原时间点重新刷新
+        """
+        if not settings.TMDB_API_KEY:
+            logger.error("未配置TMDB API KEY")
+            return
+        service_infos = self.service_infos()
+        if not service_infos or not self._store:
+            return
+        if not self._scan_locks[Lane.RECENT].acquire(blocking=False):
+            logger.warn("近期入库扫描进行中，本次不刷新，下次从上次同步时间继续")
+            return
+        try:
+            self.__refresh_changes(service_infos)
+        finally:
+            self._scan_locks[Lane.RECENT].release()
+
+    def __refresh_changes(self, service_infos: Dict[str, ServiceInfo]):
+        now = datetime.datetime.now(tz=pytz.utc)
+        last_sync = self.get_data("changes_synced_at")
+        since = datetime.datetime.fromisoformat(last_sync) if last_sync else now - datetime.timedelta(days=1)
+        logger.info(f"开始获取 {since.strftime('%Y-%m-%d')} 以来的TMDB人物变更 ...")
+        try:
+            changed = self.__get_tmdb_changed_persons(since=since, until=now)
+        except CircuitOpenError as err:
+            logger.warn(f"{err}，本次不刷新")
+            return
+        if changed is None:
+            logger.warn("获取TMDB人物变更列表失败，本次不刷新")
+            return
+        # 与缓存、台账求交集
+        cached = self._store.cached_tmdbids(changed)
+        ledger = self._store.ledger_entries(changed)
+        logger.info(f"TMDB共有 {len(changed)} 位人物变更，其中已缓存 {len(cached)} 位，"
+                    f"需要刷新媒体服务器中的人物 {len(ledger)} 位")
+        # 变更人物的缓存失效，使用时重新获取
+        self._person_cache.invalidate(cached)
+        if self._runstate.start(mode="changes", items_total=len(ledger)):
+            self._budget.reset()
+            with self._fanout_lock:
+                self._fanout_done.clear()
+        # 已刷新完成的人物，全部完成才推进同步时间
+        refreshed: Set[int] = set()
+
+        def __refresh_person(_tmdbid: int, _entries: List[dict]):
+            if self._event.is_set():
+                return
+            try:
+                record = self.__get_tmdb_person(_tmdbid)
+                if not record:
+                    # 已确认在TMDB中不存在的人物无需重试，其它情况（请求失败等）留待下次刷新
+                    if self.__get_miss(f"tmdb:{_tmdbid}"):
+                        refreshed.add(_tmdbid)
+                    else:
+                        logger.warn(f"TMDB人物 {_tmdbid} 获取失败，留待下次刷新")
+                    return
+                self._runstate.set_position(item=record.name)
+                with self._budget.item(f"人物 {record.name or _tmdbid}"):
+                    for entry in _entries:
+                        if entry.get("server") not in service_infos:
+                            continue
+                        self._runstate.set_position(server=entry.get("server"))
+                        self.__update_people(server=entry.get("server"), server_type=entry.get("server_type"),
+                                             people={"Id": entry.get("person_id"), "Name": record.name})
+                refreshed.add(_tmdbid)
+            except CircuitOpenError as err:
+                logger.warn(f"{err}，TMDB人物 {_tmdbid} 留待下次刷新")
+            finally:
+                self._runstate.item_done()
+
+        group = JobGroup("changes")
+        try:
+            for tmdbid, entries in ledger.items():
+                self._jobs.submit(Lane.RECENT, __refresh_person, tmdbid, entries, group=group,
+                                  name=f"TMDB人物 {tmdbid}")
+            while not group.wait(timeout=1):
+                if self._event.is_set():
+                    self._jobs.cancel([Lane.RECENT])
+                    break
+            group.wait()
+        finally:
+            self._runstate.finish()
+        if self._event.is_set():
+            logger.info(f"演职人员变更刷新服务停止")
+            return
+        if len(refreshed) < len(ledger):
+            logger.warn(f"{len(ledger) - len(refreshed)} 位人物未刷新成功，保留上次同步时间，下次重新刷新")
+            return
+        self.save_data("changes_synced_at", now.isoformat())
+        logger.info(f"TMDB人物变更刷新完成")
+
+    def import_person_dump(self, path: Path = None) -> Tuple[int, int]:
+        """
+        从JSONL人物导出文件流式导入人物缓存，返回 (导入条数, 跳过条数)
+        未指定路径时导入插件数据目录下 import 中的全部文件
+        :param path: 人物导出文件，只能位于插件数据目录 import 中
+        """
+        if not self._store:
+            return 0, 0
+        if path:
+            path = self.__data_file("import", path)
+            if not path:
+                return 0, 0
+            paths = [path]
+        else:
+            import_path = self.get_data_path() / "import"
+            paths = sorted(x for x in import_path.glob("*") if x.is_file()) if import_path.exists() else []
+        if not paths:
+            logger.warn("未找到人物导出文件")
+            return 0, 0
+        imported, skipped = 0, 0
+        with self._import_lock:
+            for file in paths:
+                logger.info(f"开始导入人物缓存：{file}")
+                stats = {}
+                batch = []
+                try:
+                    for record in iter_persons(file, stats):
+                        batch.append(record)
+                        if len(batch) >= 1000:
+                            imported += self._store.merge_persons(batch)
+                            batch = []
+                        if self._event.is_set():
+                            logger.info(f"人物缓存导入停止")
+                            break
+                    imported += self._store.merge_persons(batch)
+                except Exception as err:
+                    logger.error(f"导入人物缓存失败：{file}，{str(err)}")
+                skipped += stats.get("skipped", 0)
+                logger.info(f"{file} 导入完成，累计导入 {imported} 条，跳过 {skipped} 条")
+        return imported, skipped
+
+    def export_cache_snapshot(self) -> Optional[Path]:
+        """
+        导出缓存快照到插件数据目录下 export 中，返回文件路径
+        """
+        if not self._store:
+            return None
+        path = self.get_data_path() / "export" / f"snapshot-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.jsonl.gz"
+        try:
+            counts = export_snapshot(self._store, path)
+        except Exception as err:
+            logger.error(f"导出缓存快照失败：{str(err)}")
+            return None
+        logger.info(f"缓存快照已导出：{path}，" + "，".join(f"{k} {v} 条" for k, v in counts.items()))
+        return path
+
+    def import_cache_snapshot(self, path: Path = None) -> Dict[str, int]:
+        """
+        合并缓存快照，返回各表写入条数
+        未指定路径时合并插件数据目录下 export 中最新的快照
+        :param path: 缓存快照，只能位于插件数据目录 export 中
+        """
+        if not self._store:
+            return {}
+        if path:
+            path = self.__data_file("export", path)
+            if not path:
+                return {}
+        else:
+            export_path = self.get_data_path() / "export"
+            snapshots = sorted(export_path.glob("snapshot-*.jsonl.gz")) if export_path.exists() else []
+            if not snapshots:
+                logger.warn("未找到缓存快照")
+                return {}
+            path = snapshots[-1]
+        with self._import_lock:
+            logger.info(f"开始合并缓存快照：{path}")
+            try:
+                counts = import_snapshot(self._store, path)
+            except Exception as err:
+                logger.error(f"合并缓存快照失败：{path}，{str(err)}")
+                return {}
+        # 内存中的人物缓存可能比快照旧，清空后按需从持久化缓存加载
+        self._person_cache.clear()
+        logger.info(f"缓存快照合并完成：" + "，".join(f"{k} {v} 条" for k, v in counts.items()))
+        return counts
 
     def __update_peoples(self, server: str, server_type: str,
-                         itemid: str, iteminfo: dict, douban_actors):
+                         itemid: str, iteminfo: dict, douban_actors: DoubanCastIndex,
+                         resolved: Dict[str, Optional[str]] = None):
         # 处理媒体项中的人物信息
+        # resolved: 同一季内共享的人物解析结果 {人物Id: 写入后的姓名，None表示未更新}，
+        #           已解析的人物直接查表，不再请求媒体服务器和TMDB
         """
         "People": [
             {
@@ -403,20 +2112,40 @@ class personmetamod(_PluginBase):
         """
         peoples = []
         is_modified = False
+
+        # 异步引擎可用时，并发预取尚未解析的人物详情
+        prefetched = {}
+        if self._async_engine and AsyncEngine.available() and server_type in ["emby", "jellyfin"]:
+            prefetched = self.__prefetch_people(server=server, server_type=server_type,
+                                                people_ids=[x.get("Id") for x in iteminfo.get("People") or []
+                                                            if x.get("Name") and x.get("Id")
+                                                            and (resolved is None or x.get("Id") not in resolved)])
         
         # 更新当前媒体项人物
+        self._runstate.add_persons(len(iteminfo.get("People") or []))
         for people in iteminfo.get("People", []) or []:
             if self._event.is_set():
                 logger.info(f"演职人员刮削服务停止")
                 return
-            
+
             # 仅仅跳过无名字的
             if not people.get("Name"):
+                self._runstate.person_done()
                 continue
 
-            # 调用核心更新逻辑
-            info = self.__update_people(server=server, server_type=server_type,
-                                        people=people, douban_actors=douban_actors)
+            person_id = people.get("Id")
+            if resolved is not None and person_id in resolved:
+                # 季内已解析过，保留本集的角色等字段，仅替换姓名
+                name = resolved[person_id]
+                info = {**people, "Name": name} if name else None
+            else:
+                # 调用核心更新逻辑
+                info = self.__update_people(server=server, server_type=server_type,
+                                            people=people, douban_actors=douban_actors,
+                                            personinfo=prefetched.get(person_id))
+                if resolved is not None:
+                    resolved[person_id] = info.get("Name") if info else None
+            self._runstate.person_done()
             
             if info:
                 # 只有返回了新的信息才加入列表（或者被修改了）
@@ -432,6 +2161,10 @@ class personmetamod(_PluginBase):
                 is_modified = True
                 logger.info(f"人物 {people.get('Name')} 因非中文且开启了删除选项，已被移除")
 
+        # 季内复用解析结果时，人物实体已在首次解析时更新，仅在列表实际变化时提交
+        if resolved is not None:
+            is_modified = peoples != iteminfo.get("People")
+
         # 保存媒体项信息（如果列表有变化）
         if is_modified and peoples:
             iteminfo["People"] = peoples
@@ -440,7 +2173,7 @@ class personmetamod(_PluginBase):
             # 但为了确保 Movie 界面显示的列表也是最新的，这里也提交一次
             logger.info(f"正在更新媒体条目 {iteminfo.get('Name')} 的演职员列表...")
             self.set_iteminfo(server=server, server_type=server_type,
-                              itemid=itemid, iteminfo=iteminfo)
+                              itemid=itemid, iteminfo=iteminfo, fields=["People"])
 
     def __update_item(self, server: str, item: MediaServerItem, server_type: str = None,
                       mediainfo: MediaInfo = None, season: int = None):
@@ -454,19 +2187,14 @@ class personmetamod(_PluginBase):
             """
             if self._type == "name":
                 # 是否需要处理人物名称
-                _peoples = [x for x in _item.get("People", []) if
-                            (x.get("Name") and not StringUtils.is_chinese(x.get("Name")))]
+                return any(x.get("Name") and not text_cache.is_chinese(x.get("Name"))
+                           for x in _item.get("People", []))
             elif self._type == "role":
                 # 是否需要处理人物角色
-                _peoples = [x for x in _item.get("People", []) if
-                            (x.get("Role") and not StringUtils.is_chinese(x.get("Role")))]
-            else:
-                # 全部
-                return True
-                
-            if _peoples:
-                return True
-            return False
+                return any(x.get("Role") and not text_cache.is_chinese(x.get("Role"))
+                           for x in _item.get("People", []))
+            # 全部
+            return True
 
         # 识别媒体信息
         if not mediainfo:
@@ -497,14 +2225,16 @@ class personmetamod(_PluginBase):
         # 处理季和集人物
         if iteminfo.get("Type") and "Series" in iteminfo["Type"]:
             # 获取季媒体项
-            seasons = self.get_items(server=server, server_type=server_type,
-                                     parentid=item.item_id, mtype="Season")
+            seasons = list(self.iter_items(server=server, server_type=server_type,
+                                           parentid=item.item_id, mtype="Season"))
             if not seasons:
                 logger.warn(f"{item.title} 未找到季媒体项")
                 return
-            for season in seasons.get("Items", []):
+            for season in seasons:
                 # 获取豆瓣演员信息
                 season_actors = self.__get_douban_actors(mediainfo=mediainfo, season=season.get("IndexNumber"))
+                # 本季人物解析结果，季与各集共享
+                season_resolved: Dict[str, Optional[str]] = {}
                 # 如果是Jellyfin，更新季的人物，Emby/Plex季没有人物
                 if server_type == "jellyfin":
                     seasoninfo = self.get_iteminfo(server=server, server_type=server_type,
@@ -517,16 +2247,15 @@ class personmetamod(_PluginBase):
                         # 更新季媒体项人物
                         self.__update_peoples(server=server, server_type=server_type,
                                               itemid=season.get("Id"), iteminfo=seasoninfo,
-                                              douban_actors=season_actors)
+                                              douban_actors=season_actors, resolved=season_resolved)
                         logger.info(f"季 {seasoninfo.get('Id')} 的人物信息更新完成")
                 # 获取集媒体项
-                episodes = self.get_items(server=server, server_type=server_type,
-                                          parentid=season.get("Id"), mtype="Episode")
-                if not episodes:
-                    logger.warn(f"{item.title} 未找到集媒体项")
-                    continue
+                episodes = self.iter_items(server=server, server_type=server_type,
+                                           parentid=season.get("Id"), mtype="Episode")
                 # 更新集媒体项人物
-                for episode in episodes.get("Items", []):
+                episode_count = 0
+                for episode in episodes:
+                    episode_count += 1
                     # 获取集媒体项详情
                     episodeinfo = self.get_iteminfo(server=server, server_type=server_type,
                                                     itemid=episode.get("Id"))
@@ -537,16 +2266,21 @@ class personmetamod(_PluginBase):
                         # 更新集媒体项人物
                         self.__update_peoples(server=server, server_type=server_type,
                                               itemid=episode.get("Id"), iteminfo=episodeinfo,
-                                              douban_actors=season_actors)
+                                              douban_actors=season_actors, resolved=season_resolved)
                         logger.info(f"集 {episodeinfo.get('Id')} 的人物信息更新完成")
+                if not episode_count:
+                    logger.warn(f"{item.title} 未找到集媒体项")
 
-    def __get_tmdb_person_full(self, person_id: int) -> Optional[dict]:
+    @accounted("tmdb")
+    def __get_tmdb_person_full(self, person_id: int, etag: str = None,
+                               last_modified: str = None) -> Tuple[Optional[int], Optional[dict], Dict[str, str]]:
         """
         获取TMDB人物详细信息，包含external_ids (Imdb, Tvdb)
+        传入缓存校验头时发起条件请求，返回 (状态码, 数据, 校验头)，未变化时状态码为304、数据为空
         """
         if not settings.TMDB_API_KEY:
             logger.error("未配置TMDB API KEY")
-            return None
+            return None, None, {}
             
         url = f"https://api.themoviedb.org/3/person/{person_id}"
         params = {
@@ -554,25 +2288,296 @@ class personmetamod(_PluginBase):
             "language": "zh-CN",
             "append_to_response": "external_ids"
         }
+        headers = {"User-Agent": settings.USER_AGENT}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
         
         logger.info(f"正在请求TMDB人物详情: ID={person_id}, URL={url}")
         try:
-            res = RequestUtils(ua=settings.USER_AGENT).get_res(url=url, params=params)
+            res = RequestUtils(headers=headers).get_res(url=url, params=params)
+            self._breakers.check_response(res)
+            validators = {
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified")
+            } if res is not None else {}
+            if res is not None and res.status_code == 304:
+                logger.info(f"TMDB人物详情未变化: ID={person_id}")
+                return 304, None, validators
             if res and res.status_code == 200:
                 data = res.json()
+                self._budget.add_bytes("tmdb", len(res.content))
                 logger.info(f"TMDB人物详情请求成功: ID={person_id}")
-                logger.debug(f"TMDB返回数据: {json.dumps(data, ensure_ascii=False)}")
-                return data
+                logger.debug("TMDB返回数据: %s", LazyJson(data))
+                return 200, data, validators
+            elif res is not None and res.status_code == 404:
+                logger.warn(f"TMDB人物不存在: ID={person_id}")
+                self.__add_miss(f"tmdb:{person_id}", "tmdb_404")
+                return 404, None, validators
             else:
-                logger.error(f"TMDB人物详情请求失败: ID={person_id}, Code={res.status_code if res else 'Unknown'}, Msg={res.text if res else ''}")
+                logger.error(f"TMDB人物详情请求失败: ID={person_id}, Code={res.status_code if res is not None else 'Unknown'}, Msg={res.text if res is not None else ''}")
+                self._runstate.error(f"TMDB人物详情请求失败: ID={person_id}, Code={res.status_code if res is not None else 'Unknown'}")
         except Exception as e:
+            self._breakers.mark_failed(str(e))
             logger.error(f"TMDB人物详情请求异常: {e}")
+            self._runstate.error(f"TMDB人物详情请求异常: ID={person_id}, {e}")
+        return None, None, {}
+
+    @accounted("tmdb")
+    def __get_tmdb_changes_page(self, start_date: str, end_date: str, page: int) -> Optional[dict]:
+        """
+        获取TMDB人物变更列表的一页
+        """
+        url = "https://api.themoviedb.org/3/person/changes"
+        params = {
+            "api_key": settings.TMDB_API_KEY,
+            "start_date": start_date,
+            "end_date": end_date,
+            "page": page
+        }
+        try:
+            res = RequestUtils(ua=settings.USER_AGENT).get_res(url=url, params=params)
+            self._breakers.check_response(res)
+            if res and res.status_code == 200:
+                self._budget.add_bytes("tmdb", len(res.content))
+                return res.json()
+            logger.error(f"TMDB人物变更列表请求失败: Code={res.status_code if res else 'Unknown'}")
+        except Exception as e:
+            self._breakers.mark_failed(str(e))
+            logger.error(f"TMDB人物变更列表请求异常: {e}")
         return None
 
+    def __get_tmdb_changed_persons(self, since: datetime.datetime,
+                                   until: datetime.datetime) -> Optional[Set[int]]:
+        """
+        获取时间段内有变更的TMDB人物ID，TMDB单次查询的时间跨度最长14天
+        """
+        changed = set()
+        start = since
+        while start < until:
+            end = min(start + datetime.timedelta(days=14), until)
+            page, total_pages = 1, 1
+            while page <= total_pages:
+                if self._event.is_set():
+                    return None
+                data = self.__get_tmdb_changes_page(start_date=start.strftime("%Y-%m-%d"),
+                                                    end_date=end.strftime("%Y-%m-%d"), page=page)
+                if data is None:
+                    return None
+                changed.update(int(x.get("id")) for x in data.get("results") or [] if x.get("id"))
+                # TMDB最多返回500页
+                total_pages = min(data.get("total_pages") or 1, 500)
+                page += 1
+            start = end
+        return changed
+
+    @staticmethod
+    def __server_url(service: ServiceInfo, url: str) -> Optional[str]:
+        """
+        按媒体服务器配置替换地址中的占位符，供实例未提供的异步、流式请求使用
+        地址、密钥或用户无法确定时返回None，调用方改用实例的同步接口
+        """
+        config = (service.config.config if service.config else None) or {}
+        host = (config.get("host") or "").strip()
+        apikey = config.get("apikey")
+        user = getattr(service.instance, "user", None)
+        if not host or not apikey or not user:
+            return None
+        if not host.startswith(("http://", "https://")):
+            host = f"http://{host}"
+        if not host.endswith("/"):
+            host += "/"
+        return url.replace("[HOST]", host).replace("[APIKEY]", apikey).replace("[USER]", user)
+
+    def __prefetch_people(self, server: str, server_type: str, people_ids: List[str]) -> Dict[str, dict]:
+        """
+        通过异步引擎并发获取媒体服务器人物详情，并预热其中尚未缓存的TMDB人物
+        返回 {人物Id: 人物详情}，失败的人物不在结果中，由同步流程补齐
+        依赖未处于正常状态时不预取，由同步流程发送半开探测请求
+        """
+
+        def __record(_key: str, _result: AsyncResult):
+            ok = _result.status is not None and _result.status != 429 and _result.status < 500
+            self._breakers.get(_key).record(ok, _result.elapsed,
+                                            None if ok else _result.error or f"HTTP {_result.status}")
+
+        service = (self.service_infos(server_type) or {}).get(server)
+        people_ids = [x for x in dict.fromkeys(people_ids)
+                      if not self.__get_miss(f"person:{server}:{x}")]
+        if not service or not people_ids or not self._breakers.closed(server):
+            return {}
+        lane = self._jobs.current_lane
+        prefix = "emby/" if server_type == "emby" else ""
+        requests = []
+        for person_id in people_ids:
+            url = self.__server_url(service, f"[HOST]{prefix}Users/[USER]/Items/{person_id}?"
+                                             f"Fields=ChannelMappingInfo,ProviderIds,ProductionLocations,"
+                                             f"OfficialRating,PremiereDate,EndDate,Overview&api_key=[APIKEY]")
+            if not url:
+                logger.debug(f"无法确定媒体服务器 {server} 的地址，不预取人物详情")
+                return {}
+            self._jobs.limiter.acquire(server_type, lane=lane, stop_event=self._event)
+            requests.append(AsyncRequest(upstream=server_type, url=url))
+        try:
+            results = self._aio.fetch_many(requests)
+        except Exception as err:
+            logger.warn(f"异步预取人物详情失败，改用同步请求：{str(err)}")
+            return {}
+        personinfos = {}
+        for person_id, result in zip(people_ids, results):
+            self._budget.record(server_type, "GET", result.size)
+            __record(server, result)
+            if result.data:
+                personinfos[person_id] = result.data
+        # 预热TMDB人物缓存，过期记录带上校验头
+        stale_records: Dict[int, Optional[PersonRecord]] = {}
+        for personinfo in personinfos.values():
+            tmdbid = next((v for k, v in (personinfo.get("ProviderIds") or {}).items() if k.lower() == "tmdb"), None)
+            if not tmdbid or not str(tmdbid).isdigit() or int(tmdbid) in stale_records:
+                continue
+            tmdbid = int(tmdbid)
+            record = self._person_cache.get_stale(tmdbid)
+            if record and time.time() - record.fetched_at < self._person_cache.ttl:
+                continue
+            if self.__get_miss(f"tmdb:{tmdbid}"):
+                continue
+            stale_records[tmdbid] = record
+        if not stale_records or not settings.TMDB_API_KEY or not self._breakers.closed("tmdb"):
+            return personinfos
+        requests = []
+        for tmdbid, record in stale_records.items():
+            self._jobs.limiter.acquire("tmdb", lane=lane, stop_event=self._event)
+            headers = {"User-Agent": settings.USER_AGENT}
+            if record and record.etag:
+                headers["If-None-Match"] = record.etag
+            if record and record.last_modified:
+                headers["If-Modified-Since"] = record.last_modified
+            requests.append(AsyncRequest(upstream="tmdb", url=f"https://api.themoviedb.org/3/person/{tmdbid}",
+                                         params={"api_key": settings.TMDB_API_KEY, "language": "zh-CN",
+                                                 "append_to_response": "external_ids"},
+                                         headers=headers))
+        try:
+            results = self._aio.fetch_many(requests)
+        except Exception as err:
+            logger.warn(f"异步预取TMDB人物失败，改用同步请求：{str(err)}")
+            return personinfos
+        for (tmdbid, record), result in zip(stale_records.items(), results):
+            self._budget.record("tmdb", "GET", result.size)
+            __record("tmdb", result)
+            if result.status == 304 and record:
+                record.fetched_at = time.time()
+                self._person_cache.put(record)
+                self._budget.not_modified("tmdb")
+            elif result.status == 200 and result.data:
+                new_record = PersonRecord.from_tmdb(result.data)
+                new_record.etag = result.headers.get("ETag")
+                new_record.last_modified = result.headers.get("Last-Modified")
+                self._person_cache.put(new_record)
+            elif result.status == 404:
+                self.__add_miss(f"tmdb:{tmdbid}", "tmdb_404")
+        logger.info(f"异步预取人物详情 {len(personinfos)}/{len(people_ids)} 个，TMDB人物 {len(stale_records)} 个")
+        return personinfos
+
+    def __get_miss(self, key: str) -> Optional[str]:
+        """
+        查询负缓存，返回原因代码
+        """
+        if not self._store:
+            return None
+        return self._store.get_miss(key, ttl=self._miss_days * 24 * 3600)
+
+    def __add_miss(self, key: str, reason: str, note: str = None):
+        if self._store:
+            self._store.put_miss(key, reason, note)
+
+    def __record_ledger(self, server: str, server_type: str, person_id: str, tmdbid: int):
+        """
+        记录已处理人物台账
+        """
+        key = (server, person_id, tmdbid)
+        if not self._store or key in self._ledger_seen:
+            return
+        try:
+            self._store.ledger_add(server=server, server_type=server_type, person_id=person_id, tmdbid=tmdbid)
+            self._ledger_seen.add(key)
+        except Exception as err:
+            logger.error(f"写入人物台账失败：{str(err)}")
+
+    def __get_tmdb_person(self, person_id: int) -> Optional[PersonRecord]:
+        """
+        获取TMDB人物的精简记录，优先使用缓存
+        """
+        record = self._person_cache.get(person_id)
+        if record:
+            return record
+        if self.__get_miss(f"tmdb:{person_id}"):
+            logger.info(f"TMDB人物 {person_id} 已知不存在，跳过")
+            return None
+        # 过期记录带上校验头发起条件请求，未变化时只刷新有效期
+        stale = self._person_cache.get_stale(person_id)
+        status, tmdb_data, validators = self.__get_tmdb_person_full(
+            person_id,
+            etag=stale.etag if stale else None,
+            last_modified=stale.last_modified if stale else None)
+        if status == 304 and stale:
+            stale.fetched_at = time.time()
+            self._person_cache.put(stale)
+            self._budget.not_modified("tmdb")
+            return stale
+        if not tmdb_data:
+            return None
+        record = PersonRecord.from_tmdb(tmdb_data)
+        record.etag = validators.get("etag")
+        record.last_modified = validators.get("last_modified")
+        self._person_cache.put(record)
+        return record
+
     def __update_people(self, server: str, server_type: str,
-                        people: dict, douban_actors: list = None) -> Optional[dict]:
+                        people: dict, douban_actors: DoubanCastIndex = None,
+                        personinfo: dict = None) -> Optional[dict]:
         """
         更新人物信息，返回替换后的人物信息
+        开启跨服务器同步写入时，处理完成后同步写入其它服务器中TMDB ID相同的人物，
+        这些人物之后在其它服务器上再次出现时直接复用结果
+        personinfo 为已预取的媒体服务器人物详情
+        """
+        if not self._fanout or not self._store:
+            return self.__write_people(server=server, server_type=server_type,
+                                       people=people, douban_actors=douban_actors, personinfo=personinfo)
+        key = (server, str(people.get("Id")))
+        with self._fanout_lock:
+            done = self._fanout_done.get(key)
+        if done and time.time() - done[0] < self._fanout_ttl:
+            logger.info(f"人物 {people.get('Name')} 已在跨服务器同步中处理，跳过")
+            return {**people, "Name": done[1]} if done[1] else None
+        result = self.__write_people(server=server, server_type=server_type,
+                                     people=people, douban_actors=douban_actors, personinfo=personinfo)
+        with self._fanout_lock:
+            self._fanout_done[key] = (time.time(), result.get("Name") if result else None)
+        # 其它服务器中的同一人物（按台账中的TMDB ID对应）
+        service_infos = self.service_infos() or {}
+        for peer in self._store.ledger_peers(server=server, person_id=str(people.get("Id"))):
+            peer_key = (peer.get("server"), peer.get("person_id"))
+            if peer.get("server") not in service_infos:
+                continue
+            with self._fanout_lock:
+                done = self._fanout_done.get(peer_key)
+            if done and time.time() - done[0] < self._fanout_ttl:
+                continue
+            logger.info(f"同步写入服务器 {peer.get('server')} 中的人物 {people.get('Name')}")
+            peer_result = self.__write_people(server=peer.get("server"), server_type=peer.get("server_type"),
+                                              people={"Id": peer.get("person_id"), "Name": people.get("Name")},
+                                              douban_actors=douban_actors)
+            with self._fanout_lock:
+                self._fanout_done[peer_key] = (time.time(), peer_result.get("Name") if peer_result else None)
+        return result
+
+    def __write_people(self, server: str, server_type: str,
+                       people: dict, douban_actors: DoubanCastIndex = None,
+                       personinfo: dict = None) -> Optional[dict]:
+        """
+        更新单个服务器中的人物信息，返回替换后的人物信息
         """
 
         def __get_peopleid(p: dict) -> Tuple[Optional[str], Optional[str]]:
@@ -590,8 +2595,8 @@ class personmetamod(_PluginBase):
                     peopleimdbid = p["ProviderIds"][key]
             return peopletmdbid, peopleimdbid
 
-        # 返回的人物信息（用于列表显示）
-        ret_people = copy.deepcopy(people)
+        # 返回的人物信息（用于列表显示），仅在姓名变化时复制
+        ret_people = people
         
         # 记录是否需要更新
         needs_update = False
@@ -599,10 +2604,14 @@ class personmetamod(_PluginBase):
 
         try:
             logger.info(f"正在处理人物: {people.get('Name')} (ID: {people.get('Id')})")
+            miss_key = f"person:{server}:{people.get('Id')}"
+            if self.__get_miss(miss_key):
+                logger.info(f"人物 {people.get('Name')} 已知缺少 TMDB ID，跳过")
+                return people
             
-            # 1. 查询媒体服务器中现有的人物详情
-            personinfo = self.get_iteminfo(server=server, server_type=server_type,
-                                           itemid=people.get("Id"))
+            # 1. 查询媒体服务器中现有的人物详情（已预取时直接使用）
+            personinfo = personinfo or self.get_iteminfo(server=server, server_type=server_type,
+                                                         itemid=people.get("Id"))
             if not personinfo:
                 logger.warn(f"未找到人物 {people.get('Name')} 的媒体库详情，跳过")
                 return None
@@ -615,55 +2624,56 @@ class personmetamod(_PluginBase):
             person_tmdbid, person_imdbid = __get_peopleid(personinfo)
             if not person_tmdbid:
                 logger.warn(f"人物 {people.get('Name')} 缺少 TMDB ID，无法获取TMDB数据")
+                self.__add_miss(miss_key, "no_tmdbid", people.get("Name"))
                 return people # 原样返回
 
-            # 3. 从 TMDB 获取全量数据 (API请求)
-            tmdb_data = self.__get_tmdb_person_full(int(person_tmdbid))
-            if not tmdb_data:
+            # 记录台账，供变更刷新定位媒体服务器中的人物
+            self.__record_ledger(server=server, server_type=server_type,
+                                 person_id=people.get("Id"), tmdbid=int(person_tmdbid))
+
+            # 3. 获取 TMDB 数据 (缓存或API请求)
+            tmdb_record = self.__get_tmdb_person(int(person_tmdbid))
+            if not tmdb_record:
                 logger.warn(f"无法获取 TMDB 数据: {people.get('Name')}")
                 return people
 
             # 4. 解析 TMDB 数据并准备更新字段
             
-            # 姓名 (Name) - 强制简中
-            tmdb_name = tmdb_data.get("name")
+            # 姓名 (Name) - 强制简中（记录中已转换）
+            tmdb_name = tmdb_record.name
             if tmdb_name:
-                if StringUtils.is_chinese(tmdb_name):
-                    tmdb_name = zhconv.convert(tmdb_name, "zh-hans")
-                
                 # 无论是否中文，严格使用 TMDB Name
                 if personinfo.get("Name") != tmdb_name:
                     logger.info(f"发现姓名变更: '{personinfo.get('Name')}' -> '{tmdb_name}'")
                     personinfo["Name"] = tmdb_name
                     personinfo["ForcedSortName"] = tmdb_name # 排序名同步
                     personinfo["SortName"] = tmdb_name
-                    ret_people["Name"] = tmdb_name # 列表显示名同步
+                    ret_people = {**people, "Name": tmdb_name}  # 列表显示名同步
                     needs_update = True
                     update_fields.append("Name")
                 else:
                     logger.info(f"姓名一致: {tmdb_name}")
 
             # 简介 (Overview) - 优先 TMDB，其次豆瓣
-            tmdb_bio = tmdb_data.get("biography")
             new_overview = ""
             overview_source = "None"
             
-            if tmdb_bio:
-                new_overview = zhconv.convert(tmdb_bio, "zh-hans") if StringUtils.is_chinese(tmdb_bio) else tmdb_bio
+            if tmdb_record.overview:
+                new_overview = tmdb_record.overview
                 overview_source = "TMDB"
             
             # 如果TMDB简介为空，尝试查找豆瓣
+            # 豆瓣匹配使用的候选姓名：TMDB姓名、媒体库中的姓名，均未命中时再按角色一致的TMDB别名匹配
+            douban_names = [tmdb_name, people.get("Name")]
+
             if not new_overview and douban_actors:
                 logger.info("TMDB简介为空，尝试搜索豆瓣数据...")
-                for db_actor in douban_actors:
-                    # 尝试匹配名字
-                    if (db_actor.get("latin_name") and db_actor.get("latin_name") == tmdb_name) \
-                            or (db_actor.get("name") and db_actor.get("name") == tmdb_name) \
-                            or (db_actor.get("name") == people.get("Name")):
-                        if db_actor.get("title"): # 豆瓣的title字段通常是简介或相关描述
-                             new_overview = db_actor.get("title")
-                             overview_source = "Douban"
-                             break
+                # 豆瓣的title字段通常是简介或相关描述
+                db_actor = douban_actors.match_person(douban_names, tmdb_record.also_known_as, people,
+                                                      predicate=lambda x: x.get("title"))
+                if db_actor:
+                    new_overview = db_actor.get("title")
+                    overview_source = "Douban"
             
             if new_overview and personinfo.get("Overview") != new_overview:
                 logger.info(f"发现简介变更 (来源: {overview_source}): 更新前长度 {len(personinfo.get('Overview') or '')}, 更新后长度 {len(new_overview)}")
@@ -672,7 +2682,7 @@ class personmetamod(_PluginBase):
                 update_fields.append("Overview")
 
             # 出生日期 (BirthDate / PremiereDate)
-            tmdb_birth = tmdb_data.get("birthday")
+            tmdb_birth = tmdb_record.birthday
             if tmdb_birth:
                 # 格式化为 ISO (Emby需要)
                 try:
@@ -691,7 +2701,7 @@ class personmetamod(_PluginBase):
                     logger.warn(f"日期解析失败: {tmdb_birth}, Error: {e}")
 
             # 逝世日期 (DeathDate / EndDate)
-            tmdb_death = tmdb_data.get("deathday")
+            tmdb_death = tmdb_record.deathday
             if tmdb_death:
                 try:
                     death_dt = datetime.datetime.strptime(tmdb_death, "%Y-%m-%d")
@@ -705,7 +2715,7 @@ class personmetamod(_PluginBase):
                     pass
 
             # 出生地点 (Place of Birth / ProductionLocations)
-            tmdb_place = tmdb_data.get("place_of_birth")
+            tmdb_place = tmdb_record.place_of_birth
             if tmdb_place:
                 # Emby 使用列表存储 ProductionLocations
                 current_locs = personinfo.get("ProductionLocations", [])
@@ -716,9 +2726,8 @@ class personmetamod(_PluginBase):
                      update_fields.append("ProductionLocations")
 
             # 外部标识符 (ProviderIds: Imdb, Tmdb, Tvdb)
-            ext_ids = tmdb_data.get("external_ids", {})
-            new_imdb_id = ext_ids.get("imdb_id")
-            new_tvdb_id = ext_ids.get("tvdb_id")
+            new_imdb_id = tmdb_record.imdb_id
+            new_tvdb_id = tmdb_record.tvdb_id
             
             # 更新 Imdb
             if new_imdb_id and personinfo["ProviderIds"].get("Imdb") != new_imdb_id:
@@ -729,8 +2738,6 @@ class personmetamod(_PluginBase):
             
             # 更新 Tvdb
             if new_tvdb_id:
-                # Tvdb可能是int
-                new_tvdb_id = str(new_tvdb_id)
                 if personinfo["ProviderIds"].get("Tvdb") != new_tvdb_id:
                     logger.info(f"更新 Tvdb ID: {new_tvdb_id}")
                     personinfo["ProviderIds"]["Tvdb"] = new_tvdb_id
@@ -751,57 +2758,87 @@ class personmetamod(_PluginBase):
             image_source = "None"
             
             # 优先 TMDB
-            if tmdb_data.get("profile_path"):
-                profile_path = f"https://{settings.TMDB_IMAGE_DOMAIN}/t/p/original{tmdb_data.get('profile_path')}"
+            if tmdb_record.profile_path:
+                profile_path = f"https://{settings.TMDB_IMAGE_DOMAIN}/t/p/original{tmdb_record.profile_path}"
                 image_source = "TMDB"
             
             # 其次 豆瓣
             if not profile_path and douban_actors:
-                for db_actor in douban_actors:
-                     if (db_actor.get("latin_name") and db_actor.get("latin_name") == tmdb_name) \
-                            or (db_actor.get("name") and db_actor.get("name") == tmdb_name):
-                         avatar = db_actor.get("avatar") or {}
-                         if avatar.get("large"):
-                             profile_path = avatar.get("large")
-                             image_source = "Douban"
-                             break
+                db_actor = douban_actors.match_person(douban_names, tmdb_record.also_known_as, people,
+                                                      predicate=lambda x: (x.get("avatar") or {}).get("large"))
+                if db_actor:
+                    profile_path = db_actor["avatar"]["large"]
+                    image_source = "Douban"
             
             # 提交图片更新
             if profile_path:
                 logger.info(f"正在更新图片 (来源: {image_source}): {profile_path}")
-                self.set_item_image(server=server, server_type=server_type, 
-                                    itemid=people.get("Id"), imageurl=profile_path)
+                self.set_item_image(server=server, server_type=server_type,
+                                    itemid=people.get("Id"), imageurl=profile_path,
+                                    image_tag=(personinfo.get("ImageTags") or {}).get("Primary") or "")
 
             # 6. 提交元数据更新
             if needs_update:
                 logger.info(f"提交人物 {tmdb_name} 的元数据更新, 字段: {update_fields}")
-                logger.debug(f"更新Payload: {json.dumps(personinfo, ensure_ascii=False)}")
+                logger.debug("更新Payload: %s", LazyJson(personinfo))
                 
+                # 姓名变化时排序名同步修改；锁定字段随每次更新一同提交
+                fields = update_fields + (["ForcedSortName", "SortName"] if "Name" in update_fields else []) \
+                    + ["LockedFields"]
                 ret = self.set_iteminfo(server=server, server_type=server_type,
-                                        itemid=people.get("Id"), iteminfo=personinfo)
+                                        itemid=people.get("Id"), iteminfo=personinfo, fields=fields)
                 if ret:
                     logger.info(f"人物 {tmdb_name} 更新成功!")
                     return ret_people
                 else:
                     logger.error(f"人物 {tmdb_name} 更新失败!")
+                    self._runstate.error(f"人物 {tmdb_name} 更新失败")
             else:
                 logger.info(f"人物 {tmdb_name} 无需更新元数据")
 
+        except CircuitOpenError:
+            # 依赖熔断，交由调用方延后处理整个条目
+            raise
         except Exception as err:
             logger.error(f"更新人物信息发生未捕获异常: {str(err)}")
+            self._runstate.error(f"人物 {people.get('Name')} 更新异常: {str(err)}")
             import traceback
             logger.error(traceback.format_exc())
         
         return None
 
-    def __get_douban_actors(self, mediainfo: MediaInfo, season: int = None) -> List[dict]:
+    def __get_douban_actors(self, mediainfo: MediaInfo, season: int = None) -> DoubanCastIndex:
         """
-        获取豆瓣演员信息
+        获取豆瓣演员信息，返回按姓名建立的索引，优先使用持久化缓存
         """
+        cache_key = f"{mediainfo.type.value if mediainfo.type else ''}:{mediainfo.tmdb_id}:{season or ''}"
+        if self._store:
+            actors = self._store.get_douban(cache_key, ttl=self._cache_days * 24 * 3600)
+            if actors is not None:
+                logger.info(f"使用缓存的豆瓣演职人员共 {len(actors)} 人：{mediainfo.title_year}")
+                return DoubanCastIndex(actors)
+        # 已知未匹配的条目不再请求，也无需反爬休眠
+        miss_key = f"douban:{cache_key}"
+        if self.__get_miss(miss_key):
+            logger.info(f"{mediainfo.title_year} 已知未匹配到豆瓣信息，跳过")
+            return DoubanCastIndex()
         # 随机休眠 3-10 秒
         sleep_time = 3 + int(time.time()) % 7
         logger.info(f"为防止触发反爬，随机休眠 {sleep_time}秒 ...")
         time.sleep(sleep_time)
+        actors = self.__fetch_douban_actors(mediainfo=mediainfo, season=season)
+        if actors is None:
+            self.__add_miss(miss_key, "douban_unmatched", mediainfo.title_year)
+            return DoubanCastIndex()
+        if self._store:
+            self._store.put_douban(cache_key, actors)
+        return DoubanCastIndex(actors)
+
+    @accounted("douban")
+    def __fetch_douban_actors(self, mediainfo: MediaInfo, season: int = None) -> Optional[List[dict]]:
+        """
+        从豆瓣获取演职人员列表，未匹配到时返回None
+        """
         # 匹配豆瓣信息
         doubaninfo = self.chain.match_doubaninfo(name=mediainfo.title,
                                                  imdbid=mediainfo.imdb_id,
@@ -817,8 +2854,9 @@ class personmetamod(_PluginBase):
             return actors
         else:
             logger.warn(f"未找到豆瓣信息：{mediainfo.title_year}")
-        return []
+        return None
 
+    @accounted(server_upstream, breaker=server_breaker)
     def get_iteminfo(self, server: str, server_type: str, itemid: str) -> dict:
         """
         获得媒体项详情
@@ -838,9 +2876,12 @@ class personmetamod(_PluginBase):
                 url = f'[HOST]emby/Users/[USER]/Items/{itemid}?' \
                       f'Fields=ChannelMappingInfo,ProviderIds,ProductionLocations,OfficialRating,PremiereDate,EndDate,Overview&api_key=[APIKEY]'
                 res = service.instance.get_data(url=url)
+                self._breakers.check_response(res)
                 if res:
+                    self._budget.add_bytes(server_type, len(res.content))
                     return res.json()
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Emby媒体项详情失败：{str(err)}")
             return {}
 
@@ -851,12 +2892,15 @@ class personmetamod(_PluginBase):
             try:
                 url = f'[HOST]Users/[USER]/Items/{itemid}?Fields=ChannelMappingInfo,ProviderIds,ProductionLocations,OfficialRating,PremiereDate,EndDate,Overview&api_key=[APIKEY]'
                 res = service.instance.get_data(url=url)
+                self._breakers.check_response(res)
                 if res:
+                    self._budget.add_bytes(server_type, len(res.content))
                     result = res.json()
                     if result:
                         result['FileName'] = Path(result['Path']).name if result.get('Path') else ""
                     return result
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Jellyfin媒体项详情失败：{str(err)}")
             return {}
 
@@ -891,6 +2935,7 @@ class personmetamod(_PluginBase):
                 iteminfo['CommunityRating'] = plexitem.audienceRating
                 return iteminfo
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Plex媒体项详情失败：{str(err)}")
             return {}
 
@@ -901,6 +2946,7 @@ class personmetamod(_PluginBase):
         else:
             return __get_plex_iteminfo()
 
+    @accounted(server_upstream, breaker=server_breaker)
     def get_items(self, server: str, server_type: str, parentid: str, mtype: str = None) -> dict:
         """
         获得媒体的所有子媒体项
@@ -920,9 +2966,12 @@ class personmetamod(_PluginBase):
                 else:
                     url = '[HOST]emby/Users/[USER]/Items?api_key=[APIKEY]'
                 res = service.instance.get_data(url=url)
+                self._breakers.check_response(res)
                 if res:
+                    self._budget.add_bytes(server_type, len(res.content))
                     return res.json()
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Emby媒体的所有子媒体项失败：{str(err)}")
             return {}
 
@@ -936,9 +2985,12 @@ class personmetamod(_PluginBase):
                 else:
                     url = '[HOST]Users/[USER]/Items?api_key=[APIKEY]'
                 res = service.instance.get_data(url=url)
+                self._breakers.check_response(res)
                 if res:
+                    self._budget.add_bytes(server_type, len(res.content))
                     return res.json()
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Jellyfin媒体的所有子媒体项失败：{str(err)}")
             return {}
 
@@ -1005,6 +3057,7 @@ class personmetamod(_PluginBase):
                         items['Items'].append(item)
                 return items
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"获取Plex媒体的所有子媒体项失败：{str(err)}")
             return {}
 
@@ -1015,9 +3068,147 @@ class personmetamod(_PluginBase):
         else:
             return __get_plex_items()
 
-    def set_iteminfo(self, server: str, server_type: str, itemid: str, iteminfo: dict):
+    def iter_items(self, server: str, server_type: str, parentid: str, mtype: str = None,
+                   fields: Tuple[str, ...] = ("Id", "Name", "Type", "IndexNumber"),
+                   page_size: int = 200) -> Iterator[dict]:
+        """
+        逐个返回媒体的子媒体项，只保留 fields 中的字段，内存占用与子媒体项数量无关
+        Emby/Jellyfin 已安装 ijson 时对单个响应增量解析，否则按 StartIndex/Limit 分页获取；Plex 仍一次获取全部
+        流式响应读取或解析失败时，从已返回的子媒体项之后改为分页获取
+        """
+        if server_type not in ["emby", "jellyfin"]:
+            for item in (self.get_items(server=server, server_type=server_type,
+                                        parentid=parentid, mtype=mtype) or {}).get("Items") or []:
+                yield {key: item[key] for key in fields if key in item}
+            return
+        start = 0
+        if streaming_available():
+            items = self.__read_items_stream(server=server, server_type=server_type,
+                                             parentid=parentid, fields=fields)
+            if items is not None:
+                try:
+                    for item in items:
+                        yield item
+                        start += 1
+                    return
+                except Exception as err:
+                    self._breakers.get(server).record(False, 0, str(err))
+                    logger.error(f"解析子媒体项列表失败：{str(err)}，改为分页获取")
+        while True:
+            page = self.get_items_page(server=server, server_type=server_type, parentid=parentid,
+                                       start=start, limit=page_size)
+            page_items = page.get("Items") or []
+            for item in page_items:
+                yield {key: item[key] for key in fields if key in item}
+            start += len(page_items)
+            total = page.get("TotalRecordCount")
+            if len(page_items) < page_size or (total is not None and start >= total):
+                break
+
+    def __read_items_stream(self, server: str, server_type: str, parentid: str,
+                            fields: Tuple[str, ...]) -> Optional[Iterator[dict]]:
+        """
+        流式读取子媒体项列表，先读完响应释放连接，再增量解析，解析时只保留需要的字段
+        无法流式请求或读取失败时返回None，由调用方改为分页获取
+        """
+        service = self.service_infos(server_type).get(server)
+        if not service:
+            logger.warn(f"未找到媒体服务器 {server} 的实例")
+            return None
+        prefix = "emby/" if server_type == "emby" else ""
+        url = self.__server_url(service, f"[HOST]{prefix}Users/[USER]/Items?ParentId={parentid}&api_key=[APIKEY]")
+        if not url:
+            return None
+        res = self.__open_items_stream(server=server, server_type=server_type, url=url)
+        if res is None:
+            return None
+        reader = CountingReader(res.raw)
+        try:
+            res.raw.decode_content = True
+            return read_json_items(reader, fields)
+        except Exception as err:
+            self._breakers.get(server).record(False, 0, str(err))
+            logger.error(f"读取子媒体项列表失败：{str(err)}，改为分页获取")
+            return None
+        finally:
+            self._budget.add_bytes(server_type, reader.size)
+            res.close()
+
+    @accounted(server_upstream, breaker=server_breaker)
+    def __open_items_stream(self, server: str, server_type: str, url: str):
+        """
+        以流式方式请求子媒体项列表，返回未读取的响应
+        """
+        try:
+            res = RequestUtils(content_type="application/json").get_res(url=url, stream=True)
+        except TypeError:
+            # 旧版本 RequestUtils 不支持 stream 参数
+            return None
+        if not self._breakers.check_response(res) or not res:
+            if res is not None:
+                res.close()
+            return None
+        return res
+
+    @accounted(server_upstream, breaker=server_breaker)
+    def get_items_page(self, server: str, server_type: str, parentid: str,
+                       start: int = 0, limit: int = 200) -> dict:
+        """
+        分页获取媒体的子媒体项（仅Emby/Jellyfin）
+        """
+        service = self.service_infos(server_type).get(server)
+        if not service:
+            logger.warn(f"未找到媒体服务器 {server} 的实例")
+            return {}
+        prefix = "emby/" if server_type == "emby" else ""
+        url = f'[HOST]{prefix}Users/[USER]/Items?ParentId={parentid}' \
+              f'&StartIndex={start}&Limit={limit}&api_key=[APIKEY]'
+        try:
+            res = service.instance.get_data(url=url)
+            self._breakers.check_response(res)
+            if res:
+                self._budget.add_bytes(server_type, len(res.content))
+                return res.json()
+        except Exception as err:
+            self._breakers.mark_failed(str(err))
+            logger.error(f"分页获取子媒体项失败：{str(err)}")
+        return {}
+
+    @accounted(server_upstream, breaker=server_breaker)
+    def get_library_page(self, server: str, server_type: str, parentid: str, sort_by: str,
+                         start: int = 0, limit: int = 200, min_saved: str = None) -> dict:
+        """
+        分页获取媒体库中的电影和剧集（仅Emby/Jellyfin），按 sort_by 倒序
+        """
+        service = self.service_infos(server_type).get(server)
+        if not service:
+            logger.warn(f"未找到媒体服务器 {server} 的实例")
+            return {}
+        prefix = "emby/" if server_type == "emby" else ""
+        url = f'[HOST]{prefix}Users/[USER]/Items?ParentId={parentid}&Recursive=true' \
+              f'&IncludeItemTypes=Movie,Series&SortBy={sort_by},SortName&SortOrder=Descending' \
+              f'&Fields=ProviderIds,ProductionYear,DateCreated,DateModified' \
+              f'&StartIndex={start}&Limit={limit}&api_key=[APIKEY]'
+        if min_saved:
+            url += f'&MinDateLastSaved={quote(min_saved)}'
+        try:
+            res = service.instance.get_data(url=url)
+            self._breakers.check_response(res)
+            if res:
+                self._budget.add_bytes(server_type, len(res.content))
+                return res.json()
+        except Exception as err:
+            self._breakers.mark_failed(str(err))
+            logger.error(f"分页获取媒体库条目失败：{str(err)}")
+        return {}
+
+    @planned("info", "iteminfo", fields_arg="fields")
+    @accounted(server_upstream, "POST", breaker=server_breaker)
+    def set_iteminfo(self, server: str, server_type: str, itemid: str, iteminfo: dict,
+                     fields: List[str] = None):
         """
         更新媒体项详情
+        :param fields: 修改过的字段，计划模式下只记录这些字段
         """
 
         service = self.service_infos(server_type).get(server)
@@ -1032,13 +3223,16 @@ class personmetamod(_PluginBase):
             try:
                 url = f'[HOST]emby/Items/{itemid}?api_key=[APIKEY]&reqformat=json'
                 logger.info(f"正在发送Emby更新请求: {itemid}")
+                payload = json.dumps(iteminfo)
+                self._budget.add_bytes(server_type, len(payload), "POST")
                 res = service.instance.post_data(
                     url=url,
-                    data=json.dumps(iteminfo),
+                    data=payload,
                     headers={
                         "Content-Type": "application/json"
                     }
                 )
+                self._breakers.check_response(res)
                 if res and res.status_code in [200, 204]:
                     logger.info(f"Emby更新成功: {itemid}")
                     return True
@@ -1054,13 +3248,16 @@ class personmetamod(_PluginBase):
             更新Jellyfin媒体项详情
             """
             try:
+                payload = json.dumps(iteminfo)
+                self._budget.add_bytes(server_type, len(payload), "POST")
                 res = service.instance.post_data(
                     url=f'[HOST]Items/{itemid}?api_key=[APIKEY]',
-                    data=json.dumps(iteminfo),
+                    data=payload,
                     headers={
                         "Content-Type": "application/json"
                     }
                 )
+                self._breakers.check_response(res)
                 if res and res.status_code in [200, 204]:
                     logger.info(f"Jellyfin更新成功: {itemid}")
                     return True
@@ -1086,6 +3283,7 @@ class personmetamod(_PluginBase):
                 plexitem.editTitle(iteminfo['Name']).editSummary(iteminfo['Overview']).reload()
                 return True
             except Exception as err:
+                self._breakers.mark_failed(str(err))
                 logger.error(f"更新Plex媒体项详情失败：{str(err)}")
             return False
 
@@ -1096,38 +3294,136 @@ class personmetamod(_PluginBase):
         else:
             return __set_plex_iteminfo()
 
+    def __current_upload(self, server: str, itemid: str, imageurl: str, image_tag: str = None) -> Optional[dict]:
+        """
+        查询上次上传到该人物的图片，服务器中的图片已被替换或上传记录过期时返回None
+        :param image_tag: 服务器当前的图片标签，None表示未知，空字符串表示服务器中没有图片
+        """
+        uploaded = self._store.get_upload(server, itemid) if self._store else None
+        if not uploaded or uploaded.get("url") != imageurl:
+            return None
+        # 上传记录过期后重新上传一次，图片标签未知时被替换也能恢复
+        if time.time() - uploaded.get("uploaded_at", 0) >= self._cache_days * 24 * 3600:
+            return None
+        if image_tag is not None:
+            if not image_tag or (uploaded.get("image_tag") and uploaded["image_tag"] != image_tag):
+                logger.info(f"服务器中人物 {itemid} 的图片已被替换，重新上传")
+                return None
+            if not uploaded.get("image_tag"):
+                # 上传后首次读到的图片标签即为上传的图片
+                self._store.set_upload_tag(server, itemid, image_tag)
+        return uploaded
+
+    def set_item_image(self, server: str, server_type: str, itemid: str, imageurl: str, image_tag: str = None):
+        """
+        更新媒体项图片：Emby先下载图片，与已上传的图片相同时不发起上传，只有上传请求计入媒体服务器的请求数与熔断
+        计划模式下同样先下载比较，只有图片变化时才记入变更集
+        :param image_tag: 服务器当前的图片标签（ImageTags.Primary），用于发现已被替换的图片
+        """
+        if server_type != "emby":
+            return self.__post_item_image(server=server, server_type=server_type, itemid=itemid, imageurl=imageurl)
+        uploaded = self.__current_upload(server, itemid, imageurl, image_tag)
+        image_base64, image_sha1, unchanged = self.__download_item_image(imageurl=imageurl, uploaded=uploaded)
+        if unchanged:
+            self._budget.skipped(server_type, "POST")
+            return True
+        if not image_base64:
+            return False
+        if self.__post_item_image(server=server, server_type=server_type, itemid=itemid, imageurl=imageurl,
+                                  image=image_base64):
+            if self._store and self._plans.writer is None:
+                self._store.put_upload(server, itemid, imageurl, image_sha1)
+            return True
+        return False
+
+    @accounted("image")
+    def __get_image(self, url: str, headers: dict):
+        """
+        下载图片，豆瓣图片需要Referer且不走代理
+        """
+        if "doubanio.com" in url:
+            headers["Referer"] = "https://movie.douban.com/"
+            res = RequestUtils(headers=headers, ua=settings.USER_AGENT).get_res(url=url, raise_exception=True)
+        else:
+            res = RequestUtils(headers=headers, proxies=settings.PROXY,
+                               ua=settings.USER_AGENT).get_res(url=url, raise_exception=True)
+        self._breakers.check_response(res)
+        return res
+
+    def __download_item_image(self, imageurl: str,
+                              uploaded: dict = None) -> Tuple[Optional[str], Optional[str], bool]:
+        """
+        获取图片，返回 (图片base64, 内容哈希, 是否与已上传的图片相同)
+        有效期内的图片直接读取本地图片缓存；过期后带上校验头发起条件请求，未变化时继续使用本地缓存
+        :param uploaded: 仍有效的上次上传记录
+        """
+        cached = self._store.get_image(imageurl) if self._store else None
+        cached_sha1 = cached.get("sha1") if cached else None
+        same_upload = bool(uploaded and cached_sha1 and uploaded.get("sha1") == cached_sha1)
+        has_blob = bool(cached_sha1 and self._blobs and self._blobs.has(cached_sha1))
+        if cached and time.time() - cached.get("fetched_at", 0) < self._cache_days * 24 * 3600:
+            if same_upload:
+                logger.info("图片与已上传的相同，无需重新上传")
+                return None, cached_sha1, True
+            if has_blob:
+                data = self._blobs.read_base64(cached_sha1)
+                if data:
+                    logger.info(f"使用本地缓存的图片: {imageurl}")
+                    return data, cached_sha1, False
+        headers = {"User-Agent": settings.USER_AGENT}
+        if cached and (same_upload or has_blob):
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            logger.info(f"正在下载图片: {imageurl}")
+            r = self.__get_image(url=imageurl, headers=headers)
+            if r is not None and r.status_code == 304 and cached:
+                self._budget.not_modified("image", cached.get("size"))
+                self._store.touch_image(imageurl)
+                if same_upload:
+                    logger.info("图片未变化，无需重新上传")
+                    return None, cached_sha1, True
+                data = self._blobs.read_base64(cached_sha1) if self._blobs else None
+                if data:
+                    logger.info("图片未变化，使用本地缓存")
+                    return data, cached_sha1, False
+                logger.warn(f"{imageurl} 本地缓存的图片已丢失")
+                return None, None, False
+            if r:
+                self._budget.add_bytes("image", len(r.content))
+                logger.info("图片下载成功")
+                sha1 = self._blobs.put(r.content) if self._blobs else hashlib.sha1(r.content).hexdigest()
+                if self._store:
+                    self._store.put_image(imageurl, sha1, len(r.content),
+                                          etag=r.headers.get("ETag"),
+                                          last_modified=r.headers.get("Last-Modified"))
+                if uploaded and uploaded.get("sha1") == sha1:
+                    logger.info("图片内容与已上传的相同，无需重新上传")
+                    return None, sha1, True
+                return base64.b64encode(r.content).decode(), sha1, False
+            else:
+                logger.warn(f"{imageurl} 图片下载失败，请检查网络连通性")
+        except CircuitOpenError as err:
+            # 图片源故障不影响人物资料的更新
+            logger.warn(f"{err}，本次不更新图片")
+        except Exception as err:
+            logger.error(f"下载图片失败：{str(err)}")
+        return None, None, False
+
+    @planned("image", "imageurl")
     @retry(RequestException, logger=logger)
-    def set_item_image(self, server: str, server_type: str, itemid: str, imageurl: str):
+    @accounted(server_upstream, "POST", breaker=server_breaker)
+    def __post_item_image(self, server: str, server_type: str, itemid: str, imageurl: str, image: str = None):
         """
-        更新媒体项图片
+        上传媒体项图片：Emby上传已下载图片的base64，Jellyfin/Plex由服务器从图片地址下载
         """
 
         service = self.service_infos(server_type).get(server)
         if not service:
             logger.warn(f"未找到媒体服务器 {server} 的实例")
-            return {}
-
-        def __download_image():
-            """
-            下载图片
-            """
-            try:
-                logger.info(f"正在下载图片: {imageurl}")
-                if "doubanio.com" in imageurl:
-                    r = RequestUtils(headers={
-                        'Referer': "https://movie.douban.com/"
-                    }, ua=settings.USER_AGENT).get_res(url=imageurl, raise_exception=True)
-                else:
-                    r = RequestUtils(proxies=settings.PROXY,
-                                     ua=settings.USER_AGENT).get_res(url=imageurl, raise_exception=True)
-                if r:
-                    logger.info("图片下载成功")
-                    return base64.b64encode(r.content).decode()
-                else:
-                    logger.warn(f"{imageurl} 图片下载失败，请检查网络连通性")
-            except Exception as err:
-                logger.error(f"下载图片失败：{str(err)}")
-            return None
+            return False
 
         def __set_emby_item_image(_base64: str):
             """
@@ -1136,6 +3432,7 @@ class personmetamod(_PluginBase):
             try:
                 url = f'[HOST]emby/Items/{itemid}/Images/Primary?api_key=[APIKEY]'
                 logger.info(f"正在向Emby上传图片: {itemid}")
+                self._budget.add_bytes(server_type, len(_base64), "POST")
                 res = service.instance.post_data(
                     url=url,
                     data=_base64,
@@ -1143,6 +3440,7 @@ class personmetamod(_PluginBase):
                         "Content-Type": "image/png"
                     }
                 )
+                self._breakers.check_response(res)
                 if res and res.status_code in [200, 204]:
                     logger.info("Emby图片上传成功")
                     return True
@@ -1161,6 +3459,7 @@ class personmetamod(_PluginBase):
                 url = f'[HOST]Items/{itemid}/RemoteImages/Download?' \
                       f'Type=Primary&ImageUrl={imageurl}&ProviderName=TheMovieDb&api_key=[APIKEY]'
                 res = service.instance.post_data(url=url)
+                self._breakers.check_response(res)
                 if res and res.status_code in [200, 204]:
                     return True
                 elif res is not None:
@@ -1186,21 +3485,20 @@ class personmetamod(_PluginBase):
             return False
 
         if server_type == "emby":
-            # 下载图片获取base64
-            image_base64 = __download_image()
-            if image_base64:
-                return __set_emby_item_image(image_base64)
+            return __set_emby_item_image(image)
         elif server_type == "jellyfin":
             return __set_jellyfin_item_image()
         else:
             return __set_plex_item_image()
-        return None
 
     def stop_service(self):
         """
         停止服务
         """
         try:
+            # 取消排队中的刮削任务
+            self._jobs.cancel()
+            self._aio.close()
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
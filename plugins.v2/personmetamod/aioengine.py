@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app.log import logger
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+@dataclass
+class AsyncRequest:
+    """
+    一次异步GET请求
+    """
+    upstream: str
+    url: str
+    params: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    proxy: Optional[str] = None
+
+
+@dataclass
+class AsyncResult:
+    """
+    异步请求结果，请求失败时 status 为 None
+    """
+    status: Optional[int] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    data: Optional[dict] = None
+    size: int = 0
+    error: Optional[str] = None
+    # 请求耗时（秒，不含排队等待）
+    elapsed: float = 0
+
+
+class AsyncEngine:
+    """
+    可选的异步HTTP引擎（依赖 aiohttp，未安装时不可用）
+    在独立线程中运行事件循环，同步代码通过 fetch_many 提交一批请求并等待全部完成；
+    每个上游使用独立的信号量限制并发数，单个线程即可同时保持大量在途请求
+    """
+
+    def __init__(self, concurrency: Dict[str, int] = None, default_concurrency: int = 8, timeout: float = 30):
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.timeout = timeout
+        # 请求地址改写（如测试环境）
+        self.url_rewriter: Optional[Callable[[str], str]] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def configure(self, concurrency: Dict[str, int]):
+        """
+        设置各上游并发数，新的信号量在下次请求时创建
+        """
+        self.concurrency = concurrency
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._semaphores.clear)
+
+    @staticmethod
+    def available() -> bool:
+        return aiohttp is not None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop and self._thread and self._thread.is_alive():
+                return self._loop
+            self._loop = asyncio.new_event_loop()
+            self._semaphores = {}
+            self._session = None
+            self._thread = threading.Thread(target=self._loop.run_forever, name="personmetamod-aio", daemon=True)
+            self._thread.start()
+            return self._loop
+
+    def _semaphore(self, upstream: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(upstream)
+        if not semaphore:
+            semaphore = asyncio.Semaphore(self.concurrency.get(upstream) or self.default_concurrency)
+            self._semaphores[upstream] = semaphore
+        return semaphore
+
+    async def _get_session(self):
+        if not self._session or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=0, ttl_dns_cache=300))
+        return self._session
+
+    async def _fetch(self, request: AsyncRequest) -> AsyncResult:
+        session = await self._get_session()
+        url = self.url_rewriter(request.url) if self.url_rewriter else request.url
+        async with self._semaphore(request.upstream):
+            started = time.monotonic()
+            try:
+                async with session.get(url, params=request.params or None, headers=request.headers or None,
+                                       proxy=request.proxy) as res:
+                    body = await res.read()
+                    result = AsyncResult(status=res.status, headers=dict(res.headers), size=len(body),
+                                         elapsed=time.monotonic() - started)
+                    if res.status == 200 and body:
+                        try:
+                            result.data = await res.json(content_type=None)
+                        except ValueError:
+                            result.error = "响应不是有效的JSON"
+                    return result
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                return AsyncResult(error=str(err) or type(err).__name__, elapsed=time.monotonic() - started)
+
+    async def _fetch_all(self, requests: List[AsyncRequest]) -> List[AsyncResult]:
+        return list(await asyncio.gather(*(self._fetch(request) for request in requests)))
+
+    def fetch_many(self, requests: List[AsyncRequest]) -> List[AsyncResult]:
+        """
+        并发执行一批GET请求，阻塞等待全部完成，结果与请求一一对应
+        """
+        if not requests:
+            return []
+        if not self.available():
+            raise RuntimeError("未安装 aiohttp，无法使用异步引擎")
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(requests), loop)
+        return future.result(timeout=self.timeout * (len(requests) + 1))
+
+    def close(self):
+        """
+        关闭会话并停止事件循环线程
+        """
+        with self._lock:
+            loop, session = self._loop, self._session
+            self._loop, self._thread, self._session = None, None, None
+        if not loop:
+            return
+        if session:
+            try:
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+            except Exception as err:
+                logger.debug(f"关闭异步会话失败：{str(err)}")
+        loop.call_soon_threadsafe(loop.stop)
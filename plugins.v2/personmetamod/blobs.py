@@ -0,0 +1,128 @@
+import base64
+import hashlib
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class BlobCache:
+    """
+    按内容哈希（SHA1）存放的图片文件缓存，位于插件数据目录
+    文件按哈希前两位分目录存放，总大小超过上限时按最近使用时间淘汰
+    最近使用时间记录在文件的 mtime 中，重启后扫描目录即可恢复索引
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # {sha1: [大小, 最近使用时间]}
+        self._index: Dict[str, list] = {}
+        self._total = 0
+        self._load()
+
+    def _load(self):
+        if not self.root.exists():
+            return
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            self._index[path.name] = [stat.st_size, stat.st_mtime]
+            self._total += stat.st_size
+
+    def _path(self, sha1: str) -> Path:
+        return self.root / sha1[:2] / sha1
+
+    def has(self, sha1: str) -> bool:
+        with self._lock:
+            return sha1 in self._index
+
+    def put(self, content: bytes) -> str:
+        """
+        写入图片，返回内容哈希
+        """
+        sha1 = hashlib.sha1(content).hexdigest()
+        if not self.max_bytes or len(content) > self.max_bytes:
+            return sha1
+        path = self._path(sha1)
+        with self._lock:
+            hit = sha1 in self._index
+            if hit:
+                self._index[sha1][1] = time.time()
+        if hit:
+            # 同步文件修改时间，重启后按修改时间重建的淘汰顺序与内存中一致
+            try:
+                os.utime(path)
+                return sha1
+            except OSError:
+                # 文件被外部删除，重新写入
+                pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{sha1}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if sha1 not in self._index:
+                self._total += len(content)
+            self._index[sha1] = [len(content), time.time()]
+            self._evict()
+        return sha1
+
+    def read_base64(self, sha1: str) -> Optional[str]:
+        """
+        通过内存映射读取图片并编码为base64，文件不存在时返回None
+        """
+        with self._lock:
+            entry = self._index.get(sha1)
+            if not entry:
+                self.misses += 1
+                return None
+            entry[1] = time.time()
+        path = self._path(sha1)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = base64.b64encode(mm).decode()
+            os.utime(path)
+        except (OSError, ValueError):
+            # 文件被外部删除或为空
+            with self._lock:
+                if self._index.pop(sha1, None):
+                    self._total -= entry[0]
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def _evict(self):
+        """
+        超过上限时淘汰最久未使用的文件，调用方需持有锁
+        """
+        if self._total <= self.max_bytes:
+            return
+        for sha1, (size, _) in sorted(self._index.items(), key=lambda x: x[1][1]):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            self._path(sha1).unlink(missing_ok=True)
+            del self._index[sha1]
+            self._total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0
+            }
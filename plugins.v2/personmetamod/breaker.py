@@ -0,0 +1,218 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.log import logger
+
+
+class CircuitOpenError(Exception):
+    """
+    依赖处于熔断状态，调用被直接拒绝
+    """
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"{key} 已熔断，{int(retry_after)} 秒后重试")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    单个依赖（媒体服务器或上游）的熔断器
+    连续失败（含超过慢调用阈值的调用）达到次数后打开，冷却期内直接拒绝调用；
+    冷却结束后进入半开状态，只放行一个探测请求，成功则关闭，失败则以加倍的冷却时间重新打开
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, key: str, failures: int = 5, slow_seconds: float = 20,
+                 cooldown: float = 60, max_cooldown: float = 900):
+        self.key = key
+        # 连续失败次数阈值，0为不熔断
+        self.failures = failures
+        # 慢调用阈值（秒），0为不检查
+        self.slow_seconds = slow_seconds
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._current_cooldown = cooldown
+        self._opened_at = 0.0
+        self._probing = False
+        # 统计
+        self.calls = 0
+        self.failed_calls = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+        self.latency = 0.0
+        self.last_error: Optional[str] = None
+
+    def _retry_after(self, now: float) -> float:
+        """
+        距离可以再次调用的秒数，调用方需持有锁
+        """
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self._current_cooldown - now
+            if remaining > 0:
+                return remaining
+            self.state = self.HALF_OPEN
+            self._probing = False
+            logger.info(f"{self.key} 熔断冷却结束，发送探测请求")
+        if self.state == self.HALF_OPEN and self._probing:
+            # 探测请求尚未返回
+            return min(self.cooldown, 5) or 1
+        return 0
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return self._retry_after(time.time())
+
+    def before_call(self):
+        """
+        调用前检查，熔断中抛出 CircuitOpenError；半开状态下占用唯一的探测名额
+        """
+        with self._lock:
+            wait = self._retry_after(time.time())
+            if wait:
+                self.rejected += 1
+                raise CircuitOpenError(self.key, wait)
+            if self.state == self.HALF_OPEN:
+                self._probing = True
+
+    def record(self, ok: bool, elapsed: float, error: str = None):
+        """
+        记录一次调用结果
+        """
+        slow = bool(self.slow_seconds and elapsed > self.slow_seconds)
+        with self._lock:
+            self.calls += 1
+            self.latency = elapsed if self.calls == 1 else self.latency * 0.8 + elapsed * 0.2
+            if ok and not slow:
+                if self.state != self.CLOSED:
+                    logger.info(f"{self.key} 探测成功，熔断恢复")
+                self.state = self.CLOSED
+                self._probing = False
+                self._consecutive = 0
+                self._current_cooldown = self.cooldown
+                return
+            if slow:
+                self.slow_calls += 1
+                error = error or f"响应耗时 {elapsed:.1f} 秒"
+            else:
+                self.failed_calls += 1
+            self.last_error = error
+            self._consecutive += 1
+            if self.state == self.HALF_OPEN:
+                self._current_cooldown = min(self._current_cooldown * 2, self.max_cooldown)
+                self._open(f"探测失败（{error or '请求失败'}）")
+            elif self.state == self.CLOSED and self.failures and self._consecutive >= self.failures:
+                self._open(f"连续 {self._consecutive} 次失败（{error or '请求失败'}）")
+
+    def _open(self, reason: str):
+        self.state = self.OPEN
+        self.opened += 1
+        self._probing = False
+        self._opened_at = time.time()
+        logger.warn(f"{self.key} {reason}，熔断 {int(self._current_cooldown)} 秒")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_after = self._retry_after(time.time()) if self.state != self.CLOSED else 0
+            return {
+                "key": self.key,
+                "state": self.state,
+                "retry_after": round(retry_after, 1),
+                "consecutive_failures": self._consecutive,
+                "calls": self.calls,
+                "failed": self.failed_calls,
+                "slow": self.slow_calls,
+                "rejected": self.rejected,
+                "opened": self.opened,
+                "latency": round(self.latency, 3),
+                "last_error": self.last_error
+            }
+
+
+class BreakerBoard:
+    """
+    按依赖名称管理熔断器，媒体服务器按服务器名称、其它上游按上游名称区分
+    调用方在请求出现连接失败、超时或5xx时通过 mark_failed 标记，由装饰器在调用结束时统一记录
+    """
+
+    def __init__(self):
+        self.failures = 5
+        self.slow_seconds = 20.0
+        self.cooldown = 60.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, failures: int, slow_seconds: float, cooldown: float):
+        """
+        更新阈值，已有熔断器的状态保持不变
+        """
+        with self._lock:
+            self.failures, self.slow_seconds, self.cooldown = failures, slow_seconds, cooldown
+            for breaker in self._breakers.values():
+                breaker.failures, breaker.slow_seconds, breaker.cooldown = failures, slow_seconds, cooldown
+
+    def get(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if not breaker:
+                breaker = CircuitBreaker(key, failures=self.failures, slow_seconds=self.slow_seconds,
+                                         cooldown=self.cooldown)
+                self._breakers[key] = breaker
+            return breaker
+
+    def ensure(self, keys: Iterable[str]):
+        """
+        任一依赖熔断中时抛出 CircuitOpenError，用于在开始处理条目前快速失败
+        """
+        for key in keys:
+            wait = self.get(key).retry_after()
+            if wait:
+                raise CircuitOpenError(key, wait)
+
+    def closed(self, key: str) -> bool:
+        return self.get(key).state == CircuitBreaker.CLOSED
+
+    def begin(self):
+        """
+        开始一次受保护的调用，清除当前线程的失败标记
+        """
+        self._local.error = None
+
+    def mark_failed(self, error: str = "请求失败"):
+        """
+        标记当前线程正在进行的调用失败
+        """
+        self._local.error = error
+
+    def check_response(self, res) -> bool:
+        """
+        响应为空（连接失败或超时）、429或5xx时标记失败，返回响应是否健康
+        """
+        if res is None:
+            self.mark_failed("无响应")
+            return False
+        if res.status_code == 429 or res.status_code >= 500:
+            self.mark_failed(f"HTTP {res.status_code}")
+            return False
+        return True
+
+    def end(self) -> Optional[str]:
+        """
+        结束一次受保护的调用，返回调用期间标记的失败原因
+        """
+        error = getattr(self._local, "error", None)
+        self._local.error = None
+        return error
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.snapshot() for breaker in sorted(breakers, key=lambda x: x.key)]
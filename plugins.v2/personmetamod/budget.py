@@ -0,0 +1,191 @@
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple, Union
+
+from app.log import logger
+
+
+class RequestBudget:
+    """
+    按媒体条目统计上游请求次数与流量，超出预算的条目记为异常
+    当前条目保存在线程本地变量中，不同线程的条目互不干扰
+    """
+
+    def __init__(self, limit: int = 0, max_outliers: int = 20):
+        # 单个条目的请求数上限，0 表示不检查
+        self.limit = limit
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._outliers = deque(maxlen=max_outliers)
+        self._totals: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0])
+        # 条件请求返回304、避免了下载的次数与节省的流量 {upstream: [count, bytes]}
+        self._revalidated: Dict[str, list] = defaultdict(lambda: [0, 0])
+        # 内容未变化、无需发起的写请求次数 {(upstream, method): count}
+        self._skipped: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._items = 0
+
+    def reset(self):
+        """
+        清空运行统计
+        """
+        with self._lock:
+            self._outliers.clear()
+            self._totals.clear()
+            self._revalidated.clear()
+            self._skipped.clear()
+            self._items = 0
+
+    @contextmanager
+    def item(self, title: str):
+        """
+        在该上下文中发生的请求都计入此条目
+        """
+        counters: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0])
+        previous = getattr(self._local, "counters", None)
+        self._local.counters = counters
+        try:
+            yield counters
+        finally:
+            self._local.counters = previous
+            self._finish(title, counters)
+
+    def _finish(self, title: str, counters: Dict[Tuple[str, str], list]):
+        requests = sum(x[0] for x in counters.values())
+        with self._lock:
+            self._items += 1
+            for key, (count, nbytes) in counters.items():
+                total = self._totals[key]
+                total[0] += count
+                total[1] += nbytes
+            if self.limit and requests > self.limit:
+                logger.warn(f"{title} 共发起 {requests} 次上游请求，超出预算 {self.limit}")
+                self._outliers.appendleft({
+                    "time": time.time(),
+                    "title": title,
+                    "requests": requests,
+                    "bytes": sum(x[1] for x in counters.values()),
+                    "detail": {f"{upstream}:{method}": count
+                               for (upstream, method), (count, _) in counters.items()}
+                })
+
+    def record(self, upstream: str, method: str = "GET", nbytes: int = 0):
+        """
+        记录一次请求
+        """
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            with self._lock:
+                total = self._totals[(upstream, method)]
+                total[0] += 1
+                total[1] += nbytes
+            return
+        counter = counters[(upstream, method)]
+        counter[0] += 1
+        counter[1] += nbytes
+
+    def add_bytes(self, upstream: str, nbytes: int, method: str = "GET"):
+        """
+        为已记录的请求补充流量
+        """
+        if not nbytes:
+            return
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            with self._lock:
+                self._totals[(upstream, method)][1] += nbytes
+            return
+        counters[(upstream, method)][1] += nbytes
+
+    def not_modified(self, upstream: str, saved_bytes: int = 0):
+        """
+        记录一次经条件请求确认未变化、无需下载的响应
+        """
+        with self._lock:
+            stat = self._revalidated[upstream]
+            stat[0] += 1
+            stat[1] += saved_bytes or 0
+
+    def skipped(self, upstream: str, method: str = "POST"):
+        """
+        记录一次因内容未变化而省去的请求，不计入请求数
+        """
+        with self._lock:
+            self._skipped[(upstream, method)] += 1
+
+    def total_requests(self) -> int:
+        """
+        本次运行已完成条目的请求总数（不含正在处理的条目）
+        """
+        with self._lock:
+            return sum(x[0] for x in self._totals.values())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = self._items
+            upstreams = {}
+            for (upstream, method), (count, nbytes) in sorted(self._totals.items()):
+                upstreams[f"{upstream}:{method}"] = {
+                    "requests": count,
+                    "bytes": nbytes,
+                    "per_item": round(count / items, 2) if items else 0
+                }
+            return {
+                "items": items,
+                "limit": self.limit,
+                "upstreams": upstreams,
+                "revalidated": {upstream: {"count": count, "saved_bytes": nbytes}
+                                for upstream, (count, nbytes) in sorted(self._revalidated.items())},
+                "skipped": {f"{upstream}:{method}": count for (upstream, method), count in sorted(self._skipped.items())},
+                "outliers": list(self._outliers)
+            }
+
+
+def accounted(upstream: Union[str, Callable[[dict], str]], method: str = "GET",
+              breaker: Union[str, Callable[[dict], str]] = None):
+    """
+    装饰插件方法，每次调用记为一次上游请求，并按该上游的限速取得令牌
+    upstream 可以是上游名称，或根据调用参数返回上游名称的函数
+    breaker 为熔断器名称或返回名称的函数，默认与上游名称相同；
+    熔断中直接抛出 CircuitOpenError，调用抛出异常、被标记失败或耗时过长时计入失败
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            name = upstream(kwargs) if callable(upstream) else upstream
+            circuit = self._breakers.get((breaker(kwargs) if callable(breaker) else breaker) or name or "unknown")
+            circuit.before_call()
+            self._jobs.limiter.acquire(name, lane=self._jobs.current_lane, stop_event=self._event)
+            self._budget.record(name or "unknown", method)
+            self._breakers.begin()
+            started = time.monotonic()
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception as err:
+                self._breakers.end()
+                circuit.record(False, time.monotonic() - started, str(err))
+                raise
+            error = self._breakers.end()
+            circuit.record(not error, time.monotonic() - started, error)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def server_upstream(kwargs: dict) -> str:
+    """
+    媒体服务器请求按服务器类型归类
+    """
+    return kwargs.get("server_type") or "mediaserver"
+
+
+def server_breaker(kwargs: dict) -> str:
+    """
+    媒体服务器请求按服务器名称分别熔断
+    """
+    return kwargs.get("server") or server_upstream(kwargs)
@@ -0,0 +1,87 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .zhcache import text_cache
+
+# 姓名中常见的分隔符：空白、间隔号、连字符等
+_NAME_SEPARATORS = re.compile(r"[\s·•・‧.\-_]+")
+# 豆瓣角色描述的前缀，如 "饰 张三"、"配 李四"
+_CHARACTER_PREFIX = re.compile(r"^\s*(饰演?|配音?)\s*")
+# 媒体服务器人物类型对应的豆瓣职务
+_PERSON_ROLES = {
+    "Actor": "演员",
+    "GuestStar": "演员",
+    "Director": "导演",
+    "Writer": "编剧",
+    "Producer": "制片人",
+}
+
+
+def name_keys(name: Optional[str]) -> Set[str]:
+    """
+    生成姓名的规范化形式：去除空白与分隔符、大小写折叠、简繁体
+    """
+    if not name:
+        return set()
+    base = _NAME_SEPARATORS.sub("", name).casefold()
+    if not base:
+        return set()
+    keys = {base}
+    if text_cache.is_chinese(base):
+        keys.add(text_cache.convert(base, "zh-hans"))
+        keys.add(text_cache.convert(base, "zh-hant"))
+    return keys
+
+
+def same_role(actor: dict, person: dict) -> bool:
+    """
+    豆瓣人物与媒体服务器人物在作品中的角色是否一致
+    双方都有角色名时比较角色名，否则比较职务（演员、导演等）
+    """
+    character = _CHARACTER_PREFIX.sub("", actor.get("character") or "")
+    if person.get("Role") and character:
+        return bool(name_keys(person.get("Role")) & name_keys(character))
+    role = _PERSON_ROLES.get(person.get("Type"))
+    return bool(role) and (role in (actor.get("roles") or []) or role in (actor.get("character") or ""))
+
+
+class DoubanCastIndex:
+    """
+    豆瓣演职人员索引
+    每次获取豆瓣数据后构建一次，同一季的所有人物、所有集共用，按姓名查找为O(1)
+    """
+
+    def __init__(self, actors: List[dict] = None):
+        self.actors = actors or []
+        self._index: Dict[str, List[dict]] = {}
+        for actor in self.actors:
+            keys = name_keys(actor.get("latin_name")) | name_keys(actor.get("name"))
+            for key in keys:
+                self._index.setdefault(key, []).append(actor)
+
+    def __len__(self) -> int:
+        return len(self.actors)
+
+    def __iter__(self):
+        return iter(self.actors)
+
+    def match(self, names: Iterable[Optional[str]],
+              predicate: Callable[[dict], bool] = None) -> Optional[dict]:
+        """
+        按候选姓名的先后顺序查找，返回第一个满足条件的豆瓣人物
+        """
+        for name in names:
+            for key in name_keys(name):
+                for actor in self._index.get(key) or []:
+                    if not predicate or predicate(actor):
+                        return actor
+        return None
+
+    def match_person(self, names: Iterable[Optional[str]], aliases: Iterable[Optional[str]], person: dict,
+                     predicate: Callable[[dict], bool] = None) -> Optional[dict]:
+        """
+        查找媒体服务器人物对应的豆瓣人物：先按主要姓名查找；
+        别名常与其他人重名，仅在主要姓名未命中时使用，并要求角色一致
+        """
+        return self.match(names, predicate=predicate) or \
+            self.match(aliases, predicate=lambda x: same_role(x, person) and (not predicate or predicate(x)))
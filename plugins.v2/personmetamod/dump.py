@@ -0,0 +1,67 @@
+import bz2
+import gzip
+import json
+import lzma
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from .records import PersonRecord
+
+
+def open_text(path: Path, mode: str = "rt") -> IO:
+    """
+    按扩展名打开可能经过压缩的文本文件
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".gz":
+        return gzip.open(path, mode, encoding="utf-8")
+    if suffix == ".bz2":
+        return bz2.open(path, mode, encoding="utf-8")
+    if suffix in [".xz", ".lzma"]:
+        return lzma.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def parse_person(data: dict, fetched_at: float = None) -> Optional[PersonRecord]:
+    """
+    解析一条人物数据，支持两种格式：
+    1. 本插件导出的记录（含 tmdbid 字段）
+    2. TMDB人物详情（含 id 与 biography 字段，external_ids 可选）
+    TMDB每日ID导出文件只有姓名等少量字段，不足以用作缓存，返回None
+    记录自带 fetched_at 时以其为获取时间，否则使用传入的 fetched_at（导出文件的修改时间），
+    避免旧导出被当作刚获取的数据覆盖本地较新的记录
+    """
+    if not isinstance(data, dict):
+        return None
+    if data.get("fetched_at"):
+        fetched_at = float(data["fetched_at"])
+    if data.get("tmdbid"):
+        return PersonRecord.from_dict({**data, "fetched_at": fetched_at} if fetched_at else data)
+    if data.get("id") and "biography" in data:
+        return PersonRecord.from_tmdb(data, fetched_at=fetched_at)
+    return None
+
+
+def iter_persons(path: Path, stats: dict = None) -> Iterator[PersonRecord]:
+    """
+    流式读取JSONL人物导出文件，逐条产出记录，内存占用与文件大小无关
+    stats 用于回传跳过的行数
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("skipped", 0)
+    # 导出文件的修改时间作为其中记录的获取时间
+    fetched_at = path.stat().st_mtime
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = parse_person(json.loads(line), fetched_at=fetched_at)
+            except (ValueError, TypeError, KeyError):
+                record = None
+            if record:
+                yield record
+            else:
+                stats["skipped"] += 1
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class CountingReader:
+    """
+    包装响应原始流，统计读取的字节数
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self.size += len(data)
+        return data
+
+
+def streaming_available() -> bool:
+    return ijson is not None
+
+
+def project(item: dict, fields: Optional[Iterable[str]]) -> dict:
+    """
+    仅保留需要的字段
+    """
+    if not fields:
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+def iter_json_items(stream, fields: Iterable[str] = None, prefix: str = "Items.item") -> Iterator[dict]:
+    """
+    增量解析响应流中 Items 数组的元素，每次只在内存中保留一个元素
+    """
+    fields = tuple(fields) if fields else None
+    for item in ijson.items(stream, prefix, use_float=True):
+        yield project(item, fields)
+
+
+def read_json_items(stream, fields: Iterable[str], max_memory: int = 4 * 1024 * 1024) -> Iterator[dict]:
+    """
+    先把整个响应流读入临时文件（不超过 max_memory 时留在内存中），随即可以释放连接；
+    再从临时文件增量解析，逐个返回只保留指定字段的元素。解析错误在迭代时抛出
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        shutil.copyfileobj(stream, spooled, 64 * 1024)
+        spooled.seek(0)
+    except Exception:
+        spooled.close()
+        raise
+    return _iter_spooled(spooled, fields)
+
+
+def _iter_spooled(spooled, fields: Iterable[str]) -> Iterator[dict]:
+    with spooled:
+        yield from iter_json_items(spooled, fields)
+
+
+def resume_items(items: Iterable, position: Optional[dict], key: Callable[[Any], str] = lambda x: x.item_id,
+                 window: int = 200) -> Iterator[Tuple[int, Any]]:
+    """
+    从扫描游标处继续，逐个返回 (序号, 条目)
+    游标记录第一个未完成条目的ID（next_id）与序号（count）：优先按ID定位，前面有条目增删时也能对齐；
+    原序号之后 window 个条目内仍未找到该ID（条目已删除）时按原序号继续，最多缓存 window 个条目
+    """
+    position = position or {}
+    next_id, count = position.get("next_id"), position.get("count", 0)
+    iterator = enumerate(items)
+    if not next_id:
+        for index, item in iterator:
+            if index >= count:
+                yield index, item
+        return
+    buffered = []
+    for index, item in iterator:
+        if key(item) == next_id:
+            yield index, item
+            break
+        if index >= count:
+            buffered.append((index, item))
+            if len(buffered) > window:
+                yield from buffered
+                break
+    else:
+        yield from buffered
+        return
+    yield from iterator
@@ -0,0 +1,238 @@
+import functools
+import gzip
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+PLAN_FORMAT = "personmetamod-plan"
+PLAN_VERSION = 2
+# 变更类型：info 更新媒体项详情（人物资料或条目人物列表），image 更新人物图片
+PLAN_OPS = ("info", "image")
+# 只记录变化字段时仍保留的字段，用于识别媒体项与应用顺序
+PLAN_IDENTITY_FIELDS = ("Id", "Type")
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(json.dumps(value, ensure_ascii=False, sort_keys=True,
+                                   separators=(",", ":")).encode()).hexdigest()[:12]
+
+
+def op_key(op: dict) -> Tuple[str, str, str]:
+    """
+    同一媒体项的同类变更只保留最后一次
+    """
+    return op.get("op"), op.get("server"), op.get("item_id")
+
+
+def pick_fields(data: dict, fields) -> dict:
+    """
+    只保留变化的字段与识别字段
+    """
+    return {k: v for k, v in data.items() if k in PLAN_IDENTITY_FIELDS or k in fields}
+
+
+def op_phase(op: dict) -> int:
+    """
+    应用顺序：先写人物（资料与图片），再改写条目的人物列表
+    """
+    return 0 if op.get("op") == "image" or (op.get("data") or {}).get("Type") == "Person" else 1
+
+
+class PlanWriter:
+    """
+    流式写出变更集：gzip压缩的JSONL，首行为格式头，其后每行一个变更
+    {"i": 序号, "op": 类型, "server", "server_type", "item_id", "data"}
+    partial 为真的变更只含变化的字段，应用时合并到媒体项的当前详情上
+    """
+
+    def __init__(self, path: Path, meta: dict = None):
+        self.path = path
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._index = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+        self._file.write(json.dumps({
+            "format": PLAN_FORMAT,
+            "version": PLAN_VERSION,
+            "created_at": time.time(),
+            **(meta or {})
+        }, ensure_ascii=False) + "\n")
+
+    def add(self, op: str, server: str, server_type: str, item_id: str, data, partial: bool = False):
+        with self._lock:
+            record = {"i": self._index, "op": op, "server": server, "server_type": server_type,
+                      "item_id": item_id, "data": data}
+            if partial:
+                record["partial"] = True
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._index += 1
+            self.counts[op] = self.counts.get(op, 0) + 1
+
+    def close(self) -> Dict[str, int]:
+        """
+        写完变更集，返回各类型变更数
+        """
+        self._file.close()
+        self._tmp_path.replace(self.path)
+        return dict(self.counts)
+
+    def abort(self):
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class PlanRecorder:
+    """
+    当前线程正在写入的变更集，处于计划模式的线程中写操作只记录不执行
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def writer(self) -> Optional[PlanWriter]:
+        return getattr(self._local, "writer", None)
+
+    @contextmanager
+    def recording(self, writer: Optional[PlanWriter]):
+        previous = self.writer
+        self._local.writer = writer
+        try:
+            yield
+        finally:
+            self._local.writer = previous
+
+
+def planned(op: str, data_arg: str, fields_arg: str = None):
+    """
+    装饰写操作：当前线程处于计划模式时记入变更集并视为成功，否则照常执行
+    data_arg 为写入内容对应的参数名，fields_arg 为变化字段列表对应的参数名，传入时只记录这些字段
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            writer = self._plans.writer
+            if writer is None:
+                return func(self, *args, **kwargs)
+            data = kwargs.get(data_arg)
+            fields = kwargs.get(fields_arg) if fields_arg else None
+            partial = isinstance(data, dict) and fields is not None
+            writer.add(op, server=kwargs.get("server"), server_type=kwargs.get("server_type"),
+                       item_id=kwargs.get("itemid"), data=pick_fields(data, fields) if partial else data,
+                       partial=partial)
+            return True
+
+        return wrapper
+
+    return decorator
+
+
+def read_plan_header(path: Path) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+    if header.get("format") != PLAN_FORMAT:
+        raise ValueError(f"不是有效的变更集：{path}")
+    if header.get("version", 0) > PLAN_VERSION:
+        raise ValueError(f"变更集版本 {header.get('version')} 高于当前支持的版本 {PLAN_VERSION}")
+    return header
+
+
+def iter_plan(path: Path) -> Iterator[dict]:
+    """
+    逐条读取变更
+    """
+    read_plan_header(path)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def latest_ops(path: Path) -> Set[int]:
+    """
+    每个 (类型, 服务器, 媒体项) 最后一次变更的序号，应用时只执行这些变更
+    """
+    latest: Dict[Tuple[str, str, str], int] = {}
+    for op in iter_plan(path):
+        latest[op_key(op)] = op["i"]
+    return set(latest.values())
+
+
+def progress_path(path: Path) -> Path:
+    return path.with_name(path.name.replace(".jsonl.gz", "") + ".applied")
+
+
+def applied_ops(path: Path) -> Set[int]:
+    """
+    已成功应用的变更序号，用于失败后重新应用时跳过
+    """
+    progress = progress_path(path)
+    if not progress.exists():
+        return set()
+    with open(progress, encoding="utf-8") as f:
+        return {int(x) for x in f if x.strip().isdigit()}
+
+
+def summarize_plan(path: Path) -> dict:
+    """
+    变更集概要：各服务器各类型的变更数与已应用数
+    """
+    header = read_plan_header(path)
+    latest = latest_ops(path)
+    applied = applied_ops(path)
+    servers: Dict[str, Dict[str, int]] = {}
+    for op in iter_plan(path):
+        if op["i"] not in latest:
+            continue
+        kind = "image" if op["op"] == "image" else ("person" if op_phase(op) == 0 else "people")
+        counts = servers.setdefault(op.get("server"), {})
+        counts[kind] = counts.get(kind, 0) + 1
+    return {
+        "path": str(path),
+        "created_at": header.get("created_at"),
+        "order": header.get("order"),
+        "size": path.stat().st_size,
+        "ops": len(latest),
+        "applied": len(applied & latest),
+        "servers": servers
+    }
+
+
+def diff_plans(old_path: Path, new_path: Path, limit: int = 100) -> dict:
+    """
+    比较两个变更集：新增、移除以及内容不同的变更，内容不同时列出变化的字段
+    """
+
+    def __fingerprints(path: Path) -> Dict[Tuple[str, str, str], Dict[str, str]]:
+        result = {}
+        for op in iter_plan(path):
+            data = op.get("data")
+            result[op_key(op)] = {k: _digest(v) for k, v in data.items()} if isinstance(data, dict) \
+                else {"": _digest(data)}
+        return result
+
+    old, new = __fingerprints(old_path), __fingerprints(new_path)
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = []
+    for key in new:
+        if key in old and new[key] != old[key]:
+            fields = sorted(k for k in set(new[key]) | set(old[key]) if new[key].get(k) != old[key].get(k))
+            changed.append((key, fields))
+    return {
+        "added": len(added),
+        "removed": len(removed),
+        "changed": len(changed),
+        "unchanged": len(new) - len(added) - len(changed),
+        "added_items": [list(x) for x in added[:limit]],
+        "removed_items": [list(x) for x in removed[:limit]],
+        "changed_items": [list(key) + [fields] for key, fields in changed[:limit]]
+    }
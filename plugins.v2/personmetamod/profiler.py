@@ -0,0 +1,222 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from app.log import logger
+
+
+class RunProfiler:
+    """
+    按需剖析下一次刮削运行
+    cprofile 模式：在进入运行的每个线程中启用 cProfile，结束时合并为一个 pstats 文件；
+    Python 3.12 起 cProfile 基于 sys.monitoring，全进程只能有一个且覆盖所有线程，此时改为整个运行期间全局启用
+    sampling 模式：后台线程定期采集这些线程的调用栈，输出 flamegraph 可用的折叠栈文件
+    """
+    MODES = ("cprofile", "sampling")
+    # cProfile 是否只能全局启用
+    GLOBAL_CPROFILE = sys.version_info >= (3, 12)
+
+    def __init__(self, interval: float = 0.01, top: int = 30):
+        # 采样间隔（秒）
+        self.interval = interval
+        self.top = top
+        self._lock = threading.Lock()
+        self._armed: Optional[str] = None
+        self._mode: Optional[str] = None
+        self._label: Optional[str] = None
+        self._started_at = 0.0
+        # 正在运行中的线程 {线程ID: 嵌套层数}
+        self._threads: Dict[int, int] = {}
+        self._profiles: Dict[int, cProfile.Profile] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def armed(self) -> Optional[str]:
+        return self._armed
+
+    @property
+    def active(self) -> bool:
+        return self._mode is not None
+
+    def arm(self, mode: str = "cprofile"):
+        """
+        剖析下一次运行
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的剖析模式：{mode}")
+        self._armed = mode
+
+    def disarm(self):
+        self._armed = None
+
+    def start(self, label: str) -> bool:
+        """
+        已预约剖析时开始剖析本次运行，返回是否开始
+        """
+        with self._lock:
+            if not self._armed or self._mode:
+                return False
+            self._mode, self._armed = self._armed, None
+            self._label = label
+            self._started_at = time.time()
+            self._threads.clear()
+            self._profiles.clear()
+            self._stacks.clear()
+            self._samples = 0
+        logger.info(f"开始剖析 {label}（{self._mode}）")
+        if self._mode == "cprofile" and self.GLOBAL_CPROFILE:
+            profile = self._profiles[0] = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as err:
+                logger.warn(f"无法启用 cProfile：{str(err)}")
+                self._profiles.clear()
+        if self._mode == "sampling":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="personmetamod-sampler", daemon=True)
+            self._sampler.start()
+        return True
+
+    def enter(self):
+        """
+        当前线程开始执行属于本次运行的代码
+        """
+        if not self._mode:
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(ident, 0)
+            self._threads[ident] = depth + 1
+            if depth or self._mode != "cprofile" or self.GLOBAL_CPROFILE:
+                return
+            profile = self._profiles.get(ident)
+            if not profile:
+                profile = self._profiles[ident] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # 该线程已有其它剖析器
+            pass
+
+    def exit(self):
+        if not self._mode:
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(ident, 0) - 1
+            if depth > 0:
+                self._threads[ident] = depth
+                return
+            self._threads.pop(ident, None)
+            profile = self._profiles.get(ident) if self._mode == "cprofile" and not self.GLOBAL_CPROFILE else None
+        if profile:
+            profile.disable()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = set(self._threads)
+            idents |= {x.ident for x in threading.enumerate() if x.name == "personmetamod-aio"}
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{getattr(code, 'co_qualname', code.co_name)}")
+                    frame = frame.f_back
+                with self._lock:
+                    self._stacks[";".join(reversed(stack))] += 1
+                    self._samples += 1
+
+    def stop(self, path: Path) -> Optional[dict]:
+        """
+        结束剖析并写出结果，返回摘要
+        path 为不含扩展名的输出路径，cprofile 写出 .pstats，sampling 写出 .collapsed，另写出 .txt 摘要
+        """
+        with self._lock:
+            mode, label = self._mode, self._label
+            if not mode:
+                return None
+            self._mode = None
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join(timeout=5)
+            self._sampler = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        elapsed = time.time() - self._started_at
+        if mode == "cprofile":
+            for profile in self._profiles.values():
+                profile.disable()
+            summary = self._write_pstats(path)
+        else:
+            summary = self._write_collapsed(path)
+        if summary is None:
+            logger.warn(f"剖析 {label} 未采集到数据")
+            return None
+        summary.update({"label": label, "mode": mode, "started_at": self._started_at,
+                        "elapsed": round(elapsed, 1)})
+        text = [f"{label}（{mode}），耗时 {elapsed:.1f} 秒"] + [
+            f"{x['name']}  {x['own']:.3f}s  {x['cumulative']:.3f}s  {x.get('calls', '-')}"
+            for x in summary["top"]]
+        path.with_suffix(".txt").write_text("\n".join(text) + "\n", encoding="utf-8")
+        logger.info(f"剖析 {label} 完成，结果已写入 {summary['file']}")
+        return summary
+
+    def _write_pstats(self, path: Path) -> Optional[dict]:
+        profiles = list(self._profiles.values())
+        self._profiles.clear()
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        file = path.with_suffix(".pstats")
+        stats.dump_stats(str(file))
+        rows = []
+        for (filename, lineno, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "name": f"{Path(filename).name}:{lineno}:{func}" if lineno else func,
+                "calls": nc,
+                "own": round(tt, 4),
+                "cumulative": round(ct, 4)
+            })
+        rows.sort(key=lambda x: x["own"], reverse=True)
+        return {"file": str(file), "scope": "process" if self.GLOBAL_CPROFILE else f"{len(profiles)} threads",
+                "top": rows[:self.top]}
+
+    def _write_collapsed(self, path: Path) -> Optional[dict]:
+        if not self._stacks:
+            return None
+        file = path.with_suffix(".collapsed")
+        with open(file, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self._stacks.items():
+            frames: List[str] = stack.split(";")
+            own[frames[-1]] += count
+            seen: Set[str] = set()
+            for frame in frames:
+                if frame not in seen:
+                    seen.add(frame)
+                    cumulative[frame] += count
+        rows = [{
+            "name": name,
+            "own": round(count * self.interval, 3),
+            "cumulative": round(cumulative[name] * self.interval, 3)
+        } for name, count in own.most_common(self.top)]
+        self._stacks.clear()
+        return {"file": str(file), "scope": "plugin threads", "samples": self._samples, "top": rows}
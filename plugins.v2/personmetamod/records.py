@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Optional, Tuple
+
+from .zhcache import text_cache
+
+
+@dataclass(slots=True)
+class PersonRecord:
+    """
+    TMDB人物的精简表示，仅保留插件实际读取的字段
+    姓名与简介在构建时已转换为简体
+    """
+    tmdbid: int
+    name: Optional[str] = None
+    overview: Optional[str] = None
+    birthday: Optional[str] = None
+    deathday: Optional[str] = None
+    place_of_birth: Optional[str] = None
+    profile_path: Optional[str] = None
+    imdb_id: Optional[str] = None
+    tvdb_id: Optional[str] = None
+    also_known_as: Tuple[str, ...] = ()
+    fetched_at: float = field(default_factory=time.time)
+    # HTTP缓存校验头，过期后用于条件请求
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_tmdb(cls, data: dict, fetched_at: float = None) -> "PersonRecord":
+        """
+        从TMDB人物详情（含external_ids）构建
+        fetched_at 为数据的获取时间，默认为当前时间
+        """
+        ext_ids = data.get("external_ids") or {}
+        return cls(
+            tmdbid=int(data.get("id")),
+            name=text_cache.to_hans(data.get("name")) or None,
+            overview=text_cache.to_hans(data.get("biography")) or None,
+            birthday=data.get("birthday") or None,
+            deathday=data.get("deathday") or None,
+            place_of_birth=data.get("place_of_birth") or None,
+            profile_path=data.get("profile_path") or None,
+            imdb_id=ext_ids.get("imdb_id") or data.get("imdb_id") or None,
+            tvdb_id=str(ext_ids["tvdb_id"]) if ext_ids.get("tvdb_id") else None,
+            also_known_as=tuple(data.get("also_known_as") or ()),
+            fetched_at=fetched_at or time.time(),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        序列化为字典，省略空字段
+        """
+        result = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value not in (None, ()):
+                result[f.name] = list(value) if isinstance(value, tuple) else value
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PersonRecord":
+        names = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in names}
+        values["tmdbid"] = int(values["tmdbid"])
+        values["also_known_as"] = tuple(values.get("also_known_as") or ())
+        return cls(**values)
+
+
+class PersonCache:
+    """
+    人物记录的内存LRU缓存，按TMDBID索引，超过有效期的记录视为未命中
+    设置持久化存储后，内存未命中时回落到存储，写入时同步写入存储
+    """
+
+    def __init__(self, max_entries: int = 20000, ttl: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = None
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[int, PersonRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tmdbid: int) -> Optional[PersonRecord]:
+        with self._lock:
+            record = self._data.get(tmdbid)
+            if record and time.time() - record.fetched_at < self.ttl:
+                self._data.move_to_end(tmdbid)
+                self.hits += 1
+                return record
+        record = self.store.get_person(tmdbid) if self.store else None
+        if record and time.time() - record.fetched_at < self.ttl:
+            self._remember(record)
+            with self._lock:
+                self.hits += 1
+            return record
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get_stale(self, tmdbid: int) -> Optional[PersonRecord]:
+        """
+        获取记录而不检查有效期，用于过期后的条件请求，不计入命中统计
+        """
+        with self._lock:
+            record = self._data.get(tmdbid)
+        if record:
+            return record
+        return self.store.get_person(tmdbid) if self.store else None
+
+    def _remember(self, record: PersonRecord):
+        with self._lock:
+            self._data[record.tmdbid] = record
+            self._data.move_to_end(record.tmdbid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def put(self, record: PersonRecord):
+        self._remember(record)
+        if self.store:
+            self.store.put_person(record)
+
+    def invalidate(self, tmdbids: Iterable[int]):
+        """
+        使指定人物的缓存失效
+        """
+        tmdbids = list(tmdbids)
+        with self._lock:
+            for tmdbid in tmdbids:
+                self._data.pop(tmdbid, None)
+        if self.store:
+            self.store.delete_persons(tmdbids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
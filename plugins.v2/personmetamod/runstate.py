@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class RunState:
+    """
+    刮削运行状态（仅内存），供插件详情页展示进度
+    计数只做整数累加，热循环中的开销可以忽略
+    """
+
+    def __init__(self, max_errors: int = 20):
+        self._lock = threading.Lock()
+        self._errors = deque(maxlen=max_errors)
+        self._runs = 0
+        self.running = False
+        self.mode = None
+        self.started_at = None
+        self.finished_at = None
+        self.server = None
+        self.library = None
+        self.item = None
+        self.items_total = 0
+        self.items_done = 0
+        self.persons_total = 0
+        self.persons_done = 0
+        self.item_persons_total = 0
+        self.item_persons_done = 0
+
+    def start(self, mode: str, items_total: int = 0) -> bool:
+        """
+        开始一次运行，重置计数
+        已有运行未结束时（如全库扫描期间的近期扫描）只累加条目数，返回False，调用方不应重置其它运行统计
+        """
+        with self._lock:
+            self._runs += 1
+            if self._runs > 1:
+                self.items_total += items_total
+                return False
+            self.running = True
+            self.mode = mode
+            self.started_at = time.time()
+            self.finished_at = None
+            self.server = None
+            self.library = None
+            self.item = None
+            self.items_total = items_total
+            self.items_done = 0
+            self.persons_total = 0
+            self.persons_done = 0
+            self.item_persons_total = 0
+            self.item_persons_done = 0
+            return True
+
+    def finish(self):
+        """
+        结束运行，所有并发的运行都结束后才标记为已结束
+        """
+        with self._lock:
+            self._runs = max(self._runs - 1, 0)
+            if self._runs:
+                return
+            self.running = False
+            self.finished_at = time.time()
+            self.item = None
+
+    def set_position(self, server: str = None, library: str = None, item: str = None):
+        """
+        记录当前处理位置
+        """
+        if server is not None:
+            self.server = server
+        if library is not None:
+            self.library = library
+        if item is not None:
+            self.item = item
+
+    def add_items(self, count: int):
+        """
+        条目边枚举边处理时累加总数
+        """
+        with self._lock:
+            self.items_total += count
+
+    def item_done(self):
+        with self._lock:
+            self.items_done += 1
+
+    def add_persons(self, count: int):
+        """
+        登记一个媒体项中待处理的人物数量
+        """
+        with self._lock:
+            self.persons_total += count
+            self.item_persons_total = count
+            self.item_persons_done = 0
+
+    def person_done(self):
+        with self._lock:
+            self.persons_done += 1
+            self.item_persons_done += 1
+
+    def error(self, message: str):
+        """
+        记录最近的错误
+        """
+        with self._lock:
+            self._errors.appendleft((time.time(), message))
+
+    def snapshot(self) -> dict:
+        """
+        计算当前状态快照
+        """
+        with self._lock:
+            now = self.finished_at or time.time()
+            elapsed = max(now - self.started_at, 0) if self.started_at else 0
+            minutes = elapsed / 60 if elapsed else 0
+            persons_rate = self.persons_done / minutes if minutes else 0
+            items_rate = self.items_done / elapsed if elapsed else 0
+            eta: Optional[float] = None
+            if self.running and items_rate and self.items_total:
+                eta = max(self.items_total - self.items_done, 0) / items_rate
+            return {
+                "running": self.running,
+                "mode": self.mode,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": elapsed,
+                "server": self.server,
+                "library": self.library,
+                "item": self.item,
+                "items_total": self.items_total,
+                "items_done": self.items_done,
+                "persons_total": self.persons_total,
+                "persons_done": self.persons_done,
+                "persons_rate": persons_rate,
+                "eta": eta,
+                "items_pending": max(self.items_total - self.items_done, 0),
+                "persons_pending": max(self.item_persons_total - self.item_persons_done, 0),
+                "errors": list(self._errors),
+            }
@@ -0,0 +1,283 @@
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class Lane(IntEnum):
+    """
+    任务优先级通道，数值越小越优先
+    """
+    # 入库事件触发的实时刮削
+    REALTIME = 0
+    # 最近入库的条目
+    RECENT = 1
+    # 全库回填
+    BACKFILL = 2
+
+
+class RateLimiter:
+    """
+    各上游共享的令牌桶限速，所有通道共用同一份速率
+    低优先级通道只能使用高于保留量的令牌，保证实时任务在回填期间也能立即发出请求
+    """
+
+    def __init__(self, reserve: float = 0.2):
+        # 保留给实时通道的令牌比例
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        # {upstream: [每秒请求数, 当前令牌数, 上次补充时间]}
+        self._buckets: Dict[str, list] = {}
+
+    def configure(self, rates: Dict[str, float]):
+        """
+        设置各上游的每秒请求数，未设置或为0的上游不限速
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._buckets = {upstream: [rate, self._capacity(rate), now]
+                             for upstream, rate in rates.items() if rate and rate > 0}
+
+    def _capacity(self, rate: float) -> float:
+        """
+        桶容量：至少容纳一个令牌加上保留量，速率低于每秒1次时低优先级通道也能取得令牌
+        """
+        return float(max(rate, 1 / (1 - min(self.reserve, 0.9))))
+
+    def acquire(self, upstream: str, lane: Lane = Lane.BACKFILL, stop_event: threading.Event = None):
+        """
+        取得一个令牌，令牌不足时等待
+        """
+        while True:
+            with self._lock:
+                bucket = self._buckets.get(upstream)
+                if not bucket:
+                    return
+                rate, tokens, updated = bucket
+                capacity = self._capacity(rate)
+                now = time.monotonic()
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                floor = 1 if lane == Lane.REALTIME else min(capacity, 1 + capacity * self.reserve)
+                if tokens >= floor:
+                    bucket[1], bucket[2] = tokens - 1, now
+                    return
+                bucket[1], bucket[2] = tokens, now
+                wait = (floor - tokens) / rate
+            if stop_event and stop_event.wait(wait):
+                return
+            if not stop_event:
+                time.sleep(wait)
+
+    @staticmethod
+    def parse(value: str) -> Dict[str, float]:
+        """
+        解析 tmdb=40,douban=0.5 形式的配置
+        """
+        rates = {}
+        for part in (value or "").replace("，", ",").split(","):
+            upstream, _, rate = part.partition("=")
+            try:
+                rates[upstream.strip()] = float(rate)
+            except ValueError:
+                continue
+        return rates
+
+
+class JobGroup:
+    """
+    一批任务，用于等待整批完成
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # 有任务未执行即被取消（停止服务、保存配置等）
+        self.cancelled = False
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._done = threading.Event()
+        self._done.set()
+
+    def _add(self):
+        with self._cond:
+            self._pending += 1
+            self._done.clear()
+
+    def _finish(self, cancelled: bool = False):
+        with self._cond:
+            self.cancelled = self.cancelled or cancelled
+            self._pending -= 1
+            if self._pending <= 0:
+                self._pending = 0
+                self._done.set()
+            self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def wait_below(self, count: int, timeout: float = None) -> bool:
+        """
+        等待未完成的任务数低于 count，用于分批提交
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending < count, timeout)
+
+
+class JobScheduler:
+    """
+    插件内统一的任务调度器：主工作线程按通道优先级依次执行所有通道的任务，
+    实时通道另有一个只执行实时任务的工作线程，不必等待主线程中正在处理的条目
+    （一个剧集条目可能包含多季的豆瓣防反爬休眠，耗时数分钟）
+    """
+    # 工作线程及其执行的通道
+    WORKERS: Dict[str, Tuple[Lane, ...]] = {
+        "main": tuple(Lane),
+        "realtime": (Lane.REALTIME,),
+    }
+
+    def __init__(self, limiter: RateLimiter = None):
+        self.limiter = limiter or RateLimiter()
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._workers: Dict[str, threading.Thread] = {}
+        self._local = threading.local()
+        # 各工作线程正在执行的任务通道
+        self._running: Dict[str, Lane] = {}
+        self._counts = {lane: 0 for lane in Lane}
+        # 延后执行的任务 {序号: (通道, 定时器, 任务组)}
+        self._delayed: Dict[int, tuple] = {}
+        # 运行剖析器，执行每个任务时通知其进入/退出
+        self.profiler = None
+
+    def submit(self, lane: Lane, func: Callable, *args, group: JobGroup = None, name: str = None, **kwargs):
+        """
+        提交任务
+        """
+        if group:
+            group._add()
+        self._push(lane, func, args, kwargs, group, name)
+
+    def submit_later(self, delay: float, lane: Lane, func: Callable, *args, group: JobGroup = None,
+                     name: str = None, **kwargs):
+        """
+        延后若干秒再提交任务，等待期间任务组保持未完成
+        """
+        if group:
+            group._add()
+        seq = next(self._seq)
+
+        def __fire():
+            with self._cond:
+                if self._delayed.pop(seq, None) is None:
+                    return
+            self._push(lane, func, args, kwargs, group, name)
+
+        timer = threading.Timer(delay, __fire)
+        timer.daemon = True
+        with self._cond:
+            self._delayed[seq] = (lane, timer, group)
+        timer.start()
+
+    def _push(self, lane: Lane, func: Callable, args: tuple, kwargs: dict, group: Optional[JobGroup],
+              name: Optional[str]):
+        with self._cond:
+            heapq.heappush(self._queue, (lane, next(self._seq), name, func, args, kwargs, group))
+            self._counts[lane] += 1
+            for worker, lanes in self.WORKERS.items():
+                thread = self._workers.get(worker)
+                if lane in lanes and (not thread or not thread.is_alive()):
+                    thread = threading.Thread(target=self._run, args=(worker, lanes),
+                                              name=f"personmetamod-scheduler-{worker}", daemon=True)
+                    self._workers[worker] = thread
+                    thread.start()
+            self._cond.notify_all()
+
+    def cancel(self, lanes: List[Lane] = None) -> int:
+        """
+        取消尚未开始的任务，返回取消数量
+        """
+        with self._cond:
+            keep, cancelled = [], []
+            for job in self._queue:
+                (cancelled if lanes is None or job[0] in lanes else keep).append(job)
+            heapq.heapify(keep)
+            self._queue = keep
+            for job in cancelled:
+                self._counts[job[0]] -= 1
+            delayed = [self._delayed.pop(seq) for seq, (lane, _, _) in list(self._delayed.items())
+                       if lanes is None or lane in lanes]
+        for job in cancelled:
+            if job[6]:
+                job[6]._finish(cancelled=True)
+        for _, timer, group in delayed:
+            timer.cancel()
+            if group:
+                group._finish(cancelled=True)
+        return len(cancelled) + len(delayed)
+
+    @property
+    def current_lane(self) -> Lane:
+        """
+        当前线程正在执行的任务通道，不在调度器线程中时视为回填
+        """
+        return getattr(self._local, "lane", Lane.BACKFILL)
+
+    def pending(self) -> Dict[str, int]:
+        with self._cond:
+            return {lane.name.lower(): count for lane, count in self._counts.items()}
+
+    def delayed(self) -> int:
+        """
+        等待延后提交的任务数
+        """
+        with self._cond:
+            return len(self._delayed)
+
+    @property
+    def running_lane(self) -> Optional[Lane]:
+        """
+        正在执行的任务中优先级最高的通道
+        """
+        running = list(self._running.values())
+        return min(running) if running else None
+
+    def _ready(self, lanes: Tuple[Lane, ...]) -> bool:
+        """
+        队首任务是否属于这些通道，调用方需持有锁
+        """
+        return bool(self._queue) and self._queue[0][0] in lanes
+
+    def _run(self, worker: str, lanes: Tuple[Lane, ...]):
+        while True:
+            with self._cond:
+                while not self._ready(lanes):
+                    # 空闲一段时间后退出，下次提交时重新启动
+                    if not self._cond.wait(60) and not self._ready(lanes):
+                        self._workers.pop(worker, None)
+                        return
+                lane, _, name, func, args, kwargs, group = heapq.heappop(self._queue)
+                self._counts[lane] -= 1
+                self._running[worker] = lane
+            self._local.lane = lane
+            profiler = self.profiler
+            if profiler:
+                profiler.enter()
+            try:
+                func(*args, **kwargs)
+            except Exception as err:
+                logger.error(f"任务 {name or func.__name__} 执行失败：{str(err)}")
+            finally:
+                if profiler:
+                    profiler.exit()
+                self._local.lane = Lane.BACKFILL
+                self._running.pop(worker, None)
+                if group:
+                    group._finish()
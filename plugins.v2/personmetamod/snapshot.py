@@ -0,0 +1,89 @@
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+from .store import CacheStore
+
+SNAPSHOT_FORMAT = "personmetamod-snapshot"
+SNAPSHOT_VERSION = 1
+# 导出的数据段，对应持久化缓存中的表
+# 台账与上传记录中是本实例媒体服务器的条目ID，其它实例的服务器即使同名也不是同一台，不导出也不导入
+SNAPSHOT_SECTIONS = ("persons", "douban", "images", "misses")
+# 可共享的缺失结果：TMDB人物不存在、豆瓣无结果；person:{服务器}:{人物ID} 同样只属于本实例
+SHARED_MISS_PREFIXES = ("tmdb:", "douban:")
+
+
+def _shared(table: str, row) -> bool:
+    """
+    记录是否可在实例之间共享，行的列顺序与本地表一致
+    """
+    return table != "misses" or str(row[0] if row else "").startswith(SHARED_MISS_PREFIXES)
+
+
+def export_snapshot(store: CacheStore, path: Path,
+                    sections: Iterable[str] = SNAPSHOT_SECTIONS) -> Dict[str, int]:
+    """
+    导出缓存快照：gzip压缩的JSONL，首行为格式头，其后每行一条记录
+    {"t": 表名, "r": [列值...]}，逐行写出，内存占用与数据量无关
+    """
+    sections = [x for x in sections if x in SNAPSHOT_SECTIONS]
+    counts = {}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": time.time(),
+            "columns": {x: store.TABLES[x] for x in sections}
+        }, ensure_ascii=False) + "\n")
+        for table in sections:
+            count = 0
+            for row in store.iter_rows(table):
+                if not _shared(table, row):
+                    continue
+                f.write(json.dumps({"t": table, "r": row}, ensure_ascii=False, separators=(",", ":")) + "\n")
+                count += 1
+            counts[table] = count
+    tmp_path.replace(path)
+    return counts
+
+
+def import_snapshot(store: CacheStore, path: Path, sections: Iterable[str] = SNAPSHOT_SECTIONS,
+                    batch_size: int = 1000) -> Dict[str, int]:
+    """
+    流式合并缓存快照，每条记录仅在比本地更新时覆盖，返回各表写入条数
+    """
+    sections = set(sections)
+    counts = {x: 0 for x in SNAPSHOT_SECTIONS if x in sections}
+    batches = {x: [] for x in counts}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"不是有效的缓存快照：{path}")
+        if header.get("version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"快照版本 {header.get('version')} 高于当前支持的版本 {SNAPSHOT_VERSION}")
+        columns = header.get("columns") or {}
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            table = entry.get("t")
+            if table not in batches:
+                continue
+            row = entry.get("r") or []
+            # 按列名对齐，兼容列顺序不同的快照
+            if tuple(columns.get(table) or ()) != store.TABLES[table]:
+                values = dict(zip(columns.get(table) or (), row))
+                row = [values.get(x) for x in store.TABLES[table]]
+            if not _shared(table, row):
+                continue
+            batches[table].append(tuple(row))
+            if len(batches[table]) >= batch_size:
+                counts[table] += store.merge_rows(table, batches[table])
+                batches[table] = []
+    for table, rows in batches.items():
+        counts[table] += store.merge_rows(table, rows)
+    return counts
@@ -0,0 +1,380 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .records import PersonRecord
+
+# IN 查询每批的参数个数，低于 SQLite 默认上限
+_BATCH = 500
+
+
+class CacheStore:
+    """
+    插件持久化缓存（SQLite，位于插件数据目录）
+    persons: TMDB人物记录
+    ledger:  已处理人物台账，记录各媒体服务器中人物条目与TMDBID的对应关系
+    douban:  豆瓣演职人员缓存，按作品与季索引
+    images:  已下载图片的内容哈希及HTTP缓存校验头
+    uploads: 已上传到媒体服务器人物的图片及其在服务器中的图片标签
+    misses:  已知查询不到结果的对象（负缓存），附原因代码
+    """
+
+    # 负缓存原因代码
+    MISS_REASONS = {
+        "no_tmdbid": "人物缺少TMDB ID",
+        "tmdb_404": "TMDB人物不存在",
+        "douban_unmatched": "未匹配到豆瓣条目",
+    }
+
+    # 各表的列，导出/导入快照时使用
+    TABLES: Dict[str, Tuple[str, ...]] = {
+        "persons": ("tmdbid", "data", "fetched_at"),
+        "ledger": ("server", "person_id", "server_type", "tmdbid", "updated_at"),
+        "douban": ("key", "data", "fetched_at"),
+        "images": ("url", "sha1", "size", "fetched_at", "etag", "last_modified"),
+        "uploads": ("server", "item_id", "url", "sha1", "uploaded_at", "image_tag"),
+        "misses": ("key", "reason", "note", "fetched_at"),
+    }
+    # 合并时用于判断新旧的时间列
+    _TIME_COLUMNS = {
+        "persons": "fetched_at",
+        "ledger": "updated_at",
+        "douban": "fetched_at",
+        "images": "fetched_at",
+        "uploads": "uploaded_at",
+        "misses": "fetched_at",
+    }
+    _KEY_COLUMNS = {
+        "persons": ("tmdbid",),
+        "ledger": ("server", "person_id"),
+        "douban": ("key",),
+        "images": ("url",),
+        "uploads": ("server", "item_id"),
+        "misses": ("key",),
+    }
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS persons (
+                tmdbid INTEGER PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ledger (
+                server TEXT NOT NULL,
+                person_id TEXT NOT NULL,
+                server_type TEXT,
+                tmdbid INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (server, person_id)
+            );
+            CREATE INDEX IF NOT EXISTS ledger_tmdbid ON ledger (tmdbid);
+            CREATE TABLE IF NOT EXISTS douban (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                sha1 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE TABLE IF NOT EXISTS uploads (
+                server TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                sha1 TEXT,
+                uploaded_at REAL NOT NULL,
+                image_tag TEXT,
+                PRIMARY KEY (server, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS misses (
+                key TEXT PRIMARY KEY,
+                reason TEXT NOT NULL,
+                note TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS misses_reason ON misses (reason);
+        """)
+        self._migrate()
+
+    def _migrate(self):
+        """
+        为旧版本创建的表补充新增的列
+        """
+        for table, columns in self.TABLES.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column in columns:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_person(self, tmdbid: int) -> Optional[PersonRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM persons WHERE tmdbid = ?", (tmdbid,)).fetchone()
+        if not row:
+            return None
+        return PersonRecord.from_dict(json.loads(row[0]))
+
+    def _executemany(self, sql: str, rows: list) -> int:
+        """
+        在一个事务中批量执行，返回影响的行数
+        """
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    @staticmethod
+    def _person_rows(records: Iterable[PersonRecord]) -> list:
+        return [(record.tmdbid, json.dumps(record.to_dict(), ensure_ascii=False), record.fetched_at)
+                for record in records]
+
+    def put_persons(self, records: Iterable[PersonRecord]):
+        """
+        批量写入人物记录，已存在的记录被覆盖
+        """
+        self._executemany("INSERT OR REPLACE INTO persons (tmdbid, data, fetched_at) VALUES (?, ?, ?)",
+                          self._person_rows(records))
+
+    def merge_persons(self, records: Iterable[PersonRecord]) -> int:
+        """
+        批量合并人物记录，仅当记录比已有记录更新时才覆盖，返回写入条数
+        """
+        return self.merge_rows("persons", self._person_rows(records))
+
+    def put_person(self, record: PersonRecord):
+        self.put_persons([record])
+
+    def delete_persons(self, tmdbids: Iterable[int]) -> int:
+        tmdbids = list(tmdbids)
+        deleted = 0
+        with self._lock:
+            for i in range(0, len(tmdbids), _BATCH):
+                batch = tmdbids[i:i + _BATCH]
+                cursor = self._conn.execute(
+                    f"DELETE FROM persons WHERE tmdbid IN ({','.join('?' * len(batch))})", batch)
+                deleted += cursor.rowcount
+        return deleted
+
+    def cached_tmdbids(self, tmdbids: Iterable[int]) -> List[int]:
+        """
+        返回给定TMDBID中已缓存的部分
+        """
+        tmdbids = list(tmdbids)
+        result = []
+        with self._lock:
+            for i in range(0, len(tmdbids), _BATCH):
+                batch = tmdbids[i:i + _BATCH]
+                rows = self._conn.execute(
+                    f"SELECT tmdbid FROM persons WHERE tmdbid IN ({','.join('?' * len(batch))})", batch).fetchall()
+                result.extend(row[0] for row in rows)
+        return result
+
+    def ledger_add(self, server: str, server_type: str, person_id: str, tmdbid: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ledger (server, person_id, server_type, tmdbid, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)", (server, person_id, server_type, tmdbid, time.time()))
+
+    def ledger_entries(self, tmdbids: Iterable[int]) -> Dict[int, List[dict]]:
+        """
+        按TMDBID查询台账，返回 {tmdbid: [{server, server_type, person_id}]}
+        """
+        tmdbids = list(tmdbids)
+        result: Dict[int, List[dict]] = {}
+        with self._lock:
+            for i in range(0, len(tmdbids), _BATCH):
+                batch = tmdbids[i:i + _BATCH]
+                rows = self._conn.execute(
+                    f"SELECT tmdbid, server, server_type, person_id FROM ledger "
+                    f"WHERE tmdbid IN ({','.join('?' * len(batch))})", batch).fetchall()
+                for tmdbid, server, server_type, person_id in rows:
+                    result.setdefault(tmdbid, []).append({
+                        "server": server,
+                        "server_type": server_type,
+                        "person_id": person_id
+                    })
+        return result
+
+    def ledger_peers(self, server: str, person_id: str) -> List[dict]:
+        """
+        查询其它服务器（或同一服务器的其它条目）中TMDB ID相同的人物
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT b.server, b.server_type, b.person_id FROM ledger a "
+                "JOIN ledger b ON a.tmdbid = b.tmdbid "
+                "WHERE a.server = ? AND a.person_id = ? AND NOT (b.server = a.server AND b.person_id = a.person_id)",
+                (server, person_id)).fetchall()
+        return [{"server": server, "server_type": server_type, "person_id": person_id}
+                for server, server_type, person_id in rows]
+
+    def get_douban(self, key: str, ttl: float) -> Optional[List[dict]]:
+        """
+        获取未过期的豆瓣演职人员缓存
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data, fetched_at FROM douban WHERE key = ?", (key,)).fetchone()
+        if not row or time.time() - row[1] >= ttl:
+            return None
+        return json.loads(row[0])
+
+    def put_douban(self, key: str, actors: List[dict]):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO douban (key, data, fetched_at) VALUES (?, ?, ?)",
+                               (key, json.dumps(actors, ensure_ascii=False), time.time()))
+
+    def get_image(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT sha1, size, fetched_at, etag, last_modified FROM images WHERE url = ?",
+                                     (url,)).fetchone()
+        if not row:
+            return None
+        return {"sha1": row[0], "size": row[1], "fetched_at": row[2], "etag": row[3], "last_modified": row[4]}
+
+    def put_image(self, url: str, sha1: str, size: int, etag: str = None, last_modified: str = None):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO images (url, sha1, size, fetched_at, etag, last_modified) "
+                               "VALUES (?, ?, ?, ?, ?, ?)", (url, sha1, size, time.time(), etag, last_modified))
+
+    def touch_image(self, url: str):
+        """
+        图片经校验未变化，刷新获取时间
+        """
+        with self._lock:
+            self._conn.execute("UPDATE images SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def get_upload(self, server: str, item_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT url, sha1, uploaded_at, image_tag FROM uploads "
+                                     "WHERE server = ? AND item_id = ?", (server, item_id)).fetchone()
+        if not row:
+            return None
+        return {"url": row[0], "sha1": row[1], "uploaded_at": row[2], "image_tag": row[3]}
+
+    def put_upload(self, server: str, item_id: str, url: str, sha1: str = None):
+        """
+        记录一次上传，上传后服务器生成的图片标签未知，留待下次读取人物详情时补充
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO uploads (server, item_id, url, sha1, uploaded_at, image_tag) "
+                               "VALUES (?, ?, ?, ?, ?, NULL)", (server, item_id, url, sha1, time.time()))
+
+    def set_upload_tag(self, server: str, item_id: str, image_tag: str):
+        """
+        补充上传的图片在服务器中的标签，标签变化说明图片已被替换
+        """
+        with self._lock:
+            self._conn.execute("UPDATE uploads SET image_tag = ? WHERE server = ? AND item_id = ?",
+                               (image_tag, server, item_id))
+
+    def get_miss(self, key: str, ttl: float) -> Optional[str]:
+        """
+        查询未过期的负缓存，返回原因代码
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT reason, fetched_at FROM misses WHERE key = ?", (key,)).fetchone()
+        if not row or time.time() - row[1] >= ttl:
+            return None
+        return row[0]
+
+    def put_miss(self, key: str, reason: str, note: str = None):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO misses (key, reason, note, fetched_at) VALUES (?, ?, ?, ?)",
+                               (key, reason, note, time.time()))
+
+    def list_misses(self, reason: str = None, limit: int = 100) -> List[dict]:
+        """
+        按时间倒序列出负缓存
+        """
+        sql = "SELECT key, reason, note, fetched_at FROM misses"
+        params = []
+        if reason:
+            sql += " WHERE reason = ?"
+            params.append(reason)
+        sql += " ORDER BY fetched_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"key": key, "reason": reason, "note": note, "fetched_at": fetched_at}
+                for key, reason, note, fetched_at in rows]
+
+    def miss_counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT reason, COUNT(*) FROM misses GROUP BY reason").fetchall()
+        return {reason: count for reason, count in rows}
+
+    def clear_misses(self, reason: str = None, key: str = None) -> int:
+        """
+        清除负缓存，可按原因或键筛选，返回清除条数
+        """
+        sql = "DELETE FROM misses"
+        conditions, params = [], []
+        if reason:
+            conditions.append("reason = ?")
+            params.append(reason)
+        if key:
+            conditions.append("key = ?")
+            params.append(key)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def iter_rows(self, table: str, batch: int = 1000) -> Iterator[tuple]:
+        """
+        流式读取整张表，使用独立的只读连接，不阻塞写入
+        """
+        columns = self.TABLES[table]
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table}")
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def merge_rows(self, table: str, rows: List[tuple]) -> int:
+        """
+        按主键合并行，仅当时间列更新时才覆盖，返回写入条数
+        """
+        columns = self.TABLES[table]
+        keys = self._KEY_COLUMNS[table]
+        time_column = self._TIME_COLUMNS[table]
+        updates = ", ".join(f"{x} = excluded.{x}" for x in columns if x not in keys)
+        return self._executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates} "
+            f"WHERE excluded.{time_column} > {table}.{time_column}", rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in self.TABLES}
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+import zhconv
+
+from app.utils.string import StringUtils
+
+
+class _LRUCache:
+    """
+    按条目数和字符数双重限制的LRU缓存
+    """
+
+    def __init__(self, max_entries: int, max_chars: int):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(key: str, value: Any) -> int:
+        return len(key) + (len(value) if isinstance(value, str) else 0)
+
+    def get_or_compute(self, key: str, func: Callable[[str], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = func(key)
+        size = self._size(key, value)
+        # 超过总容量一半的文本不缓存，避免把其它条目全部挤出
+        if size > self.max_chars // 2:
+            return value
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = value
+                self._chars += size
+                while len(self._data) > self.max_entries or self._chars > self.max_chars:
+                    old_key, old_value = self._data.popitem(last=False)
+                    self._chars -= self._size(old_key, old_value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "chars": self._chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._chars = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class TextCache:
+    """
+    中文检测与简繁转换的记忆化层
+    同一批姓名、角色、简介在各集之间反复出现，zhconv 处理长简介开销不小
+    """
+
+    def __init__(self, max_entries: int = 50000, max_chars: int = 8 * 1024 * 1024):
+        self._caches: Dict[str, _LRUCache] = {
+            "is_chinese": _LRUCache(max_entries, max_chars),
+            "zh-hans": _LRUCache(max_entries, max_chars),
+            "zh-hant": _LRUCache(max_entries, max_chars),
+        }
+
+    def is_chinese(self, text: str) -> bool:
+        if not text:
+            return False
+        return self._caches["is_chinese"].get_or_compute(text, StringUtils.is_chinese)
+
+    def convert(self, text: str, locale: str = "zh-hans") -> str:
+        if not text:
+            return text
+        return self._caches[locale].get_or_compute(text, lambda x: zhconv.convert(x, locale))
+
+    def to_hans(self, text: str) -> str:
+        """
+        含中文时转换为简体，否则原样返回
+        """
+        if self.is_chinese(text):
+            return self.convert(text, "zh-hans")
+        return text
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+    def clear(self):
+        for cache in self._caches.values():
+            cache.clear()
+
+
+# 全局共享的缓存实例
+text_cache = TextCache()
@@ -0,0 +1,22 @@
+"""
+演职人员刮削插件的单元测试，只覆盖不依赖插件主模块的纯 Python 模块
+
+插件模块依赖 MoviePilot 提供的 app 包（日志等），运行前需指定 MoviePilot 源码目录：
+    MOVIEPILOT_PATH=/path/to/MoviePilot python -m pytest tests/personmetamod
+未指定时各测试文件整体跳过
+"""
+import os
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parents[2] / "plugins.v2" / "personmetamod"
+
+if os.environ.get("MOVIEPILOT_PATH"):
+    sys.path.insert(0, os.environ["MOVIEPILOT_PATH"])
+
+# 以独立的包名加载插件子模块，不执行需要完整运行环境的插件主模块
+if "personmetamod" not in sys.modules:
+    package = types.ModuleType("personmetamod")
+    package.__path__ = [str(PLUGIN_DIR)]
+    sys.modules["personmetamod"] = package
@@ -0,0 +1,63 @@
+import base64
+import hashlib
+import os
+import time
+
+from personmetamod.blobs import BlobCache
+
+
+def test_put_and_read_by_content_hash(tmp_path):
+    blobs = BlobCache(tmp_path / "blobs")
+    sha1 = blobs.put(b"image")
+    assert sha1 == hashlib.sha1(b"image").hexdigest()
+    assert (tmp_path / "blobs" / sha1[:2] / sha1).read_bytes() == b"image"
+    assert blobs.put(b"image") == sha1 and blobs.stats()["entries"] == 1
+    assert base64.b64decode(blobs.read_base64(sha1)) == b"image"
+    assert blobs.read_base64("0" * 40) is None
+    assert blobs.stats()["hits"] == 1 and blobs.stats()["misses"] == 1
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    sha1 = BlobCache(tmp_path).put(b"image")
+    (tmp_path / sha1[:2] / f"{sha1}.1.tmp").write_bytes(b"partial")
+    blobs = BlobCache(tmp_path)
+    assert blobs.has(sha1) and blobs.stats()["bytes"] == 5
+    # 写入中断留下的临时文件被清理
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+
+def test_evicts_least_recently_used_over_limit(tmp_path):
+    blobs = BlobCache(tmp_path, max_bytes=10)
+    first = blobs.put(b"aaaa")
+    second = blobs.put(b"bbbb")
+    # 读取后最近使用时间更新，淘汰时保留
+    time.sleep(0.01)
+    blobs.read_base64(first)
+    third = blobs.put(b"cccc")
+    assert blobs.has(first) and blobs.has(third) and not blobs.has(second)
+    assert not (tmp_path / second[:2] / second).exists()
+    assert blobs.stats()["bytes"] <= 10
+    # 超过上限的内容只计算哈希不落盘
+    assert not blobs.has(blobs.put(b"x" * 11))
+
+
+def test_missing_file_is_dropped_from_index(tmp_path):
+    blobs = BlobCache(tmp_path)
+    sha1 = blobs.put(b"image")
+    os.remove(tmp_path / sha1[:2] / sha1)
+    assert blobs.read_base64(sha1) is None
+    assert not blobs.has(sha1) and blobs.stats()["bytes"] == 0
+
+
+def test_put_hit_refreshes_file_mtime(tmp_path):
+    blobs = BlobCache(tmp_path, max_bytes=10)
+    first = blobs.put(b"aaaa")
+    second = blobs.put(b"bbbb")
+    os.utime(tmp_path / first[:2] / first, (0, 0))
+    blobs.put(b"aaaa")
+    assert os.stat(tmp_path / first[:2] / first).st_mtime > 0
+    os.utime(tmp_path / second[:2] / second, (1, 1))
+    # 重启后按修改时间重建，再次写入过的图片不被优先淘汰
+    restarted = BlobCache(tmp_path, max_bytes=10)
+    restarted.put(b"cccc")
+    assert restarted.has(first) and not restarted.has(second)
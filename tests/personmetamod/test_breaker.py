@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+
+from personmetamod.breaker import BreakerBoard, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+
+def test_opens_after_consecutive_failures_and_rejects():
+    breaker = CircuitBreaker("tmdb", failures=2, slow_seconds=0, cooldown=60)
+    breaker.record(False, 0.1, "HTTP 500")
+    breaker.record(True, 0.1)
+    breaker.record(False, 0.1, "HTTP 500")
+    # 成功调用清零连续失败次数
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_call()
+    assert err.value.key == "tmdb" and 0 < err.value.retry_after <= 60
+    assert breaker.snapshot()["rejected"] == 1 and breaker.snapshot()["last_error"] == "HTTP 500"
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("Emby", failures=1, slow_seconds=1, cooldown=60)
+    breaker.record(True, 2)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()["slow"] == 1
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker("Emby", failures=1, slow_seconds=0, cooldown=0.01)
+    breaker.record(False, 0)
+    breaker._opened_at -= 1
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    # 探测失败后冷却时间加倍
+    breaker.record(False, 0)
+    assert breaker.state == CircuitBreaker.OPEN and breaker._current_cooldown == 0.02
+    breaker._opened_at -= 1
+    breaker.before_call()
+    breaker.record(True, 0)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker._current_cooldown == 0.01
+
+
+def test_board_marks_unhealthy_responses_per_thread():
+    board = BreakerBoard()
+    board.begin()
+    assert board.check_response(SimpleNamespace(status_code=200))
+    assert board.end() is None
+    board.begin()
+    assert not board.check_response(SimpleNamespace(status_code=503))
+    assert board.end() == "HTTP 503"
+    board.begin()
+    assert not board.check_response(None)
+    assert board.end() == "无响应"
+
+
+def test_board_ensure_and_configure():
+    board = BreakerBoard()
+    board.configure(failures=1, slow_seconds=0, cooldown=60)
+    board.get("Emby").record(False, 0)
+    board.ensure(["tmdb"])
+    with pytest.raises(CircuitOpenError):
+        board.ensure(["tmdb", "Emby"])
+    assert not board.closed("Emby") and board.closed("tmdb")
+    assert [x["key"] for x in board.snapshot()] == ["Emby", "tmdb"]
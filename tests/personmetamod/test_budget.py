@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+
+from personmetamod.breaker import BreakerBoard, CircuitOpenError  # noqa: E402
+from personmetamod.budget import RequestBudget, accounted, server_breaker, server_upstream  # noqa: E402
+from personmetamod.scheduler import JobScheduler  # noqa: E402
+
+
+class Owner:
+    """
+    具备 accounted 所需属性的最小插件对象
+    """
+
+    def __init__(self, failures: int = 2):
+        self._budget = RequestBudget()
+        self._breakers = BreakerBoard()
+        self._breakers.configure(failures=failures, slow_seconds=0, cooldown=60)
+        self._jobs = JobScheduler()
+        self._event = threading.Event()
+        self.calls = 0
+
+    @accounted("tmdb")
+    def fetch(self, ok: bool = True):
+        self.calls += 1
+        if not ok:
+            self._breakers.mark_failed("HTTP 500")
+        return ok
+
+    @accounted("image")
+    def download(self, ok: bool = True):
+        if not ok:
+            self._breakers.mark_failed("HTTP 502")
+        return ok
+
+    @accounted(server_upstream, "POST", breaker=server_breaker)
+    def post(self, server: str, server_type: str):
+        return True
+
+
+def test_item_counts_requests_per_item():
+    budget = RequestBudget(limit=2)
+    with budget.item("电影A"):
+        budget.record("tmdb")
+        budget.record("emby", "POST", 10)
+    with budget.item("电影B"):
+        for _ in range(3):
+            budget.record("tmdb", nbytes=5)
+    snapshot = budget.snapshot()
+    assert snapshot["items"] == 2
+    assert snapshot["upstreams"]["tmdb:GET"] == {"requests": 4, "bytes": 15, "per_item": 2.0}
+    assert snapshot["upstreams"]["emby:POST"]["bytes"] == 10
+    # 只有超出预算的条目记为异常
+    assert [x["title"] for x in snapshot["outliers"]] == ["电影B"]
+    assert budget.total_requests() == 5
+
+
+def test_nested_item_restores_outer_counters():
+    budget = RequestBudget()
+    with budget.item("剧集") as outer:
+        budget.record("tmdb")
+        with budget.item("人物"):
+            budget.record("tmdb")
+        budget.record("tmdb")
+    assert outer[("tmdb", "GET")][0] == 2
+    assert budget.snapshot()["items"] == 2
+
+
+def test_requests_outside_item_go_to_totals():
+    budget = RequestBudget()
+    budget.record("image", "GET", 100)
+    budget.add_bytes("image", 50)
+    budget.not_modified("image", 30)
+    snapshot = budget.snapshot()
+    assert snapshot["items"] == 0
+    assert snapshot["upstreams"]["image:GET"]["bytes"] == 150
+    assert snapshot["revalidated"]["image"] == {"count": 1, "saved_bytes": 30}
+    budget.reset()
+    assert budget.snapshot()["upstreams"] == {}
+
+
+def test_skipped_writes_are_not_requests():
+    budget = RequestBudget()
+    with budget.item("人物"):
+        budget.skipped("emby", "POST")
+    snapshot = budget.snapshot()
+    assert snapshot["skipped"] == {"emby:POST": 1}
+    assert snapshot["upstreams"] == {} and budget.total_requests() == 0
+
+
+def test_accounted_records_calls_and_opens_breaker():
+    owner = Owner(failures=2)
+    assert owner.fetch() is True
+    owner.fetch(ok=False)
+    owner.fetch(ok=False)
+    assert owner._budget.total_requests() == 3
+    with pytest.raises(CircuitOpenError):
+        owner.fetch()
+    # 熔断中的调用不发出请求，也不计入预算
+    assert owner.calls == 3
+    assert owner._budget.total_requests() == 3
+
+
+def test_accounted_uses_server_name_for_breaker():
+    owner = Owner()
+    owner.post(server="Emby", server_type="emby")
+    assert "emby:POST" in owner._budget.snapshot()["upstreams"]
+    assert [x["key"] for x in owner._breakers.snapshot()] == ["Emby"]
+
+
+def test_image_failures_do_not_open_server_breaker():
+    owner = Owner(failures=2)
+    owner.download(ok=False)
+    owner.download(ok=False)
+    with pytest.raises(CircuitOpenError):
+        owner.download()
+    # 图片下载与上传分别记账、分别熔断
+    assert owner.post(server="Emby", server_type="emby") is True
+    upstreams = owner._budget.snapshot()["upstreams"]
+    assert upstreams["image:GET"]["requests"] == 2 and upstreams["emby:POST"]["requests"] == 1
+    assert owner._breakers.closed("Emby") and not owner._breakers.closed("image")
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.castindex import DoubanCastIndex, name_keys, same_role  # noqa: E402
+
+ACTORS = [
+    {"name": "刘德华", "latin_name": "Andy Lau", "title": "香港演员", "avatar": {"large": "https://img/lau.jpg"}},
+    {"name": "梁朝伟", "latin_name": "Tony Leung Chiu-wai", "title": ""},
+    {"name": "梁朝伟", "latin_name": "Tony Leung", "title": "同名的另一位演员"},
+]
+
+
+def test_name_keys_normalizes_separators_case_and_script():
+    assert name_keys("Tony Leung Chiu-wai") == {"tonyleungchiuwai"}
+    assert name_keys("Jean·Reno") == name_keys("jean reno")
+    assert {"刘德华", "劉德華"} <= name_keys("劉德華")
+    assert name_keys("") == set()
+    assert name_keys(" · ") == set()
+
+
+def test_match_by_latin_or_chinese_name():
+    index = DoubanCastIndex(ACTORS)
+    assert len(index) == 3
+    assert index.match(["ANDY LAU"])["name"] == "刘德华"
+    assert index.match(["劉德華"])["latin_name"] == "Andy Lau"
+    assert index.match(["Nobody"]) is None
+
+
+def test_match_follows_name_order_and_predicate():
+    index = DoubanCastIndex(ACTORS)
+    # 前面的候选姓名优先
+    assert index.match(["Tony Leung", "Andy Lau"])["latin_name"] == "Tony Leung"
+    # 同名人物中返回第一个满足条件的
+    assert index.match(["梁朝伟"], predicate=lambda x: x.get("title"))["title"] == "同名的另一位演员"
+    assert index.match(["Tony Leung Chiu-wai"], predicate=lambda x: x.get("title")) is None
+
+
+def test_empty_index():
+    index = DoubanCastIndex()
+    assert not index
+    assert index.match(["刘德华", None]) is None
+
+
+def test_aliases_require_same_role():
+    index = DoubanCastIndex([
+        {"name": "王菲", "latin_name": "Faye Wong", "character": "饰 阿菲", "roles": ["演员"]},
+        {"name": "陈凯歌", "latin_name": "Chen Kaige", "character": "导演", "roles": ["导演"]},
+    ])
+    actor = {"Name": "Faye Wong", "Type": "Actor", "Role": "阿菲"}
+    # 主要姓名命中时不检查角色
+    assert index.match_person(["Faye Wong"], [], {})["name"] == "王菲"
+    # 别名命中还要求角色名或职务一致
+    assert index.match_person(["Nobody"], ["王菲"], actor)["name"] == "王菲"
+    assert index.match_person(["Nobody"], ["王菲"], {**actor, "Role": "另一个角色"}) is None
+    assert index.match_person(["Nobody"], ["陈凯歌"], {"Type": "Director"})["name"] == "陈凯歌"
+    assert index.match_person(["Nobody"], ["陈凯歌"], {"Type": "Actor"}) is None
+    assert index.match_person(["Nobody"], ["陈凯歌"], {}) is None
+
+
+def test_same_role_compares_character_then_job():
+    assert same_role({"character": "饰演 阿菲"}, {"Role": "阿菲"})
+    assert same_role({"roles": ["演员"], "character": ""}, {"Role": "Faye", "Type": "Actor"})
+    assert not same_role({"roles": ["导演"]}, {"Type": "Writer"})
@@ -0,0 +1,66 @@
+import bz2
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.dump import iter_persons, parse_person  # noqa: E402
+from personmetamod.records import PersonRecord  # noqa: E402
+from personmetamod.store import CacheStore  # noqa: E402
+
+TMDB_LINE = {"id": 1, "name": "甲", "biography": "简介", "external_ids": {"imdb_id": "nm1"}}
+EXPORTED_LINE = {"tmdbid": 2, "name": "乙", "fetched_at": 1000.0}
+ID_EXPORT_LINE = {"id": 3, "name": "丙", "popularity": 1.0}
+
+
+def write_dump(path, lines, opener=open, mtime: float = None):
+    with opener(path, "wt", encoding="utf-8") as f:
+        for line in lines:
+            f.write((json.dumps(line, ensure_ascii=False) if isinstance(line, dict) else line) + "\n")
+    if mtime:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_parse_person_formats():
+    assert parse_person(TMDB_LINE).imdb_id == "nm1"
+    assert parse_person(EXPORTED_LINE).fetched_at == 1000.0
+    assert parse_person(ID_EXPORT_LINE) is None
+    assert parse_person(["not", "a", "dict"]) is None
+
+
+def test_parse_person_uses_given_fetched_at_unless_record_has_one():
+    assert parse_person(TMDB_LINE, fetched_at=500.0).fetched_at == 500.0
+    assert parse_person({"tmdbid": 4}, fetched_at=500.0).fetched_at == 500.0
+    assert parse_person(EXPORTED_LINE, fetched_at=500.0).fetched_at == 1000.0
+
+
+@pytest.mark.parametrize("suffix, opener", [(".jsonl", open), (".jsonl.gz", gzip.open), (".jsonl.bz2", bz2.open)])
+def test_iter_persons_streams_and_counts_skipped(tmp_path, suffix, opener):
+    path = write_dump(tmp_path / f"persons{suffix}",
+                      [TMDB_LINE, EXPORTED_LINE, ID_EXPORT_LINE, "{broken", "", {"tmdbid": "x"}], opener)
+    stats = {}
+    records = list(iter_persons(path, stats))
+    assert [x.tmdbid for x in records] == [1, 2]
+    assert stats["skipped"] == 3
+
+
+def test_old_dump_does_not_replace_newer_local_records(tmp_path):
+    month_ago = time.time() - 30 * 24 * 3600
+    path = write_dump(tmp_path / "persons.jsonl", [TMDB_LINE, {**TMDB_LINE, "id": 5}], mtime=month_ago)
+    records = list(iter_persons(path))
+    # 记录的获取时间为导出文件的修改时间，而不是导入时间
+    assert all(abs(x.fetched_at - month_ago) < 1 for x in records)
+    store = CacheStore(tmp_path / "cache.db")
+    try:
+        store.put_person(PersonRecord(tmdbid=1, name="本地较新"))
+        assert store.merge_persons(records) == 1
+        assert store.get_person(1).name == "本地较新"
+        assert store.get_person(5).fetched_at < time.time() - 29 * 24 * 3600
+    finally:
+        store.close()
@@ -0,0 +1,55 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from personmetamod.itemstream import CountingReader, read_json_items, resume_items
+
+
+def items(*ids):
+    return [SimpleNamespace(item_id=x) for x in ids]
+
+
+def resumed(ids, position, window=200):
+    return [(index, item.item_id) for index, item in resume_items(items(*ids), position, window=window)]
+
+
+def test_resume_without_cursor_returns_everything():
+    assert resumed("abc", None) == [(0, "a"), (1, "b"), (2, "c")]
+    assert resumed("abc", {"count": 2}) == [(2, "c")]
+
+
+def test_resume_locates_next_item_by_id():
+    # 前面新增了条目，序号后移
+    assert resumed("xyabcd", {"next_id": "c", "count": 2}) == [(4, "c"), (5, "d")]
+    # 前面删除了条目，序号前移
+    assert resumed("bcd", {"next_id": "c", "count": 2}) == [(1, "c"), (2, "d")]
+
+
+def test_resume_falls_back_to_count_when_item_is_gone():
+    assert resumed("abde", {"next_id": "c", "count": 2}) == [(2, "d"), (3, "e")]
+    # 超出查找窗口后按原序号继续，不必读到末尾
+    assert resumed("abdefg", {"next_id": "c", "count": 2}, window=1)[:2] == [(2, "d"), (3, "e")]
+    assert resumed("abdefg", {"next_id": "c", "count": 2}, window=1) == [(2, "d"), (3, "e"), (4, "f"), (5, "g")]
+
+
+def test_read_json_items_releases_stream_before_parsing():
+    pytest.importorskip("ijson")
+    body = json.dumps({"Items": [{"Id": "1", "Name": "甲", "Extra": 1}, {"Id": "2"}], "TotalRecordCount": 2})
+    raw = io.BytesIO(body.encode())
+    reader = CountingReader(raw)
+    parsed = read_json_items(reader, ("Id", "Name"))
+    # 响应已读完，之后才逐个解析
+    assert reader.size == len(body.encode())
+    raw.close()
+    assert next(parsed) == {"Id": "1", "Name": "甲"}
+    assert list(parsed) == [{"Id": "2"}]
+
+
+def test_read_json_items_raises_parse_errors_while_iterating():
+    pytest.importorskip("ijson")
+    parsed = read_json_items(io.BytesIO(b'{"Items": [{"Id": "1"}, {"Id": '), ("Id",), max_memory=8)
+    assert next(parsed) == {"Id": "1"}
+    with pytest.raises(Exception):
+        next(parsed)
@@ -0,0 +1,127 @@
+import gzip
+import json
+import threading
+
+import pytest
+
+from personmetamod.plan import (PLAN_VERSION, PlanRecorder, PlanWriter, applied_ops, diff_plans, iter_plan,
+                                latest_ops, op_phase, planned, progress_path, read_plan_header, summarize_plan)
+
+
+class Writer:
+    def __init__(self):
+        self._plans = PlanRecorder()
+        self.calls = []
+
+    @planned("info", "iteminfo", fields_arg="fields")
+    def set_iteminfo(self, server: str, server_type: str, itemid: str, iteminfo: dict, fields: list = None):
+        self.calls.append(itemid)
+        return {"ok": True}
+
+
+def _write(path, ops):
+    writer = PlanWriter(path, meta={"order": "created"})
+    for op in ops:
+        writer.add(*op)
+    return writer.close()
+
+
+def test_round_trip_and_latest_ops(tmp_path):
+    path = tmp_path / "plan-1.jsonl.gz"
+    counts = _write(path, [
+        ("info", "Emby", "emby", "1", {"Id": "1", "Type": "Person", "Name": "甲"}),
+        ("image", "Emby", "emby", "1", "https://img/1.jpg"),
+        ("info", "Emby", "emby", "1", {"Id": "1", "Type": "Person", "Name": "乙"}),
+        ("info", "Emby", "emby", "9", {"Id": "9", "Type": "Movie", "People": []}),
+    ])
+    assert counts == {"info": 3, "image": 1}
+    assert read_plan_header(path)["order"] == "created"
+    ops = list(iter_plan(path))
+    assert [op["i"] for op in ops] == [0, 1, 2, 3]
+    # 同一媒体项的同类变更只保留最后一次
+    assert latest_ops(path) == {1, 2, 3}
+    assert [op_phase(op) for op in ops] == [0, 0, 0, 1]
+    assert not (tmp_path / "plan-1.jsonl.gz.tmp").exists()
+
+
+def test_abort_leaves_no_plan(tmp_path):
+    path = tmp_path / "plan-1.jsonl.gz"
+    writer = PlanWriter(path)
+    writer.add("image", "Emby", "emby", "1", "https://img/1.jpg")
+    writer.abort()
+    assert not list(tmp_path.iterdir())
+
+
+def test_rejects_unknown_format_and_newer_version(tmp_path):
+    path = tmp_path / "plan-1.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": "other"}) + "\n")
+    with pytest.raises(ValueError):
+        read_plan_header(path)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": "personmetamod-plan", "version": PLAN_VERSION + 1}) + "\n")
+    with pytest.raises(ValueError):
+        read_plan_header(path)
+
+
+def test_summary_counts_applied_latest_ops(tmp_path):
+    path = tmp_path / "plan-1.jsonl.gz"
+    _write(path, [
+        ("info", "Emby", "emby", "1", {"Id": "1", "Type": "Person"}),
+        ("image", "Emby", "emby", "1", "https://img/1.jpg"),
+        ("info", "Jellyfin", "jellyfin", "9", {"Id": "9", "Type": "Series"}),
+    ])
+    progress_path(path).write_text("0\n2\nbad\n", encoding="utf-8")
+    assert applied_ops(path) == {0, 2}
+    summary = summarize_plan(path)
+    assert summary["ops"] == 3 and summary["applied"] == 2
+    assert summary["servers"] == {"Emby": {"person": 1, "image": 1}, "Jellyfin": {"people": 1}}
+
+
+def test_diff_lists_changed_fields(tmp_path):
+    old, new = tmp_path / "plan-1.jsonl.gz", tmp_path / "plan-2.jsonl.gz"
+    _write(old, [
+        ("info", "Emby", "emby", "1", {"Id": "1", "Type": "Person", "Name": "甲"}),
+        ("image", "Emby", "emby", "2", "https://img/2.jpg"),
+    ])
+    _write(new, [
+        ("info", "Emby", "emby", "1", {"Id": "1", "Type": "Person", "Name": "乙"}),
+        ("image", "Emby", "emby", "3", "https://img/3.jpg"),
+    ])
+    diff = diff_plans(old, new)
+    assert diff["added"] == 1 and diff["removed"] == 1 and diff["changed"] == 1 and diff["unchanged"] == 0
+    assert diff["changed_items"] == [["info", "Emby", "1", ["Name"]]]
+
+
+def test_planned_records_only_changed_fields(tmp_path):
+    path = tmp_path / "plan-1.jsonl.gz"
+    target = Writer()
+    personinfo = {"Id": "1", "Type": "Person", "Name": "汤姆", "Overview": "长简介",
+                  "ProviderIds": {"Tmdb": "5", "Imdb": "nm1"}}
+    writer = PlanWriter(path)
+    with target._plans.recording(writer):
+        assert target.set_iteminfo(server="Emby", server_type="emby", itemid="1",
+                                   iteminfo=personinfo, fields=["Name", "ProviderIds"]) is True
+        # 未传入变化字段时记录完整内容
+        target.set_iteminfo(server="Emby", server_type="emby", itemid="2", iteminfo={"Id": "2", "Name": "x"})
+    writer.close()
+    assert target.calls == []
+    first, second = iter_plan(path)
+    assert first["partial"] and first["data"] == {"Id": "1", "Type": "Person", "Name": "汤姆",
+                                                  "ProviderIds": {"Tmdb": "5", "Imdb": "nm1"}}
+    assert op_phase(first) == 0
+    assert "partial" not in second and second["data"] == {"Id": "2", "Name": "x"}
+    # 未处于计划模式时照常执行
+    assert target.set_iteminfo(server="Emby", server_type="emby", itemid="1", iteminfo=personinfo) == {"ok": True}
+    assert target.calls == ["1"]
+
+
+def test_recording_is_per_thread(tmp_path):
+    target = Writer()
+    writer = PlanWriter(tmp_path / "plan-1.jsonl.gz")
+    with target._plans.recording(writer):
+        thread = threading.Thread(target=target.set_iteminfo, kwargs={
+            "server": "Emby", "server_type": "emby", "itemid": "1", "iteminfo": {}})
+        thread.start()
+        thread.join()
+    assert writer.close() == {} and target.calls == ["1"]
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.records import PersonCache, PersonRecord  # noqa: E402
+
+TMDB_PERSON = {
+    "id": 1001,
+    "name": "劉德華",
+    "biography": "",
+    "birthday": "1961-09-27",
+    "deathday": None,
+    "place_of_birth": "Hong Kong",
+    "profile_path": "/lau.jpg",
+    "also_known_as": ["Andy Lau", "刘德华"],
+    "popularity": 12.3,
+    "external_ids": {"imdb_id": "nm0490489", "tvdb_id": 12345},
+}
+
+
+def test_from_tmdb_keeps_only_used_fields():
+    record = PersonRecord.from_tmdb(TMDB_PERSON)
+    assert record.tmdbid == 1001
+    assert record.name == "刘德华"
+    # 空字段统一为None
+    assert record.overview is None and record.deathday is None
+    assert record.tvdb_id == "12345"
+    assert record.imdb_id == "nm0490489"
+    assert record.also_known_as == ("Andy Lau", "刘德华")
+    assert not hasattr(record, "__dict__")
+
+
+def test_dict_round_trip_omits_empty_fields():
+    record = PersonRecord.from_tmdb(TMDB_PERSON)
+    record.etag = '"abc"'
+    data = record.to_dict()
+    assert "overview" not in data and "last_modified" not in data
+    assert data["also_known_as"] == ["Andy Lau", "刘德华"]
+    assert PersonRecord.from_dict(data) == record
+    assert PersonRecord.from_dict({"tmdbid": "7"}).tmdbid == 7
+
+
+class MemoryStore:
+    def __init__(self):
+        self.persons = {}
+
+    def get_person(self, tmdbid):
+        return self.persons.get(tmdbid)
+
+    def put_person(self, record):
+        self.persons[record.tmdbid] = record
+
+    def delete_persons(self, tmdbids):
+        for tmdbid in tmdbids:
+            self.persons.pop(tmdbid, None)
+
+
+def test_cache_ttl_and_stale_lookup():
+    cache = PersonCache(ttl=60)
+    cache.put(PersonRecord(tmdbid=1, name="新"))
+    cache.put(PersonRecord(tmdbid=2, name="旧", fetched_at=time.time() - 120))
+    assert cache.get(1).name == "新"
+    assert cache.get(2) is None
+    assert cache.get_stale(2).name == "旧"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PersonCache(max_entries=2)
+    for tmdbid in (1, 2):
+        cache.put(PersonRecord(tmdbid=tmdbid))
+    cache.get(1)
+    cache.put(PersonRecord(tmdbid=3))
+    assert cache.get(2) is None
+    assert cache.get(1) and cache.get(3)
+
+
+def test_cache_falls_back_to_store_and_invalidates_both():
+    store = MemoryStore()
+    cache = PersonCache()
+    cache.store = store
+    cache.put(PersonRecord(tmdbid=1, name="甲"))
+    assert store.persons[1].name == "甲"
+    cache.clear()
+    assert cache.get(1).name == "甲"
+    cache.invalidate([1])
+    assert cache.get(1) is None and 1 not in store.persons
@@ -0,0 +1,25 @@
+from personmetamod.runstate import RunState
+
+
+def test_nested_run_keeps_counters_until_last_finish():
+    state = RunState()
+    assert state.start(mode="library", items_total=10)
+    state.item_done()
+    # 全库扫描期间开始的近期扫描只累加条目数
+    assert not state.start(mode="recent", items_total=2)
+    snapshot = state.snapshot()
+    assert snapshot["mode"] == "library" and snapshot["items_total"] == 12 and snapshot["items_done"] == 1
+    state.finish()
+    assert state.snapshot()["running"]
+    state.finish()
+    assert not state.snapshot()["running"]
+    assert state.start(mode="recent", items_total=2)
+    assert state.snapshot()["items_done"] == 0
+
+
+def test_items_total_grows_while_streaming():
+    state = RunState()
+    state.start(mode="library")
+    state.add_items(3)
+    state.item_done()
+    assert state.snapshot()["items_pending"] == 2
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+
+from personmetamod.scheduler import JobGroup, JobScheduler, Lane, RateLimiter  # noqa: E402
+
+
+def test_jobs_run_in_lane_priority_order():
+    jobs = JobScheduler()
+    gate = threading.Event()
+    order = []
+    group = JobGroup("test")
+    # 先占住主工作线程，使后续任务排队
+    jobs.submit(Lane.BACKFILL, gate.wait, 5, group=group)
+    time.sleep(0.05)
+    for lane, name in [(Lane.BACKFILL, "b1"), (Lane.RECENT, "r1"), (Lane.BACKFILL, "b2"), (Lane.RECENT, "r2")]:
+        jobs.submit(lane, order.append, name, group=group)
+    assert jobs.pending() == {"realtime": 0, "recent": 2, "backfill": 2}
+    gate.set()
+    assert group.wait(5)
+    assert order == ["r1", "r2", "b1", "b2"]
+
+
+def test_realtime_job_does_not_wait_for_running_backfill_item():
+    jobs = JobScheduler()
+    gate = threading.Event()
+    done = threading.Event()
+    lanes = []
+
+    def realtime():
+        lanes.append(jobs.current_lane)
+        done.set()
+
+    jobs.submit(Lane.BACKFILL, gate.wait, 5)
+    time.sleep(0.05)
+    assert jobs.running_lane == Lane.BACKFILL
+    jobs.submit(Lane.REALTIME, realtime)
+    try:
+        assert done.wait(2)
+        assert lanes == [Lane.REALTIME]
+    finally:
+        gate.set()
+
+
+def test_cancel_releases_group_and_keeps_other_lanes():
+    jobs = JobScheduler()
+    gate = threading.Event()
+    ran = []
+    group = JobGroup("test")
+    jobs.submit(Lane.BACKFILL, gate.wait, 5)
+    time.sleep(0.05)
+    jobs.submit(Lane.BACKFILL, ran.append, "b", group=group)
+    jobs.submit(Lane.RECENT, ran.append, "r")
+    jobs.submit_later(60, Lane.BACKFILL, ran.append, "later", group=group)
+    assert jobs.delayed() == 1
+    assert jobs.cancel([Lane.BACKFILL]) == 2
+    assert jobs.delayed() == 0
+    assert group.wait(1) and group.cancelled
+    gate.set()
+    deadline = time.time() + 2
+    while ran != ["r"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert ran == ["r"]
+
+
+def test_submit_later_keeps_group_pending_until_run():
+    jobs = JobScheduler()
+    ran = []
+    group = JobGroup("test")
+    jobs.submit_later(0.1, Lane.RECENT, ran.append, "x", group=group)
+    assert group.pending == 1 and not group.wait(0.01)
+    assert group.wait(2) and not group.cancelled
+    assert ran == ["x"]
+
+
+def test_wait_below_bounds_queued_jobs():
+    jobs = JobScheduler()
+    gate = threading.Event()
+    group = JobGroup("test")
+    for _ in range(3):
+        jobs.submit(Lane.BACKFILL, gate.wait, 5, group=group)
+    assert group.wait_below(4, timeout=0)
+    assert not group.wait_below(3, timeout=0.05)
+    gate.set()
+    assert group.wait_below(1, timeout=2)
+
+
+def test_failed_job_finishes_group():
+    jobs = JobScheduler()
+    group = JobGroup("test")
+    jobs.submit(Lane.RECENT, lambda: 1 / 0, group=group)
+    assert group.wait(2)
+
+
+def test_rate_limiter_parse_and_reserve():
+    assert RateLimiter.parse("tmdb=40，douban=0.5, bad, x=y") == {"tmdb": 40.0, "douban": 0.5}
+    limiter = RateLimiter(reserve=0.5)
+    limiter.configure({"tmdb": 2, "douban": 0})
+    # 未限速的上游直接返回
+    limiter.acquire("douban")
+    # 桶容量2，回填只能用到保留量以上的令牌，实时通道可以用完
+    limiter.acquire("tmdb", lane=Lane.BACKFILL)
+    start = time.monotonic()
+    limiter.acquire("tmdb", lane=Lane.REALTIME)
+    assert time.monotonic() - start < 0.1
+    stop = threading.Event()
+    stop.set()
+    start = time.monotonic()
+    limiter.acquire("tmdb", lane=Lane.BACKFILL, stop_event=stop)
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_slow_rate_still_serves_backfill():
+    limiter = RateLimiter(reserve=0.2)
+    limiter.configure({"douban": 0.5})
+    # 速率低于每秒1次时桶仍能容纳保留量，回填不会一直等待
+    done = threading.Event()
+    threading.Thread(target=lambda: (limiter.acquire("douban", lane=Lane.BACKFILL), done.set()),
+                     daemon=True).start()
+    assert done.wait(1)
+    limiter._buckets["douban"][1] = 0
+    start = time.monotonic()
+    limiter.acquire("douban", lane=Lane.RECENT)
+    assert time.monotonic() - start < 3.5
@@ -0,0 +1,107 @@
+import gzip
+import json
+import time
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.records import PersonRecord  # noqa: E402
+from personmetamod.snapshot import SNAPSHOT_FORMAT, export_snapshot, import_snapshot  # noqa: E402
+from personmetamod.store import CacheStore  # noqa: E402
+
+
+@pytest.fixture
+def stores(tmp_path):
+    source = CacheStore(tmp_path / "source.db")
+    target = CacheStore(tmp_path / "target.db")
+    yield source, target
+    source.close()
+    target.close()
+
+
+def read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_round_trip_merges_newer_rows_only(stores, tmp_path):
+    source, target = stores
+    now = time.time()
+    source.put_persons([PersonRecord(tmdbid=1, name="快照", fetched_at=now - 10),
+                        PersonRecord(tmdbid=2, name="快照", fetched_at=now - 10)])
+    source.put_douban("movie:1:", [{"name": "甲"}])
+    source.put_image("https://img/a.jpg", "sha", 10)
+    target.put_person(PersonRecord(tmdbid=1, name="本地", fetched_at=now))
+    path = tmp_path / "export" / "snapshot.jsonl.gz"
+    counts = export_snapshot(source, path)
+    assert counts["persons"] == 2 and counts["douban"] == 1
+    assert read_lines(path)[0]["format"] == SNAPSHOT_FORMAT
+    merged = import_snapshot(target, path, batch_size=1)
+    assert merged["persons"] == 1
+    assert target.get_person(1).name == "本地"
+    assert target.get_person(2).name == "快照"
+    assert target.get_douban("movie:1:", ttl=60) == [{"name": "甲"}]
+    assert target.get_image("https://img/a.jpg")["sha1"] == "sha"
+
+
+def test_ledger_is_not_exported_or_imported(stores, tmp_path):
+    source, target = stores
+    source.ledger_add("Emby", "emby", "p1", 100)
+    path = tmp_path / "snapshot.jsonl.gz"
+    counts = export_snapshot(source, path, sections=("persons", "ledger"))
+    assert "ledger" not in counts
+    assert all(line.get("t") != "ledger" for line in read_lines(path)[1:])
+    # 旧版本导出的快照中的台账行被忽略：同名服务器的人物ID属于另一台服务器
+    old = tmp_path / "old.jsonl.gz"
+    with gzip.open(old, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": 1,
+                            "columns": {"ledger": list(CacheStore.TABLES["ledger"])}}) + "\n")
+        f.write(json.dumps({"t": "ledger", "r": ["Emby", "p9", "emby", 100, time.time()]}) + "\n")
+    assert import_snapshot(target, old) == {"persons": 0, "douban": 0, "images": 0, "misses": 0}
+    assert target.ledger_entries([100]) == {}
+
+
+def test_only_shared_misses_are_exported_or_imported(stores, tmp_path):
+    source, target = stores
+    source.put_miss("tmdb:1", "tmdb_404")
+    source.put_miss("douban:movie:1:", "douban_unmatched")
+    source.put_miss("person:Emby:p1", "no_tmdbid", "甲")
+    path = tmp_path / "snapshot.jsonl.gz"
+    assert export_snapshot(source, path)["misses"] == 2
+    assert import_snapshot(target, path)["misses"] == 2
+    assert target.get_miss("tmdb:1", ttl=60) == "tmdb_404"
+    assert target.get_miss("person:Emby:p1", ttl=60) is None
+    # 旧版本导出的快照中服务器人物的缺失结果被忽略
+    old = tmp_path / "old.jsonl.gz"
+    with gzip.open(old, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": 1,
+                            "columns": {"misses": list(CacheStore.TABLES["misses"])}}) + "\n")
+        f.write(json.dumps({"t": "misses", "r": ["person:Emby:p2", "no_tmdbid", None, time.time()]}) + "\n")
+    assert import_snapshot(target, old)["misses"] == 0
+    assert target.list_misses(reason="no_tmdbid") == []
+
+
+def test_import_aligns_columns_by_name(stores, tmp_path):
+    _, target = stores
+    path = tmp_path / "reordered.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": 1,
+                            "columns": {"douban": ["fetched_at", "key", "data"]}}) + "\n")
+        f.write(json.dumps({"t": "douban", "r": [time.time(), "tv:1:1", "[]"]}) + "\n")
+    assert import_snapshot(target, path)["douban"] == 1
+    assert target.get_douban("tv:1:1", ttl=60) == []
+
+
+def test_rejects_foreign_or_newer_files(stores, tmp_path):
+    _, target = stores
+    path = tmp_path / "bad.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": "other"}) + "\n")
+    with pytest.raises(ValueError):
+        import_snapshot(target, path)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": 99}) + "\n")
+    with pytest.raises(ValueError):
+        import_snapshot(target, path)
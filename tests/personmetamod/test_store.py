@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.records import PersonRecord  # noqa: E402
+from personmetamod.store import CacheStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CacheStore(tmp_path / "cache.db")
+    yield store
+    store.close()
+
+
+def test_persons_put_get_and_delete(store):
+    store.put_persons([PersonRecord(tmdbid=1, name="甲"), PersonRecord(tmdbid=2, name="乙")])
+    assert store.get_person(1).name == "甲"
+    assert store.get_person(3) is None
+    assert sorted(store.cached_tmdbids([1, 2, 3])) == [1, 2]
+    assert store.delete_persons([1, 3]) == 1
+    assert store.cached_tmdbids([1, 2]) == [2]
+
+
+def test_merge_persons_only_overwrites_older_rows(store):
+    now = time.time()
+    store.put_person(PersonRecord(tmdbid=1, name="本地", fetched_at=now))
+    written = store.merge_persons([PersonRecord(tmdbid=1, name="旧快照", fetched_at=now - 100),
+                                   PersonRecord(tmdbid=2, name="新增", fetched_at=now - 100)])
+    assert written == 1
+    assert store.get_person(1).name == "本地"
+    store.merge_persons([PersonRecord(tmdbid=1, name="更新", fetched_at=now + 1)])
+    assert store.get_person(1).name == "更新"
+
+
+def test_ledger_entries_and_peers(store):
+    store.ledger_add("Emby", "emby", "p1", 100)
+    store.ledger_add("Jellyfin", "jellyfin", "j9", 100)
+    store.ledger_add("Emby", "emby", "p2", 200)
+    entries = store.ledger_entries([100, 300])
+    assert sorted(x["server"] for x in entries[100]) == ["Emby", "Jellyfin"]
+    assert 300 not in entries
+    assert store.ledger_peers("Emby", "p1") == [{"server": "Jellyfin", "server_type": "jellyfin",
+                                                 "person_id": "j9"}]
+    assert store.ledger_peers("Emby", "p2") == []
+
+
+def test_douban_and_misses_expire(store):
+    store.put_douban("movie:1:", [{"name": "甲"}])
+    assert store.get_douban("movie:1:", ttl=60) == [{"name": "甲"}]
+    assert store.get_douban("movie:1:", ttl=0) is None
+    store.put_miss("tmdb:1", "tmdb_404")
+    store.put_miss("person:Emby:p1", "no_tmdbid", "甲")
+    assert store.get_miss("tmdb:1", ttl=60) == "tmdb_404"
+    assert store.get_miss("tmdb:1", ttl=0) is None
+    assert store.miss_counts() == {"tmdb_404": 1, "no_tmdbid": 1}
+    assert [x["key"] for x in store.list_misses(reason="no_tmdbid")] == ["person:Emby:p1"]
+    assert store.clear_misses(reason="tmdb_404") == 1
+    assert store.clear_misses() == 1
+
+
+def test_images_and_uploads(store):
+    store.put_image("https://img/a.jpg", "sha", 10, etag='"e"')
+    assert store.get_image("https://img/a.jpg")["etag"] == '"e"'
+    fetched_at = store.get_image("https://img/a.jpg")["fetched_at"]
+    store.touch_image("https://img/a.jpg")
+    assert store.get_image("https://img/a.jpg")["fetched_at"] >= fetched_at
+    store.put_upload("Emby", "p1", "https://img/a.jpg", "sha")
+    assert store.get_upload("Emby", "p1")["sha1"] == "sha"
+    assert store.get_upload("Emby", "p1")["image_tag"] is None
+    store.set_upload_tag("Emby", "p1", "tag1")
+    assert store.get_upload("Emby", "p1")["image_tag"] == "tag1"
+    # 重新上传后标签未知
+    store.put_upload("Emby", "p1", "https://img/b.jpg", "sha2")
+    assert store.get_upload("Emby", "p1")["image_tag"] is None
+    assert store.get_upload("Emby", "p2") is None
+
+
+def test_iter_rows_and_merge_rows(store, tmp_path):
+    store.put_douban("a", [])
+    store.put_douban("b", [])
+    rows = list(store.iter_rows("douban", batch=1))
+    assert [row[0] for row in rows] == ["a", "b"]
+    other = CacheStore(tmp_path / "other.db")
+    try:
+        assert other.merge_rows("douban", rows) == 2
+        # 时间列相同的行不覆盖
+        assert other.merge_rows("douban", rows) == 0
+        assert other.stats()["douban"] == 2
+    finally:
+        other.close()
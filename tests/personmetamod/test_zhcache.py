@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("app.log", reason="需要 MoviePilot 源码，见 conftest.py")
+pytest.importorskip("zhconv")
+
+from personmetamod.zhcache import TextCache, _LRUCache  # noqa: E402
+
+
+def test_get_or_compute_memoizes():
+    cache = _LRUCache(max_entries=10, max_chars=1000)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key.upper()
+
+    assert cache.get_or_compute("abc", compute) == "ABC"
+    assert cache.get_or_compute("abc", compute) == "ABC"
+    assert calls == ["abc"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_by_entries_and_chars():
+    cache = _LRUCache(max_entries=2, max_chars=1000)
+    for key in ("a", "b"):
+        cache.get_or_compute(key, str.upper)
+    # 访问 a 后，b 成为最久未使用
+    cache.get_or_compute("a", str.upper)
+    cache.get_or_compute("c", str.upper)
+    assert set(cache._data) == {"a", "c"}
+
+    cache = _LRUCache(max_entries=100, max_chars=20)
+    cache.get_or_compute("x" * 4, str.upper)
+    cache.get_or_compute("y" * 4, str.upper)
+    cache.get_or_compute("z" * 4, str.upper)
+    assert cache.stats()["chars"] <= 20
+    assert "xxxx" not in cache._data
+
+
+def test_oversized_values_are_not_cached():
+    cache = _LRUCache(max_entries=100, max_chars=20)
+    assert cache.get_or_compute("long text", str.upper) == "LONG TEXT"
+    assert cache.stats()["entries"] == 0
+
+
+def test_text_cache_to_hans():
+    cache = TextCache()
+    assert cache.to_hans("劉德華") == "刘德华"
+    assert cache.to_hans("Andy Lau") == "Andy Lau"
+    assert cache.to_hans("") == ""
+    assert cache.is_chinese("刘德华") and not cache.is_chinese("Andy")
+    cache.to_hans("劉德華")
+    assert cache.stats()["zh-hans"]["hits"] == 1
+    cache.clear()
+    assert cache.stats()["zh-hans"]["entries"] == 0